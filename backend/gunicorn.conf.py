@@ -0,0 +1,18 @@
+"""
+Configuração do Gunicorn (carregada automaticamente a partir do diretório backend/)
+
+Hooks de ciclo de vida para o container de componentes WBR:
+- post_fork: cada worker descarta componentes herdados do master
+  (necessário quando a aplicação é carregada com --preload)
+- worker_exit: fecha o connection pool do worker ao encerrar
+"""
+
+
+def post_fork(server, worker):
+    from wbr.factories import get_container
+    get_container().reset_after_fork()
+
+
+def worker_exit(server, worker):
+    from wbr.factories import get_container
+    get_container().shutdown()
@@ -260,12 +260,22 @@ DATABASES['default']['CONN_STRING'] = DATABASE_URL
 
 # WBR Configuration
 WBR_DB_POOL_SIZE = int(os.getenv('WBR_DB_POOL_SIZE', '20'))  # 20 conexões para queries paralelas
+WBR_PAGE_CONCURRENCY = int(os.getenv('WBR_PAGE_CONCURRENCY', '0'))  # queries de uma página em paralelo (0 = metade do pool)
 WBR_QUERY_TIMEOUT = int(os.getenv('WBR_QUERY_TIMEOUT', '30'))  # 30 segundos timeout
+WBR_DB_PREPARED_STATEMENTS = os.getenv('WBR_DB_PREPARED_STATEMENTS', 'True').lower() == 'true'  # Desative com pooler em transaction mode
 WBR_CACHE_ENABLED = os.getenv('WBR_CACHE_ENABLED', 'False').lower() == 'true'
 WBR_REDIS_URL = os.getenv('WBR_REDIS_URL', None)  # Ex: redis://localhost:6379/0
 WBR_CACHE_TTL = int(os.getenv('WBR_CACHE_TTL', '3600'))  # 1 hora (3600 segundos)
 WBR_LOG_LEVEL = os.getenv('WBR_LOG_LEVEL', 'INFO')  # DEBUG, INFO, WARNING, ERROR, CRITICAL
 WBR_LOG_FORMAT = os.getenv('WBR_LOG_FORMAT', 'json')  # json ou text
+WBR_SINGLE_SCAN = os.getenv('WBR_SINGLE_SCAN', 'True').lower() == 'true'  # CY e PY em uma única query (gráficos padrão)
+WBR_DATA_PROCESSOR = os.getenv('WBR_DATA_PROCESSOR', 'numpy')  # numpy (arrays, ~10x mais rápido) ou python (loop por linha)
+WBR_SQL_PUSHDOWN = os.getenv('WBR_SQL_PUSHDOWN', 'True').lower() == 'true'  # Semanas/meses agregados no banco (gráficos padrão)
+WBR_INSTAGRAM_ROLLUPS = os.getenv('WBR_INSTAGRAM_ROLLUPS', 'True').lower() == 'true'  # Lê rollups do Instagram quando existirem (wbr_refresh_instagram_rollups)
+WBR_INSTAGRAM_ROLLUP_MAX_AGE = float(os.getenv('WBR_INSTAGRAM_ROLLUP_MAX_AGE', '86400'))  # segundos desde a última atualização dos rollups; acima disso usa as tabelas da ingestão (0 = sem limite)
+WBR_CONFIG_RELOAD_INTERVAL = float(os.getenv('WBR_CONFIG_RELOAD_INTERVAL', '5'))  # segundos entre checagens de mtime (0 = desativa)
+WBR_RGM_SEMIJOIN_THRESHOLD = int(os.getenv('WBR_RGM_SEMIJOIN_THRESHOLD', '100'))  # acima de N chaves, filtro RGM vira semi-join em Rgm_filtros (0 = sempre lista)
+WBR_DATA_VERSION_INTERVAL = float(os.getenv('WBR_DATA_VERSION_INTERVAL', '30'))  # segundos entre checagens de versão das dimensões (índices em memória)
 
 # ==========================
 # LOGGING CONFIGURATION
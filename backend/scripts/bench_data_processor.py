@@ -0,0 +1,72 @@
+"""
+Microbenchmark da transformação para o formato WBR (transform_to_wbr)
+
+Compara, para séries diárias de vários anos (CY e PY, semanas móveis):
+  - python: DataProcessor (loop por linha com _parse_date/_to_iso8601)
+  - numpy:  VectorizedDataProcessor (arrays datetime64/float64 + np.bincount)
+
+Também confere que as duas saídas são idênticas (json.dumps).
+
+Uso (a partir de backend/):
+    python scripts/bench_data_processor.py [anos] [iteracoes]
+"""
+
+import json
+import random
+import sys
+import timeit
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from wbr.services.data_processor import DataProcessor  # noqa: E402
+from wbr.services.vectorized_data_processor import VectorizedDataProcessor  # noqa: E402
+
+DATA_REFERENCIA = date(2025, 10, 15)
+
+
+def daily_series(inicio, fim):
+    """Uma linha por dia, como retornada pelo psycopg2 (date + Decimal)"""
+    rows = []
+    dia = inicio
+    while dia <= fim:
+        rows.append({'data': dia, 'valor': Decimal(f"{random.uniform(0, 100000):.2f}")})
+        dia += timedelta(days=1)
+    return rows
+
+
+def main():
+    anos = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    iteracoes = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    random.seed(42)
+    inicio_cy = DATA_REFERENCIA - timedelta(days=365 * anos)
+    dados_cy = daily_series(inicio_cy, DATA_REFERENCIA)
+    dados_py = daily_series(inicio_cy - timedelta(days=365), DATA_REFERENCIA - timedelta(days=365))
+
+    processors = {'python': DataProcessor(), 'numpy': VectorizedDataProcessor()}
+    saidas = {}
+    resultados = {}
+    for nome, processor in processors.items():
+        def run():
+            return processor.transform_to_wbr(
+                dados_cy, dados_py, 'semanal', 2025, 2024,
+                data_referencia=DATA_REFERENCIA, usar_semana_movel=True
+            )
+
+        saidas[nome] = json.dumps(run())
+        melhor = min(timeit.repeat(run, number=iteracoes, repeat=5))
+        resultados[nome] = melhor / iteracoes * 1e3
+
+    print(f"{len(dados_cy)} + {len(dados_py)} linhas ({anos} anos), {iteracoes} iterações (melhor de 5)")
+    for nome, ms in resultados.items():
+        print(f"  {nome:<7} {ms:8.2f} ms/gráfico")
+    print(f"  speedup {resultados['python'] / resultados['numpy']:.1f}x")
+    print(f"  saídas idênticas: {saidas['python'] == saidas['numpy']}")
+
+
+if __name__ == '__main__':
+    main()
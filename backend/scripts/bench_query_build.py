@@ -0,0 +1,108 @@
+"""
+Microbenchmark da montagem de queries WBR (custo por gráfico, CY + PY)
+
+Compara:
+  - legado: builder novo a cada gráfico (template lido do disco no
+    construtor) + str.replace sobre o texto completo para CY e PY
+  - atual:  builder compartilhado com template pré-compilado e SQL
+    parametrizado memorizado por (config, formato dos filtros)
+
+Uso (a partir de backend/):
+    python scripts/bench_query_build.py [iteracoes]
+"""
+
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from wbr.services.query_builder import QueryBuilder  # noqa: E402
+from wbr.services.instagram_query_builder import InstagramQueryBuilder  # noqa: E402
+from wbr.services.rgm_cto_percentual_query_builder import RgmCtoPercentualQueryBuilder  # noqa: E402
+
+SQL_DIR = BACKEND_DIR / 'wbr' / 'sql'
+CONFIG_DIR = BACKEND_DIR / 'wbr' / 'config' / 'graficos'
+TEXT_COLUMNS = ['grupo', 'categoria', 'nome_loja', 'shopping']
+FILTERS = {'shopping': 'SCIB', 'chave': ['10', '20', '30']}
+
+
+def _legacy_identifier(identifier):
+    if not re.match(r'^[a-zA-Z0-9_."]+$', identifier):
+        raise ValueError(identifier)
+    return identifier
+
+
+def _legacy_filters(filtros):
+    clauses = []
+    for coluna, valor in filtros.items():
+        coluna_safe = _legacy_identifier(coluna)
+        if isinstance(valor, str):
+            valor_safe = valor.replace("'", "''")
+            if coluna in TEXT_COLUMNS:
+                clauses.append(f"AND TRIM(UPPER({coluna_safe})) = '{valor_safe}'")
+            else:
+                clauses.append(f"AND {coluna_safe} = '{valor_safe}'")
+        else:
+            valores_str = "', '".join(v.replace("'", "''") for v in valor)
+            clauses.append(f"AND {coluna_safe} IN ('{valores_str}')")
+    return '\n    '.join(clauses)
+
+
+def legacy_build(config, filtros):
+    """Caminho antigo: lê o template e monta CY e PY com str.replace"""
+    with open(SQL_DIR / 'query_template.sql', 'r', encoding='utf-8') as f:
+        template = f.read()
+
+    queries = []
+    for _periodo in ('cy', 'py'):
+        query = template
+        query = query.replace('{coluna_data}', _legacy_identifier(config['colunas']['data']))
+        query = query.replace('{coluna_valor}', _legacy_identifier(config['colunas']['valor']))
+        query = query.replace('{tabela}', _legacy_identifier(config['tabela']))
+        query = query.replace('{filtros_dinamicos}', _legacy_filters({**config.get('filtros', {}), **filtros}))
+        queries.append(query)
+    return queries
+
+
+def main():
+    iteracoes = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    configs = []
+    for config_file in sorted(CONFIG_DIR.glob('*.json')):
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        if 'tabela' in config and 'colunas' in config:
+            configs.append(config)
+
+    builder = QueryBuilder()
+    # Construtores das subclasses também liam o template a cada gráfico
+    InstagramQueryBuilder()
+    RgmCtoPercentualQueryBuilder()
+
+    def run_legacy():
+        for config in configs:
+            legacy_build(config, FILTERS)
+
+    def run_atual():
+        for config in configs:
+            builder.build(config, '2025-01-01', '2025-10-15', FILTERS)
+            builder.build(config, '2024-01-01', '2024-10-15', FILTERS)
+
+    rodadas = max(1, iteracoes // len(configs))
+    resultados = {}
+    for nome, fn in (('legado', run_legacy), ('atual', run_atual)):
+        melhor = min(timeit.repeat(fn, number=rodadas, repeat=5))
+        resultados[nome] = melhor / (rodadas * len(configs)) * 1e6
+
+    print(f"{len(configs)} gráficos, {rodadas} rodadas (melhor de 5)")
+    for nome, us in resultados.items():
+        print(f"  {nome:<7} {us:8.2f} us/gráfico")
+    print(f"  speedup {resultados['legado'] / resultados['atual']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
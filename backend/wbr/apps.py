@@ -5,3 +5,11 @@ class WbrConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'wbr'
     verbose_name = 'WBR Analytics'
+
+    def ready(self):
+        """
+        Carrega e valida todas as configurações de gráficos e páginas no startup.
+        Uma configuração inválida impede a aplicação de subir.
+        """
+        from wbr.factories import get_container
+        get_container().get_config_registry().preload()
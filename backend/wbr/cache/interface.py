@@ -41,6 +41,32 @@ class CacheInterface(ABC):
         """
         pass
 
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """
+        Busca valor já serializado (JSON em bytes UTF-8) salvo com set_bytes.
+
+        Implementação padrão: o próprio valor armazenado por set().
+
+        Args:
+            key: Chave única para buscar
+
+        Returns:
+            Bytes se encontrado, None caso contrário
+        """
+        return self.get(key)
+
+    def set_bytes(self, key: str, data: bytes, ttl: int):
+        """
+        Salva valor já serializado (JSON em bytes UTF-8), devolvido como está
+        por get_bytes, sem desserializar.
+
+        Args:
+            key: Chave única para salvar
+            data: JSON em bytes UTF-8
+            ttl: Tempo de vida em segundos
+        """
+        self.set(key, data, ttl)
+
     @abstractmethod
     def delete(self, key: str):
         """
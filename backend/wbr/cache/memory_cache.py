@@ -3,6 +3,7 @@ MemoryCache - Cache em memória usando dicionário Python
 Útil para desenvolvimento e ambientes sem Redis
 """
 
+import threading
 import time
 from typing import Any, Optional
 from .interface import CacheInterface
@@ -15,6 +16,9 @@ class MemoryCache(CacheInterface):
     ATENÇÃO: Este cache é local ao processo. Em ambientes com múltiplos
     workers (Gunicorn, uWSGI), cada worker terá seu próprio cache.
     Para produção com múltiplos workers, use RedisCache.
+
+    A instância é compartilhada entre threads do mesmo processo
+    (ver ComponentContainer), por isso as operações são protegidas por lock.
     """
 
     def __init__(self, default_ttl: int = 3600):
@@ -26,6 +30,7 @@ class MemoryCache(CacheInterface):
         """
         self._cache = {}
         self._timestamps = {}
+        self._lock = threading.Lock()
         self.default_ttl = default_ttl
 
     def get(self, key: str) -> Optional[Any]:
@@ -38,19 +43,20 @@ class MemoryCache(CacheInterface):
         Returns:
             Valor armazenado ou None se não existir/expirado
         """
-        if key not in self._cache:
-            return None
-
-        # Verifica expiração
-        if key in self._timestamps:
-            timestamp, ttl = self._timestamps[key]
-            if time.time() - timestamp > ttl:
-                # Expirou, remove
-                del self._cache[key]
-                del self._timestamps[key]
+        with self._lock:
+            if key not in self._cache:
                 return None
 
-        return self._cache[key]
+            # Verifica expiração
+            if key in self._timestamps:
+                timestamp, ttl = self._timestamps[key]
+                if time.time() - timestamp > ttl:
+                    # Expirou, remove
+                    self._cache.pop(key, None)
+                    self._timestamps.pop(key, None)
+                    return None
+
+            return self._cache[key]
 
     def set(self, key: str, value: Any, ttl: int = None) -> bool:
         """
@@ -64,8 +70,9 @@ class MemoryCache(CacheInterface):
         Returns:
             True se sucesso
         """
-        self._cache[key] = value
-        self._timestamps[key] = (time.time(), ttl or self.default_ttl)
+        with self._lock:
+            self._cache[key] = value
+            self._timestamps[key] = (time.time(), ttl or self.default_ttl)
         return True
 
     def delete(self, key: str) -> bool:
@@ -78,12 +85,12 @@ class MemoryCache(CacheInterface):
         Returns:
             True se removido, False se não existia
         """
-        if key in self._cache:
-            del self._cache[key]
-            if key in self._timestamps:
-                del self._timestamps[key]
-            return True
-        return False
+        with self._lock:
+            if key in self._cache:
+                del self._cache[key]
+                self._timestamps.pop(key, None)
+                return True
+            return False
 
     def clear(self) -> bool:
         """
@@ -92,26 +99,38 @@ class MemoryCache(CacheInterface):
         Returns:
             True se sucesso
         """
-        self._cache.clear()
-        self._timestamps.clear()
+        with self._lock:
+            self._cache.clear()
+            self._timestamps.clear()
         return True
 
+    def exists(self, key: str) -> bool:
+        """
+        Verifica se chave existe (e não expirou) no cache.
+
+        Args:
+            key: Chave a verificar
+
+        Returns:
+            True se existe
+        """
+        return self.get(key) is not None
+
     def cleanup_expired(self):
         """
         Remove entradas expiradas do cache.
         Deve ser chamado periodicamente para liberar memória.
         """
         current_time = time.time()
-        expired_keys = []
 
-        for key, (timestamp, ttl) in self._timestamps.items():
-            if current_time - timestamp > ttl:
-                expired_keys.append(key)
+        with self._lock:
+            expired_keys = [
+                key for key, (timestamp, ttl) in self._timestamps.items()
+                if current_time - timestamp > ttl
+            ]
 
-        for key in expired_keys:
-            if key in self._cache:
-                del self._cache[key]
-            if key in self._timestamps:
-                del self._timestamps[key]
+            for key in expired_keys:
+                self._cache.pop(key, None)
+                self._timestamps.pop(key, None)
 
         return len(expired_keys)
@@ -30,6 +30,13 @@ class RedisCache(CacheInterface):
                 socket_connect_timeout=5,
                 socket_timeout=5
             )
+            # Mesmo servidor sem decodificação: valores já serializados
+            # (get_bytes/set_bytes) vão e voltam como bytes
+            self.redis_bytes = redis.from_url(
+                redis_url,
+                socket_connect_timeout=5,
+                socket_timeout=5
+            )
             # Testa conexão
             self.redis.ping()
         except Exception as e:
@@ -87,6 +94,47 @@ class RedisCache(CacheInterface):
                 cache_key=key
             )
 
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """
+        Busca valor já serializado, sem desserializar.
+
+        Args:
+            key: Chave única
+
+        Returns:
+            JSON em bytes UTF-8 ou None
+
+        Raises:
+            CacheException: Se houver erro
+        """
+        try:
+            return self.redis_bytes.get(key)
+        except Exception as e:
+            raise CacheException(
+                message=f"Erro ao buscar no cache: {str(e)}",
+                cache_key=key
+            )
+
+    def set_bytes(self, key: str, data: bytes, ttl: int):
+        """
+        Salva valor já serializado (JSON em bytes UTF-8) com TTL.
+
+        Args:
+            key: Chave única
+            data: JSON em bytes UTF-8
+            ttl: Tempo de vida em segundos
+
+        Raises:
+            CacheException: Se houver erro
+        """
+        try:
+            self.redis_bytes.setex(key, ttl, data)
+        except Exception as e:
+            raise CacheException(
+                message=f"Erro ao salvar no cache: {str(e)}",
+                cache_key=key
+            )
+
     def delete(self, key: str):
         """
         Remove valor do cache.
@@ -2,10 +2,11 @@
 Database executors - implementacoes para diferentes bancos de dados
 """
 
-from .interface import DatabaseInterface
+from .interface import DatabaseInterface, CompiledQuery
 from .postgres_executor import PostgresExecutor
 
 __all__ = [
     'DatabaseInterface',
+    'CompiledQuery',
     'PostgresExecutor',
 ]
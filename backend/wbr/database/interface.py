@@ -4,20 +4,49 @@ Permite múltiplas implementações (PostgreSQL, MySQL, Redshift, etc.)
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+
+@dataclass(frozen=True)
+class CompiledQuery:
+    """
+    Query montada pelo QueryBuilder.
+
+    O texto SQL contém apenas parâmetros nomeados (:nome); os valores dos
+    filtros ficam em params. Queries com o mesmo texto (mesmo template e
+    mesmo formato de filtros) compartilham statement_key, permitindo que o
+    executor reutilize o plano via prepared statement.
+    """
+    sql: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    statement_key: Optional[str] = None
+
+    def __str__(self) -> str:
+        return self.sql
 
 
 class DatabaseInterface(ABC):
     """Interface para executores de banco de dados"""
 
+    @property
+    def max_connections(self) -> int:
+        """
+        Número de queries que o executor consegue executar ao mesmo tempo.
+
+        Executores sem pool executam uma query por vez.
+        """
+        return 1
+
     @abstractmethod
-    def execute(self, query: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    def execute(self, query: Union[str, CompiledQuery], params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """
         Executa uma query SQL e retorna lista de dicionários.
 
         Args:
-            query: Query SQL a ser executada
+            query: Query SQL a ser executada (texto ou CompiledQuery)
             params: Dicionário de parâmetros para prepared statements
+                    (combinado com CompiledQuery.params, se houver)
 
         Returns:
             Lista de dicionários onde cada dict representa uma linha
@@ -27,6 +56,34 @@ class DatabaseInterface(ABC):
         """
         pass
 
+    def execute_many_concurrent(
+        self,
+        queries: List[Union[str, CompiledQuery, Tuple[Union[str, CompiledQuery], Dict[str, Any]]]]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Executa queries independentes (somente leitura) e reúne os resultados.
+
+        Implementação padrão: em sequência. Executores com pool executam as
+        queries ao mesmo tempo, em conexões diferentes.
+
+        Args:
+            queries: Queries (texto ou CompiledQuery), ou pares (query, params)
+
+        Returns:
+            Lista de resultados (como em execute), na ordem de queries
+
+        Raises:
+            QueryExecutionException: Erro da primeira query que falhou
+        """
+        return [self.execute(*self._query_args(query)) for query in queries]
+
+    @staticmethod
+    def _query_args(query) -> Tuple[Union[str, CompiledQuery], Optional[Dict[str, Any]]]:
+        """(query, params) de um item de execute_many_concurrent"""
+        if isinstance(query, tuple):
+            return query
+        return query, None
+
     @abstractmethod
     def validate_columns(self, tabela: str, colunas: List[str]) -> bool:
         """
@@ -2,43 +2,101 @@
 PostgresExecutor - Executor de banco de dados PostgreSQL com connection pool
 """
 
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import psycopg2
+import psycopg2.extensions
 import psycopg2.pool
 import psycopg2.extras
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Union
 from contextlib import contextmanager
 
-from wbr.database.interface import DatabaseInterface
+from wbr.database.interface import DatabaseInterface, CompiledQuery
 from wbr.exceptions import QueryExecutionException, DatabaseConnectionException, InvalidColumnException
 
 
+# Parâmetro nomeado (:nome). Ignora casts "::tipo" e horários como '10:30'
+NAMED_PARAM_PATTERN = re.compile(r'(?<![:\w]):([a-zA-Z_]\w*)')
+
+
+# SQLSTATEs de prepared statements que deixaram de valer na sessão:
+#   0A000: "cached plan must not change result type" (DDL nas tabelas)
+#   26000: "prepared statement ... does not exist" (troca de backend no pooler)
+STALE_PREPARED_PGCODES = frozenset({'0A000', '26000'})
+
+
+class _StaleConnectionError(Exception):
+    """Conexão do pool encerrada pelo servidor (usada internamente para retry)"""
+
+
+class _WBRConnection(psycopg2.extensions.connection):
+    """
+    Conexão do pool com estado por sessão.
+
+    - configured: autocommit e statement_timeout já aplicados
+    - prepared_statements: nomes dos statements preparados nesta sessão
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.configured = False
+        self.prepared_statements = set()
+
+
 class PostgresExecutor(DatabaseInterface):
     """Executor para banco PostgreSQL com connection pool para alta performance"""
 
-    def __init__(self, connection_string: str, pool_size: int = 20, timeout: int = 30):
+    # Limite de queries com parâmetros convertidos memorizadas
+    MAX_CACHED_CONVERSIONS = 1024
+
+    def __init__(
+        self,
+        connection_string: str,
+        pool_size: int = 20,
+        timeout: int = 30,
+        prepared_statements: bool = True
+    ):
         """
         Inicializa executor com connection pool.
 
         Args:
             connection_string: String de conexão PostgreSQL
             pool_size: Número máximo de conexões no pool (default: 20)
-            timeout: Timeout de queries em segundos (default: 30)
+            timeout: Timeout de queries em segundos (default: 30; 0 = sem
+                     limite, também na espera por uma conexão livre)
+            prepared_statements: Usa PREPARE/EXECUTE para CompiledQuery com
+                                 statement_key (desative se o pooler estiver
+                                 em transaction mode)
         """
         self.connection_string = connection_string
         self.pool_size = pool_size
         self.timeout = timeout
+        self.prepared_statements = prepared_statements
         self._pool = None
+        self._conversions: Dict[str, Tuple[str, List[str]]] = {}
+        self._conversions_lock = threading.Lock()
+        # ThreadedConnectionPool falha quando esgotado: threads aguardam uma vaga aqui
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._fanout_pool = None
+        self._fanout_lock = threading.Lock()
         self._initialize_pool()
 
+    @property
+    def max_connections(self) -> int:
+        """Tamanho do connection pool"""
+        return self.pool_size
+
     def _initialize_pool(self):
         """Inicializa o connection pool"""
         try:
             # Usa pool mínimo para evitar problemas com Supabase Session Mode
             self._pool = psycopg2.pool.ThreadedConnectionPool(
                 minconn=1,  # Mínimo de 1 conexão para evitar limit do Supabase
-                maxconn=10,  # Máximo de 10 conexões simultâneas (ajustado para processar gráficos em paralelo)
+                maxconn=self.pool_size,  # WBR_DB_POOL_SIZE conexões simultâneas (gráficos de uma página em paralelo)
                 dsn=self.connection_string,
-                connect_timeout=10
+                connect_timeout=10,
+                connection_factory=_WBRConnection
             )
         except psycopg2.Error as e:
             raise DatabaseConnectionException(
@@ -53,26 +111,69 @@ class PostgresExecutor(DatabaseInterface):
 
     @contextmanager
     def _get_connection(self):
-        """Context manager para obter conexão do pool"""
+        """
+        Context manager para obter conexão do pool.
+
+        Se todas as conexões estiverem em uso, aguarda até timeout segundos
+        por uma vaga em vez de falhar com o pool esgotado.
+        """
+        if not self._slots.acquire(timeout=self.timeout if self.timeout > 0 else None):
+            raise DatabaseConnectionException(
+                message=f"Nenhuma conexão livre no pool após {self.timeout}s ({self.pool_size} em uso)",
+                connection_string=self._mask_password(self.connection_string)
+            )
+
         conn = None
         try:
             conn = self._pool.getconn()
+            if not getattr(conn, 'configured', True):
+                self._configure_connection(conn)
             yield conn
-        except Exception as e:
-            if conn:
-                conn.rollback()
+        except Exception:
+            if conn and not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    pass
             raise
         finally:
-            if conn:
-                self._pool.putconn(conn)
+            try:
+                if conn:
+                    # Conexões encerradas pelo servidor são descartadas do pool
+                    self._pool.putconn(conn, close=bool(conn.closed))
+            finally:
+                self._slots.release()
+
+    def _configure_connection(self, conn):
+        """
+        Configura a sessão uma única vez, na primeira vez que sai do pool.
 
-    def execute(self, query: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        autocommit evita BEGIN/ROLLBACK a cada query (todas são leituras) e o
+        statement_timeout vale para toda a sessão.
+        """
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"SET statement_timeout = {int(self.timeout * 1000)}")
+        conn.configured = True
+
+    def execute(self, query: Union[str, CompiledQuery], params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """
         Executa query SQL e retorna lista de dicionários.
 
+        Como o pool vive durante todo o processo, uma conexão ociosa pode ter
+        sido encerrada pelo servidor. Nesse caso a query é repetida uma vez
+        com uma conexão nova.
+
+        Uma CompiledQuery com statement_key é executada via prepared
+        statement: o PREPARE acontece uma vez por conexão e as chamadas
+        seguintes com o mesmo texto SQL reutilizam o plano (EXECUTE). Se o
+        statement deixou de valer (DDL nas tabelas, troca de sessão no
+        pooler), os statements da conexão são descartados e a query é
+        repetida uma vez na mesma conexão, preparando de novo.
+
         Args:
-            query: Query SQL (pode conter :param_name para prepared statements)
-            params: Dicionário de parâmetros
+            query: Query SQL (pode conter :param_name) ou CompiledQuery
+            params: Dicionário de parâmetros (combinado com CompiledQuery.params)
 
         Returns:
             Lista de dicionários (cada dict é uma linha)
@@ -80,21 +181,105 @@ class PostgresExecutor(DatabaseInterface):
         Raises:
             QueryExecutionException: Se houver erro na execução
         """
+        try:
+            return self._execute(query, params, retry_stale=True)
+        except _StaleConnectionError:
+            return self._execute(query, params, retry_stale=False)
+
+    def execute_many_concurrent(
+        self,
+        queries: List[Union[str, CompiledQuery, Tuple[Union[str, CompiledQuery], Dict[str, Any]]]]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Executa queries independentes ao mesmo tempo, cada uma em uma conexão
+        do pool, e reúne os resultados.
+
+        A primeira query roda na thread de quem chamou; as demais em threads
+        do executor. O tempo total é o da query mais lenta (com pool livre).
+        Todas terminam antes do retorno, mesmo se alguma falhar.
+
+        Args:
+            queries: Queries (texto ou CompiledQuery), ou pares (query, params)
+
+        Returns:
+            Lista de resultados (como em execute), na ordem de queries
+
+        Raises:
+            QueryExecutionException: Erro da primeira query (na ordem de queries) que falhou
+        """
+        if len(queries) <= 1:
+            return super().execute_many_concurrent(queries)
+
+        pool = self._get_fanout_pool()
+        futures = [pool.submit(self.execute, *self._query_args(query)) for query in queries[1:]]
+
+        first_error = None
+        try:
+            results = [self.execute(*self._query_args(queries[0]))]
+        except Exception as e:
+            results = [None]
+            first_error = e
+
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(None)
+                first_error = first_error or e
+
+        if first_error is not None:
+            raise first_error
+        return results
+
+    def _get_fanout_pool(self) -> ThreadPoolExecutor:
+        """Threads de execute_many_concurrent (uma por conexão do pool)"""
+        pool = self._fanout_pool
+        if pool is None:
+            with self._fanout_lock:
+                pool = self._fanout_pool
+                if pool is None:
+                    pool = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='wbr-db')
+                    self._fanout_pool = pool
+        return pool
+
+    def _execute(
+        self,
+        query: Union[str, CompiledQuery],
+        params: Dict[str, Any] = None,
+        retry_stale: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Executa query em uma conexão do pool (ver execute)"""
+        statement_key = None
+        if isinstance(query, CompiledQuery):
+            params = {**query.params, **(params or {})}
+            if self.prepared_statements:
+                statement_key = query.statement_key
+            query = query.sql
+
+        conn = None
         try:
             with self._get_connection() as conn:
-                # Configura timeout
                 with conn.cursor() as cursor:
-                    cursor.execute(f"SET statement_timeout = {self.timeout * 1000}")
-
-                    # Converte named parameters (:param) para %s
-                    if params:
-                        query_converted, params_list = self._convert_named_params(query, params)
+                    if statement_key:
+                        try:
+                            self._execute_prepared(conn, cursor, statement_key, query, params)
+                        except psycopg2.Error as e:
+                            if e.pgcode not in STALE_PREPARED_PGCODES:
+                                raise
+                            # Statement inválido na sessão: descarta e repete
+                            # uma vez na mesma conexão, preparando de novo
+                            self._reset_prepared_statements(conn)
+                            self._execute_prepared(conn, cursor, statement_key, query, params)
                     else:
-                        query_converted = query
-                        params_list = None
+                        # Converte named parameters (:param) para %s
+                        if params:
+                            query_converted, params_list = self._convert_named_params(query, params)
+                        else:
+                            query_converted = query
+                            params_list = None
 
-                    # Executa query
-                    cursor.execute(query_converted, params_list)
+                        # Executa query
+                        cursor.execute(query_converted, params_list)
 
                     # Obtém nomes das colunas
                     if cursor.description:
@@ -107,12 +292,16 @@ class PostgresExecutor(DatabaseInterface):
                         return []
 
         except psycopg2.OperationalError as e:
+            if retry_stale and conn is not None and conn.closed:
+                raise _StaleConnectionError() from e
             raise QueryExecutionException(
                 message=f"Erro operacional ao executar query: {str(e)}",
                 query=self._mask_query(query),
                 db_error=str(e)
             )
         except psycopg2.Error as e:
+            if statement_key and conn is not None:
+                self._reset_prepared_statements(conn)
             raise QueryExecutionException(
                 message=f"Erro ao executar query: {str(e)}",
                 query=self._mask_query(query),
@@ -125,6 +314,102 @@ class PostgresExecutor(DatabaseInterface):
                 db_error=str(e)
             )
 
+    def _execute_prepared(self, conn, cursor, statement_key: str, query: str, params: Dict[str, Any]):
+        """
+        Executa query via PREPARE/EXECUTE, preparando uma vez por conexão.
+
+        Parâmetros nomeados repetidos (ex: :data_inicio nas duas CTEs do CTO)
+        viram o mesmo $n.
+        """
+        statement_name = f"wbr_{statement_key}"
+        query_numbered, param_names = self._number_named_params(query)
+
+        if statement_name not in conn.prepared_statements:
+            cursor.execute(f"PREPARE {statement_name} AS {query_numbered}")
+            conn.prepared_statements.add(statement_name)
+
+        if param_names:
+            placeholders = ', '.join(['%s'] * len(param_names))
+            values = [self._adapt_param(params.get(name)) for name in param_names]
+            cursor.execute(f"EXECUTE {statement_name} ({placeholders})", values)
+        else:
+            cursor.execute(f"EXECUTE {statement_name}")
+
+    def _reset_prepared_statements(self, conn):
+        """
+        Descarta statements preparados da conexão após um erro.
+
+        O próximo uso prepara novamente (ex: após DDL, troca de sessão no
+        pooler ou statement com nome duplicado).
+        """
+        conn_prepared = getattr(conn, 'prepared_statements', None)
+        if conn_prepared is None:
+            return
+
+        conn_prepared.clear()
+        if conn.closed:
+            return
+
+        try:
+            if not conn.autocommit:
+                conn.rollback()
+            with conn.cursor() as cursor:
+                cursor.execute("DEALLOCATE ALL")
+        except psycopg2.Error:
+            pass
+
+    def _number_named_params(self, query: str) -> Tuple[str, List[str]]:
+        """
+        Converte named parameters (:name) para numerados ($1, $2, ...).
+
+        Resultado memorizado por texto da query.
+
+        Returns:
+            Tupla (query_numerada, nomes na ordem dos números)
+        """
+        cached = self._conversions.get(query)
+        if cached is not None:
+            return cached
+
+        param_names: List[str] = []
+
+        def _replace(match):
+            name = match.group(1)
+            if name not in param_names:
+                param_names.append(name)
+            return f"${param_names.index(name) + 1}"
+
+        cached = (NAMED_PARAM_PATTERN.sub(_replace, query), param_names)
+
+        with self._conversions_lock:
+            if len(self._conversions) >= self.MAX_CACHED_CONVERSIONS:
+                self._conversions.clear()
+            self._conversions[query] = cached
+
+        return cached
+
+    @staticmethod
+    def _adapt_param(value: Any) -> Any:
+        """
+        Adapta listas para literal de array do PostgreSQL ('{"a","b"}').
+
+        O literal não tem tipo definido, então o PostgreSQL o converte para o
+        tipo do array esperado pela coluna (text[], integer[], ...), como
+        acontecia com IN ('a', 'b').
+        """
+        if not isinstance(value, (list, tuple)):
+            return value
+
+        items = []
+        for item in value:
+            if item is None:
+                items.append('NULL')
+            else:
+                item = str(item).replace('\\', '\\\\').replace('"', '\\"')
+                items.append(f'"{item}"')
+
+        return '{' + ','.join(items) + '}'
+
     def _parse_table_identifier(self, tabela: str) -> tuple:
         """
         Parse table identifier handling quoted names.
@@ -224,6 +509,9 @@ class PostgresExecutor(DatabaseInterface):
 
     def close(self):
         """Fecha connection pool e libera recursos"""
+        if self._fanout_pool:
+            self._fanout_pool.shutdown(wait=True)
+            self._fanout_pool = None
         if self._pool:
             self._pool.closeall()
 
@@ -238,17 +526,14 @@ class PostgresExecutor(DatabaseInterface):
         Returns:
             Tupla (query_converted, params_list)
         """
-        import re
-
-        # Encontra todos os :param_name
-        pattern = r':(\w+)'
-        param_names = re.findall(pattern, query)
+        # Encontra todos os :param_name (ignorando casts ::tipo)
+        param_names = NAMED_PARAM_PATTERN.findall(query)
 
         # Substitui :param por %s
-        query_converted = re.sub(pattern, '%s', query)
+        query_converted = NAMED_PARAM_PATTERN.sub('%s', query)
 
         # Cria lista de valores na ordem dos parâmetros
-        params_list = [params.get(name) for name in param_names]
+        params_list = [self._adapt_param(params.get(name)) for name in param_names]
 
         return query_converted, params_list
 
@@ -3,5 +3,6 @@ Factories - Criacao de componentes com dependencias injetadas
 """
 
 from .component_factory import ComponentFactory
+from .container import ComponentContainer, get_container
 
-__all__ = ['ComponentFactory']
+__all__ = ['ComponentFactory', 'ComponentContainer', 'get_container']
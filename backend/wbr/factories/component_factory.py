@@ -5,7 +5,12 @@ ComponentFactory - Factory para criar componentes WBR com dependências injetada
 import os
 from django.conf import settings
 
-from wbr.services import ConfigLoader, QueryBuilder, DataProcessor, WBRService, StructuredLogger, NullLogger
+from wbr.services import ConfigLoader, ConfigRegistry, QueryBuilder, DataProcessor, WBRService, StructuredLogger, NullLogger
+from wbr.services.data_version import DataVersionTracker
+from wbr.services.instagram_rollups import InstagramRollups
+from wbr.services.page_executor import PageExecutor
+from wbr.services.rgm_filtros_index import RgmFiltrosIndex
+from wbr.services.vectorized_data_processor import VectorizedDataProcessor
 from wbr.database import PostgresExecutor
 from wbr.cache import RedisCache, NullCache, MemoryCache
 
@@ -17,10 +22,15 @@ class ComponentFactory:
     """
 
     @staticmethod
-    def create_database_executor():
+    def create_database_executor(timeout: int = None, pool_size: int = None):
         """
         Cria executor de banco de dados baseado em settings.
 
+        Args:
+            timeout: Timeout de queries em segundos (default: WBR_QUERY_TIMEOUT;
+                     0 = sem limite, ex: manutenção dos rollups do Instagram)
+            pool_size: Conexões do pool (default: WBR_DB_POOL_SIZE)
+
         Returns:
             PostgresExecutor configurado
         """
@@ -31,13 +41,17 @@ class ComponentFactory:
             # Fallback: constrói a partir de DATABASE_URL do env
             db_url = os.environ.get('DATABASE_URL')
 
-        pool_size = getattr(settings, 'WBR_DB_POOL_SIZE', 20)
-        timeout = getattr(settings, 'WBR_QUERY_TIMEOUT', 30)
+        if pool_size is None:
+            pool_size = getattr(settings, 'WBR_DB_POOL_SIZE', 20)
+        if timeout is None:
+            timeout = getattr(settings, 'WBR_QUERY_TIMEOUT', 30)
+        prepared_statements = getattr(settings, 'WBR_DB_PREPARED_STATEMENTS', True)
 
         return PostgresExecutor(
             connection_string=db_url,
             pool_size=pool_size,
-            timeout=timeout
+            timeout=timeout,
+            prepared_statements=prepared_statements
         )
 
     @staticmethod
@@ -69,6 +83,23 @@ class ComponentFactory:
         # Cache desabilitado
         return NullCache()
 
+    @staticmethod
+    def create_data_processor(calendar=None):
+        """
+        Cria processador de dados WBR baseado em settings.
+
+        Args:
+            calendar: DateCalendar compartilhado (opcional)
+
+        Returns:
+            - VectorizedDataProcessor se WBR_DATA_PROCESSOR=numpy (padrão)
+            - DataProcessor se WBR_DATA_PROCESSOR=python
+        """
+        engine = getattr(settings, 'WBR_DATA_PROCESSOR', 'numpy')
+        if engine == 'numpy':
+            return VectorizedDataProcessor(calendar=calendar)
+        return DataProcessor(calendar=calendar)
+
     @staticmethod
     def create_logger():
         """
@@ -86,6 +117,97 @@ class ComponentFactory:
             format_type=log_format
         )
 
+    @staticmethod
+    def create_config_registry(logger=None):
+        """
+        Cria registro de configurações com hot reload baseado em settings.
+
+        Args:
+            logger: Logger estruturado (opcional)
+
+        Returns:
+            ConfigRegistry (ainda vazio; chame preload() para carregar tudo)
+        """
+        reload_interval = getattr(settings, 'WBR_CONFIG_RELOAD_INTERVAL', 5)
+
+        return ConfigRegistry(reload_interval=reload_interval, logger=logger)
+
+    @staticmethod
+    def create_instagram_rollups(db_executor, logger=None):
+        """
+        Cria acesso aos rollups do Instagram baseado em settings.
+
+        Args:
+            db_executor: Executor de banco de dados
+            logger: Logger estruturado (opcional)
+
+        Returns:
+            InstagramRollups (leitura desativada se WBR_INSTAGRAM_ROLLUPS=false;
+            ignorados se a atualização mais antiga passar de
+            WBR_INSTAGRAM_ROLLUP_MAX_AGE segundos)
+        """
+        enabled = getattr(settings, 'WBR_INSTAGRAM_ROLLUPS', True)
+        max_age = getattr(settings, 'WBR_INSTAGRAM_ROLLUP_MAX_AGE', 86400)
+
+        return InstagramRollups(db_executor, enabled=enabled, max_age=max_age, logger=logger)
+
+    @staticmethod
+    def create_data_version(db_executor, logger=None):
+        """
+        Cria verificador de versão dos dados baseado em settings.
+
+        Args:
+            db_executor: Executor de banco de dados
+            logger: Logger estruturado (opcional)
+
+        Returns:
+            DataVersionTracker (catálogo consultado a cada WBR_DATA_VERSION_INTERVAL segundos)
+        """
+        check_interval = getattr(settings, 'WBR_DATA_VERSION_INTERVAL', 30)
+
+        return DataVersionTracker(db_executor, check_interval=check_interval, logger=logger)
+
+    @staticmethod
+    def create_page_executor(db_executor, logger=None):
+        """
+        Cria executor das queries de uma página baseado em settings.
+
+        O número de workers vem de WBR_PAGE_CONCURRENCY ou, se 0, metade da
+        capacidade do connection pool; nunca ocupa o pool inteiro, para que
+        os demais endpoints continuem com conexões livres.
+
+        Args:
+            db_executor: Executor de banco de dados
+            logger: Logger estruturado (opcional)
+
+        Returns:
+            PageExecutor
+        """
+        capacity = db_executor.max_connections
+        concurrency = getattr(settings, 'WBR_PAGE_CONCURRENCY', 0) or capacity // 2
+        max_workers = max(1, min(concurrency, capacity - 1))
+
+        return PageExecutor(max_workers=max_workers, logger=logger)
+
+    @staticmethod
+    def create_rgm_filtros_index(db_executor, data_version, logger=None):
+        """
+        Cria índice em memória de Rgm_filtros baseado em settings.
+
+        Args:
+            db_executor: Executor de banco de dados
+            data_version: DataVersionTracker
+            logger: Logger estruturado (opcional)
+
+        Returns:
+            RgmFiltrosIndex (semi-join acima de WBR_RGM_SEMIJOIN_THRESHOLD chaves)
+        """
+        semijoin_threshold = getattr(settings, 'WBR_RGM_SEMIJOIN_THRESHOLD', 100)
+
+        return RgmFiltrosIndex(
+            db_executor, data_version, semijoin_threshold=semijoin_threshold, logger=logger
+        )
+
     @staticmethod
     def create_wbr_service():
         """
@@ -96,11 +218,17 @@ class ComponentFactory:
         Returns:
             WBRService completamente configurado
         """
+        db_executor = ComponentFactory.create_database_executor()
+        logger = ComponentFactory.create_logger()
+
         return WBRService(
             config_loader=ConfigLoader(),
             query_builder=QueryBuilder(),
-            db_executor=ComponentFactory.create_database_executor(),
-            data_processor=DataProcessor(),
+            db_executor=db_executor,
+            data_processor=ComponentFactory.create_data_processor(),
             cache=ComponentFactory.create_cache(),
-            logger=ComponentFactory.create_logger()
+            logger=logger,
+            single_scan=getattr(settings, 'WBR_SINGLE_SCAN', True),
+            sql_pushdown=getattr(settings, 'WBR_SQL_PUSHDOWN', True),
+            page_executor=ComponentFactory.create_page_executor(db_executor, logger)
         )
@@ -0,0 +1,264 @@
+"""
+ComponentContainer - Container de componentes WBR com ciclo de vida do processo
+
+Diferente do ComponentFactory (que cria objetos novos a cada chamada), o
+container cria cada componente uma única vez por processo e o reutiliza em
+todas as requisições: um único connection pool, um único cache, um único
+logger e um conjunto fixo de query builders por worker.
+
+Fork-safety (gunicorn --preload):
+- Os componentes são criados sob demanda (lazy), portanto o processo master
+  não abre conexões ao importar a aplicação.
+- Após um fork, o processo filho descarta os componentes herdados e cria os
+  seus próprios na primeira requisição (os.register_at_fork + verificação de PID).
+  Apenas componentes sem conexões (FORK_SAFE) são herdados.
+- Ao encerrar o processo, shutdown() fecha o pool e libera recursos.
+"""
+
+import atexit
+import os
+import threading
+from typing import Any, Callable, Dict
+
+from django.conf import settings
+
+from wbr.factories.component_factory import ComponentFactory
+from wbr.services import ConfigRegistry, QueryBuilder, DataProcessor, WBRService
+from wbr.services.columnar_encoder import ColumnarEncoder
+from wbr.services.data_version import DataVersionTracker
+from wbr.services.date_calendar import DateCalendar
+from wbr.services.facet_engine import FacetEngine
+from wbr.services.instagram_query_builder import InstagramQueryBuilder
+from wbr.services.instagram_kpi_engine import InstagramKPIEngine
+from wbr.services.instagram_rollups import InstagramRollups
+from wbr.services.instagram_top_posts import InstagramTopPosts
+from wbr.services.page_executor import PageExecutor
+from wbr.services.rgm_cto_percentual_query_builder import RgmCtoPercentualQueryBuilder
+from wbr.services.rgm_filtros_index import RgmFiltrosIndex
+
+
+class ComponentContainer:
+    """
+    Container de componentes compartilhados durante toda a vida do processo.
+
+    Uso:
+        container = get_container()
+        service = container.get_wbr_service()
+        db_executor = container.get_database_executor()
+    """
+
+    # Query builders disponíveis, indexados pelo tipo de template
+    QUERY_BUILDERS = {
+        'padrao': QueryBuilder,
+        'instagram': InstagramQueryBuilder,
+        'cto_percentual': RgmCtoPercentualQueryBuilder,
+    }
+
+    # Componentes sem conexões abertas, que podem ser herdados com segurança
+    # pelos workers após o fork (ex: configurações carregadas no master)
+    FORK_SAFE = frozenset({'config_registry', 'logger'})
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+        self._components: Dict[str, Any] = {}
+        # Componentes herdados do processo pai após fork.
+        # Mantidos referenciados (e nunca fechados) para que o filho não
+        # encerre conexões que pertencem ao processo pai.
+        self._inherited = []
+
+    def _get(self, name: str, builder: Callable[[], Any]) -> Any:
+        """Retorna componente existente ou cria (uma única vez) com o builder"""
+        if self._pid != os.getpid():
+            self.reset_after_fork()
+
+        component = self._components.get(name)
+        if component is None:
+            with self._lock:
+                component = self._components.get(name)
+                if component is None:
+                    component = builder()
+                    self._components[name] = component
+
+        return component
+
+    def get_database_executor(self):
+        """Executor de banco de dados (connection pool único por processo)"""
+        return self._get('db_executor', ComponentFactory.create_database_executor)
+
+    def get_cache(self):
+        """Sistema de cache compartilhado (Redis, memória ou nulo)"""
+        return self._get('cache', ComponentFactory.create_cache)
+
+    def get_logger(self):
+        """Logger estruturado (handlers configurados uma única vez)"""
+        return self._get('logger', ComponentFactory.create_logger)
+
+    def get_config_registry(self) -> ConfigRegistry:
+        """Registro de configurações compiladas (carregado no startup)"""
+        return self._get(
+            'config_registry',
+            lambda: ComponentFactory.create_config_registry(logger=self.get_logger())
+        )
+
+    def get_data_version(self) -> DataVersionTracker:
+        """Versão dos dados das dimensões (recarga dos índices em memória)"""
+        return self._get('data_version', lambda: ComponentFactory.create_data_version(
+            db_executor=self.get_database_executor(),
+            logger=self.get_logger()
+        ))
+
+    def get_rgm_filtros_index(self) -> RgmFiltrosIndex:
+        """Índice em memória de Rgm_filtros (ramo/categoria/loja -> chaves)"""
+        return self._get('rgm_filtros_index', lambda: ComponentFactory.create_rgm_filtros_index(
+            db_executor=self.get_database_executor(),
+            data_version=self.get_data_version(),
+            logger=self.get_logger()
+        ))
+
+    def get_date_calendar(self) -> DateCalendar:
+        """Calendário de dim_data (rótulos ISO 8601 e lista de datas serializada)"""
+        return self._get('date_calendar', lambda: DateCalendar(
+            db_executor=self.get_database_executor(),
+            data_version=self.get_data_version(),
+            logger=self.get_logger(),
+        ))
+
+    def get_facet_engine(self) -> FacetEngine:
+        """Opções de filtros a partir das dimensões em memória"""
+        return self._get('facet_engine', lambda: FacetEngine(
+            db_executor=self.get_database_executor(),
+            rgm_index=self.get_rgm_filtros_index(),
+            calendar=self.get_date_calendar(),
+            data_version=self.get_data_version(),
+            logger=self.get_logger(),
+        ))
+
+    def get_instagram_rollups(self) -> InstagramRollups:
+        """Rollups do Instagram (disponibilidade verificada periodicamente)"""
+        return self._get('instagram_rollups', lambda: ComponentFactory.create_instagram_rollups(
+            db_executor=self.get_database_executor(),
+            logger=self.get_logger()
+        ))
+
+    def get_instagram_kpi_engine(self) -> InstagramKPIEngine:
+        """KPIs do Instagram com linhas diárias do mês em cache"""
+        return self._get('instagram_kpi_engine', lambda: InstagramKPIEngine(
+            db_executor=self.get_database_executor(),
+            query_builder=self.get_query_builder('instagram'),
+            cache=self.get_cache(),
+            data_version=self.get_data_version(),
+            cache_ttl=getattr(settings, 'WBR_CACHE_TTL', 3600),
+            logger=self.get_logger(),
+        ))
+
+    def get_instagram_top_posts(self) -> InstagramTopPosts:
+        """Ranking de posts do Instagram (ig_top_post ou tabelas da ingestão)"""
+        return self._get('instagram_top_posts', lambda: InstagramTopPosts(
+            db_executor=self.get_database_executor(),
+            rollups=self.get_instagram_rollups(),
+            logger=self.get_logger(),
+        ))
+
+    def get_page_executor(self) -> PageExecutor:
+        """Thread pool das queries de páginas (limitado pelo connection pool)"""
+        return self._get('page_executor', lambda: ComponentFactory.create_page_executor(
+            db_executor=self.get_database_executor(),
+            logger=self.get_logger()
+        ))
+
+    def get_data_processor(self) -> DataProcessor:
+        """Processador de dados WBR (Python ou NumPy, ver WBR_DATA_PROCESSOR)"""
+        return self._get('data_processor', lambda: ComponentFactory.create_data_processor(
+            calendar=self.get_date_calendar()
+        ))
+
+    def get_columnar_encoder(self) -> ColumnarEncoder:
+        """Conversor das respostas para o formato colunar (?format=columnar)"""
+        return self._get('columnar_encoder', lambda: ColumnarEncoder(
+            config_loader=self.get_config_registry()
+        ))
+
+    def get_query_builder(self, kind: str = 'padrao') -> QueryBuilder:
+        """
+        Query builder para um tipo de template.
+
+        Args:
+            kind: 'padrao', 'instagram' ou 'cto_percentual'
+
+        Returns:
+            Instância compartilhada do QueryBuilder correspondente
+        """
+        builder_class = self.QUERY_BUILDERS[kind]
+        if builder_class is InstagramQueryBuilder:
+            return self._get(
+                f'query_builder:{kind}',
+                lambda: builder_class(rollups=self.get_instagram_rollups())
+            )
+        return self._get(f'query_builder:{kind}', builder_class)
+
+    def get_wbr_service(self) -> WBRService:
+        """WBRService montado com os componentes compartilhados"""
+        return self._get('wbr_service', lambda: WBRService(
+            config_loader=self.get_config_registry(),
+            query_builder=self.get_query_builder('padrao'),
+            db_executor=self.get_database_executor(),
+            data_processor=self.get_data_processor(),
+            cache=self.get_cache(),
+            logger=self.get_logger(),
+            instagram_query_builder=self.get_query_builder('instagram'),
+            cto_percentual_query_builder=self.get_query_builder('cto_percentual'),
+            single_scan=getattr(settings, 'WBR_SINGLE_SCAN', True),
+            sql_pushdown=getattr(settings, 'WBR_SQL_PUSHDOWN', True),
+            page_executor=self.get_page_executor(),
+        ))
+
+    def reset_after_fork(self):
+        """
+        Descarta componentes herdados do processo pai.
+
+        Chamado automaticamente no processo filho após fork. Os novos
+        componentes são criados sob demanda na próxima requisição.
+        """
+        # O lock pode ter sido copiado em estado "adquirido" pelo fork
+        self._lock = threading.RLock()
+        kept = {}
+        for name, component in self._components.items():
+            if name in self.FORK_SAFE:
+                kept[name] = component
+            else:
+                self._inherited.append(component)
+        self._components = kept
+        self._pid = os.getpid()
+
+    def shutdown(self):
+        """Fecha connection pool e libera recursos do processo atual"""
+        if self._pid != os.getpid():
+            # Componentes pertencem a outro processo: não fecha
+            return
+
+        with self._lock:
+            components = self._components
+            self._components = {}
+
+        for component in components.values():
+            close = getattr(component, 'close', None)
+            if callable(close):
+                try:
+                    close()
+                except Exception:
+                    pass
+
+
+_container = ComponentContainer()
+
+
+def get_container() -> ComponentContainer:
+    """Retorna o container de componentes do processo atual"""
+    return _container
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_container.reset_after_fork)
+
+atexit.register(_container.shutdown)
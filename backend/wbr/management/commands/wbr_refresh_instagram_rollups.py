@@ -0,0 +1,87 @@
+"""
+Atualiza os rollups do Instagram (último insight por post + métricas diárias)
+
+Uso:
+    python manage.py wbr_refresh_instagram_rollups --migrate   # cria tabelas (uma vez)
+    python manage.py wbr_refresh_instagram_rollups             # incremental (após cada ingestão)
+    python manage.py wbr_refresh_instagram_rollups --full --shopping SCIB
+
+As queries rodam em uma conexão própria, sem o statement_timeout das
+requisições (WBR_QUERY_TIMEOUT): índices CONCURRENTLY, backfills e --full
+em tabelas grandes passam facilmente dos 30s (ver --statement-timeout).
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wbr.exceptions import WBRException
+from wbr.factories import ComponentFactory, get_container
+from wbr.services.instagram_query_builder import InstagramQueryBuilder
+
+
+class Command(BaseCommand):
+    help = "Atualiza os rollups do Instagram a partir da marca d'água de measuredAt"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--shopping',
+            action='append',
+            choices=list(InstagramQueryBuilder.SHOPPING_SCHEMAS),
+            help='Sigla do shopping (pode ser repetido; padrão: todos)'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Descarta os rollups e reconstrói a partir de todo o histórico'
+        )
+        parser.add_argument(
+            '--migrate',
+            action='store_true',
+            help='Cria tabelas e índices dos rollups antes de atualizar'
+        )
+        parser.add_argument(
+            '--overlap-minutes',
+            type=int,
+            default=60,
+            help="Reprocessa insights até N minutos anteriores à marca d'água (padrão: 60)"
+        )
+        parser.add_argument(
+            '--statement-timeout',
+            type=int,
+            default=0,
+            help='Timeout de cada comando em segundos (padrão: 0, sem limite)'
+        )
+
+    def handle(self, *args, **options):
+        # Executor só da manutenção: uma conexão, sem o timeout das requisições
+        db_executor = ComponentFactory.create_database_executor(
+            timeout=options['statement_timeout'],
+            pool_size=1
+        )
+        rollups = ComponentFactory.create_instagram_rollups(
+            db_executor=db_executor,
+            logger=get_container().get_logger()
+        )
+
+        try:
+            if options['migrate']:
+                rollups.migrate()
+                self.stdout.write("Tabelas de rollup criadas/atualizadas")
+
+            resultados = rollups.refresh(
+                shoppings=options['shopping'],
+                full=options['full'],
+                overlap_minutes=options['overlap_minutes']
+            )
+        except WBRException as e:
+            raise CommandError(e.message)
+        finally:
+            db_executor.close()
+
+        for sigla, resultado in resultados.items():
+            self.stdout.write(
+                f"{sigla}: {resultado.get('insights', 0)} posts com insight novo, "
+                f"{resultado.get('dias', 0)} dias recalculados "
+                f"(marca d'água: {resultado.get('marca_dagua')})"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Rollups do Instagram atualizados"))
@@ -2,7 +2,8 @@
 Services - Logica de negocio do modulo WBR
 """
 
-from .config_loader import ConfigLoader
+from .config_loader import ConfigLoader, CompiledChartConfig, CompiledPageConfig
+from .config_registry import ConfigRegistry
 from .query_builder import QueryBuilder
 from .data_processor import DataProcessor
 from .wbr_service import WBRService
@@ -10,6 +11,9 @@ from .logger import StructuredLogger, NullLogger
 
 __all__ = [
     'ConfigLoader',
+    'ConfigRegistry',
+    'CompiledChartConfig',
+    'CompiledPageConfig',
     'QueryBuilder',
     'DataProcessor',
     'WBRService',
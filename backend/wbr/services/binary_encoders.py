@@ -0,0 +1,137 @@
+"""
+Codificações binárias das respostas WBR (negociadas pelo header Accept)
+
+Páginas com dezenas de séries são dominadas por floats, que o JSON
+(DjangoJSONEncoder) converte um a um em texto e o navegador converte de
+volta. Dois formatos opcionais evitam esse custo:
+
+    - application/msgpack: MessagePack do mesmo payload do JSON (floats em
+      8 bytes binários)
+    - application/vnd.apache.arrow.stream: Arrow IPC, um record batch por
+      gráfico com as colunas (grafico_id, periodo, bucket, data, valor),
+      lidas no cliente como typed arrays; os demais campos de cada gráfico
+      (titulo, unidade, flags, erros) vão em JSON nos metadados do schema
+
+As bibliotecas (msgpack, pyarrow) são opcionais: sem elas o formato não é
+oferecido e a view responde 406 se o cliente não aceitar JSON.
+"""
+
+import json
+from typing import Any, Dict, Tuple
+
+import numpy as np
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import msgpack
+except ImportError:  # dependência opcional
+    msgpack = None
+
+try:
+    import pyarrow
+except ImportError:  # dependência opcional
+    pyarrow = None
+
+
+JSON_CONTENT_TYPE = 'application/json'
+MSGPACK_CONTENT_TYPE = 'application/msgpack'
+ARROW_CONTENT_TYPE = 'application/vnd.apache.arrow.stream'
+
+# Formatos na ordem de preferência do servidor (empate no Accept, ex: */*)
+CONTENT_TYPES = (JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE, ARROW_CONTENT_TYPE)
+
+# Séries WBR -> (periodo, bucket) das linhas Arrow (mesmos valores de build_pushdown)
+SERIES = {
+    'semanas_cy': ('cy', 'semana'),
+    'semanas_py': ('py', 'semana'),
+    'meses_cy': ('cy', 'mes'),
+    'meses_py': ('py', 'mes'),
+}
+
+# Dicionários das colunas periodo e bucket
+PERIODOS = ['cy', 'py']
+BUCKETS = ['semana', 'mes']
+
+_json_encoder = DjangoJSONEncoder()
+
+
+def available_content_types() -> Tuple[str, ...]:
+    """Formatos com a biblioteca instalada (JSON sempre disponível)"""
+    available = {
+        JSON_CONTENT_TYPE: True,
+        MSGPACK_CONTENT_TYPE: msgpack is not None,
+        ARROW_CONTENT_TYPE: pyarrow is not None,
+    }
+    return tuple(content_type for content_type in CONTENT_TYPES if available[content_type])
+
+
+def encode_msgpack(payload: Any) -> bytes:
+    """
+    Payload (o mesmo do JSON) em MessagePack.
+
+    Tipos sem equivalente (date, Decimal...) são convertidos como no
+    DjangoJSONEncoder.
+    """
+    return msgpack.packb(payload, use_bin_type=True, default=_json_encoder.default)
+
+
+def encode_arrow(graficos: Dict[str, Any]) -> bytes:
+    """
+    Gráficos em Arrow IPC (stream): um record batch por gráfico com dados.
+
+    As colunas da página são montadas uma única vez e cada record batch é
+    uma fatia (sem cópia); grafico_id, periodo e bucket são dictionary-encoded
+    com dicionários compartilhados por todos os batches.
+
+    Args:
+        graficos: {grafico_id: resultado WBR ou descrição de erro}
+
+    Returns:
+        Bytes do stream IPC. Metadado 'graficos' do schema: JSON
+        {grafico_id: campos do gráfico que não são séries}
+    """
+    texto = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+    metadata = {}
+    ids, periodos, buckets, labels, valores = [], [], [], [], []
+    fatias = []
+    for position, (grafico_id, payload) in enumerate(graficos.items()):
+        if not (isinstance(payload, dict) and all(serie in payload for serie in SERIES)):
+            metadata[grafico_id] = payload
+            continue
+
+        metadata[grafico_id] = {key: value for key, value in payload.items() if key not in SERIES}
+        inicio = len(labels)
+        for serie, (periodo, bucket) in SERIES.items():
+            index = payload[serie]['index']
+            metric_value = payload[serie]['metric_value']
+            periodos += [PERIODOS.index(periodo)] * len(index)
+            buckets += [BUCKETS.index(bucket)] * len(index)
+            labels += index
+            valores += [metric_value[label] for label in index]
+        ids += [position] * (len(labels) - inicio)
+        if len(labels) > inicio:
+            fatias.append((inicio, len(labels) - inicio))
+
+    schema = pyarrow.schema([
+        ('grafico_id', texto),
+        ('periodo', texto),
+        ('bucket', texto),
+        ('data', pyarrow.date32()),
+        ('valor', pyarrow.float64()),
+    ], metadata={'graficos': json.dumps(metadata, cls=DjangoJSONEncoder)})
+
+    # 'YYYY-MM-DDT00:00:00.000Z' -> datetime64[D] -> date32
+    datas = np.array([label[:10] for label in labels], dtype='datetime64[D]')
+    batch = pyarrow.record_batch([
+        pyarrow.DictionaryArray.from_arrays(pyarrow.array(ids, pyarrow.int32()), list(graficos)),
+        pyarrow.DictionaryArray.from_arrays(pyarrow.array(periodos, pyarrow.int32()), PERIODOS),
+        pyarrow.DictionaryArray.from_arrays(pyarrow.array(buckets, pyarrow.int32()), BUCKETS),
+        pyarrow.array(datas, pyarrow.date32()),
+        pyarrow.array(valores, pyarrow.float64()),
+    ], schema=schema)
+
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        for inicio, tamanho in fatias:
+            writer.write_batch(batch.slice(inicio, tamanho))
+    return sink.getvalue().to_pybytes()
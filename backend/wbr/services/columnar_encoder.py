@@ -0,0 +1,207 @@
+"""
+ColumnarEncoder - Formato colunar compacto das respostas WBR (?format=columnar)
+
+No formato padrão cada série é {"metric_value": {iso: valor}, "index": [iso]}:
+cada data aparece duas vezes por série, em quatro séries por gráfico, e uma
+página repete as mesmas datas em todos os gráficos. No formato colunar as
+datas viram eixos compartilhados pela resposta inteira e cada série é só o
+array de valores alinhado ao seu eixo:
+
+    {
+      "formato": "columnar",
+      "eixos": {
+        "semanas_cy": {"unidade": "dia", "inicio": 20089, "passo": 7, "tamanho": 42},
+        "meses_cy": {"unidade": "mes", "inicio": 660, "passo": 1, "tamanho": 10},
+        ...
+      },
+      "graficos": {
+        "vendas_gshop": {
+          "semanas_cy": {"eixo": "semanas_cy", "valores": [1572.44, null, ...]},
+          ...
+          "casas_decimais": 2, "titulo": "...", "unidade": "R$", ...
+        }
+      }
+    }
+
+A data do i-ésimo valor é inicio + i * passo, em dias desde 1970-01-01
+(unidade "dia") ou meses desde janeiro de 1970 (unidade "mes"); null indica
+bucket sem valor. Séries cujas datas não caem no eixo dos demais gráficos
+(ex: semanas fixas em uma página de semanas móveis) ganham um eixo próprio
+("semanas_cy_2", ...).
+
+Os valores são arredondados em casas_decimais: a chave "casas_decimais" da
+configuração do gráfico ou, sem ela, a dica da unidade (UNIT_DECIMALS).
+"""
+
+import math
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Séries WBR (na ordem da resposta padrão)
+SERIES = ('semanas_cy', 'semanas_py', 'meses_cy', 'meses_py')
+
+# date.toordinal() de 1970-01-01 (origem dos eixos em dias)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class ColumnarEncoder:
+    """
+    Converte resultados WBR para o formato colunar.
+
+    Uso:
+        encoder = get_container().get_columnar_encoder()
+        payload = encoder.encode_chart('vendas_gshop', resultado)
+        payload = encoder.encode_page({'vendas_gshop': resultado, ...})
+    """
+
+    FORMAT = 'columnar'
+
+    # Casas decimais pela unidade do gráfico (sem "casas_decimais" na configuração)
+    UNIT_DECIMALS = {
+        'R$': 2,
+        '%': 2,
+        'm²': 2,
+    }
+
+    # Demais unidades são contagens (pessoas, posts, curtidas...): valores inteiros
+    COUNT_DECIMALS = 0
+
+    def __init__(self, config_loader):
+        """
+        Args:
+            config_loader: ConfigLoader/ConfigRegistry (chave "casas_decimais")
+        """
+        self.config_loader = config_loader
+
+    def encode_chart(self, grafico_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Resposta de um gráfico no formato colunar.
+
+        Args:
+            grafico_id: Identificador do gráfico
+            payload: Resultado WBR (ou descrição de erro, devolvida como está)
+
+        Returns:
+            {"formato": "columnar", "eixos": {...}, <campos do gráfico>}
+        """
+        page = self.encode_page({grafico_id: payload})
+        return {'formato': page['formato'], 'eixos': page['eixos'], **page['graficos'][grafico_id]}
+
+    def encode_page(self, payloads: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Resposta de uma página no formato colunar (eixos compartilhados).
+
+        Args:
+            payloads: {grafico_id: resultado WBR ou descrição de erro}
+
+        Returns:
+            {"formato": "columnar", "eixos": {...}, "graficos": {grafico_id: ...}}
+        """
+        # eixo (série, unidade, passo, fase) -> [id, primeira posição, última posição]
+        axes: Dict[Tuple[str, str, int, int], List] = {}
+        parsed = {}
+        for grafico_id, payload in payloads.items():
+            if not self._is_wbr(payload):
+                continue
+            parsed[grafico_id] = {}
+            for serie in SERIES:
+                axis_key, positions = self._positions(serie, payload[serie]['index'])
+                if axis_key is not None:
+                    axis = axes.get(axis_key)
+                    if axis is None:
+                        count = sum(1 for key in axes if key[0] == serie)
+                        axis_id = serie if not count else f'{serie}_{count + 1}'
+                        axes[axis_key] = [axis_id, positions[0], positions[-1]]
+                    else:
+                        axis[1] = min(axis[1], positions[0])
+                        axis[2] = max(axis[2], positions[-1])
+                parsed[grafico_id][serie] = (axis_key, positions)
+
+        graficos = {}
+        for grafico_id, payload in payloads.items():
+            if grafico_id not in parsed:
+                graficos[grafico_id] = payload
+                continue
+
+            casas = self.decimals(grafico_id, payload.get('unidade', ''))
+            chart = {}
+            for serie in SERIES:
+                axis_key, positions = parsed[grafico_id][serie]
+                metric_value = payload[serie]['metric_value']
+                valores = [self._round(metric_value[label], casas) for label in payload[serie]['index']]
+                chart[serie] = self._serie(axes.get(axis_key), axis_key, positions, valores)
+            for key, value in payload.items():
+                if key not in chart:
+                    chart[key] = value
+            chart['casas_decimais'] = casas
+            graficos[grafico_id] = chart
+
+        eixos = {
+            axis_id: {'unidade': unidade, 'inicio': inicio, 'passo': passo, 'tamanho': (fim - inicio) // passo + 1}
+            for (_, unidade, passo, _), (axis_id, inicio, fim) in axes.items()
+        }
+        return {'formato': self.FORMAT, 'eixos': eixos, 'graficos': graficos}
+
+    def decimals(self, grafico_id: str, unidade: str) -> Optional[int]:
+        """
+        Casas decimais dos valores de um gráfico.
+
+        Returns:
+            "casas_decimais" da configuração, UNIT_DECIMALS[unidade],
+            COUNT_DECIMALS para outras unidades ou None (sem arredondamento)
+            se o gráfico não tiver unidade
+        """
+        config = self.config_loader.get(grafico_id).config
+        if config.get('casas_decimais') is not None:
+            return config['casas_decimais']
+        if unidade in self.UNIT_DECIMALS:
+            return self.UNIT_DECIMALS[unidade]
+        return self.COUNT_DECIMALS if unidade else None
+
+    @staticmethod
+    def _is_wbr(payload: Any) -> bool:
+        """Se o payload é um resultado WBR (e não a descrição de um erro)"""
+        return isinstance(payload, dict) and all(serie in payload for serie in SERIES)
+
+    @staticmethod
+    def _positions(serie: str, index: List[str]) -> Tuple[Optional[Tuple[str, int, int, int]], List[int]]:
+        """
+        Posições das datas (ISO 8601, ordenadas) no eixo da série.
+
+        Returns:
+            ((série, unidade, passo, fase) ou None se vazia, posições)
+        """
+        if not index:
+            return None, []
+
+        datas = [date.fromisoformat(label[:10]) for label in index]
+        if serie.startswith('meses') and all(data.day == 1 for data in datas):
+            return (serie, 'mes', 1, 0), [(data.year - 1970) * 12 + data.month - 1 for data in datas]
+
+        positions = [data.toordinal() - EPOCH_ORDINAL for data in datas]
+        fase = positions[0] % 7
+        passo = 7 if all(position % 7 == fase for position in positions) else 1
+        return (serie, 'dia', passo, fase % passo), positions
+
+    @staticmethod
+    def _serie(axis: Optional[List], axis_key, positions: List[int], valores: List[Any]) -> Dict[str, Any]:
+        """Valores de uma série alinhados ao eixo (null nos buckets sem valor)"""
+        if axis is None:
+            return {'eixo': None, 'valores': []}
+
+        axis_id, inicio, fim = axis
+        passo = axis_key[2]
+        alinhados = [None] * ((fim - inicio) // passo + 1)
+        for position, valor in zip(positions, valores):
+            alinhados[(position - inicio) // passo] = valor
+        return {'eixo': axis_id, 'valores': alinhados}
+
+    @staticmethod
+    def _round(valor: Any, casas: Optional[int]) -> Any:
+        """Valor arredondado (inteiro com 0 casas)"""
+        if casas is None or not isinstance(valor, float) or not math.isfinite(valor):
+            return valor
+        if casas == 0:
+            return int(round(valor))
+        return round(valor, casas)
@@ -4,12 +4,87 @@ ConfigLoader - Carrega e valida configurações JSON dos gráficos
 
 import json
 import os
-from typing import Dict, Any
+from dataclasses import dataclass
+from typing import Dict, Any, Tuple
 from pathlib import Path
 
 from wbr.exceptions import ConfigNotFoundException, InvalidConfigException
 
 
+# Tabelas lidas pelos templates customizados (usadas como fato derivado da configuração)
+INSTAGRAM_SOURCE_TABLES = tuple(
+    f'"instagram-data-fetch-{schema}"."{table}"'
+    for schema in ('scib', 'sbgp', 'sbi')
+    for table in ('Post', 'PostInsight')
+)
+CTO_PERCENTUAL_SOURCE_TABLES = (
+    '"mapa_do_bosque"."Rgm_cto"',
+    '"mapa_do_bosque"."Rgm_valor_bruto"',
+)
+
+
+class FrozenConfig(dict):
+    """
+    Dicionário somente leitura para configurações já validadas.
+
+    Continua sendo um dict (serializável em JSON e compatível com {**config}),
+    mas qualquer tentativa de modificação levanta TypeError.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Configuração congelada não pode ser modificada")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenConfig, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Congela recursivamente dicts (FrozenConfig) e listas (tuplas)"""
+    if isinstance(value, dict):
+        return FrozenConfig({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class CompiledChartConfig:
+    """
+    Configuração de gráfico validada, congelada e com fatos derivados.
+
+    Attributes:
+        grafico_id: Identificador do gráfico
+        config: Configuração original (somente leitura)
+        template_kind: 'padrao', 'instagram' ou 'cto_percentual'
+        source_tables: Tabelas lidas pela query do gráfico
+        is_rgm: Se o gráfico recebe filtros RGM (ramo, categoria, loja)
+        agrupamento: Agrupamento efetivo ('semanal' ou 'mensal')
+        coluna_data: Coluna de data usada no template
+        coluna_valor: Coluna de valor usada no template
+        validate_columns: Se as colunas devem ser validadas no banco
+    """
+    grafico_id: str
+    config: FrozenConfig
+    template_kind: str
+    source_tables: Tuple[str, ...]
+    is_rgm: bool
+    agrupamento: str
+    coluna_data: str
+    coluna_valor: str
+    validate_columns: bool
+
+
+@dataclass(frozen=True)
+class CompiledPageConfig:
+    """Configuração de página validada e congelada"""
+    page_id: str
+    config: FrozenConfig
+    graficos: Tuple[str, ...]
+
+
 class ConfigLoader:
     """Carrega e valida configurações de gráficos a partir de arquivos JSON"""
 
@@ -49,11 +124,81 @@ class ConfigLoader:
             ConfigNotFoundException: Se arquivo não for encontrado
             InvalidConfigException: Se JSON estiver mal formatado
         """
-        config_file = self.config_dir / f"{grafico_id}.json"
+        return self._read_json(self.config_dir / f"{grafico_id}.json", grafico_id)
+
+    def get(self, grafico_id: str) -> CompiledChartConfig:
+        """
+        Carrega, valida e compila a configuração de um gráfico.
+
+        Args:
+            grafico_id: Identificador único do gráfico
+
+        Returns:
+            CompiledChartConfig com configuração congelada e fatos derivados
+
+        Raises:
+            ConfigNotFoundException: Se arquivo não for encontrado
+            InvalidConfigException: Se configuração estiver inválida
+        """
+        config = self.load(grafico_id)
+        self.validate(config)
+        return self.compile(config)
 
+    def compile(self, config: Dict[str, Any]) -> CompiledChartConfig:
+        """
+        Congela uma configuração já validada e pré-calcula fatos derivados.
+
+        Args:
+            config: Dicionário com configuração validada
+
+        Returns:
+            CompiledChartConfig
+        """
+        frozen = freeze(config)
+        colunas = frozen.get('colunas', {})
+
+        if frozen.get('use_instagram_template', False):
+            template_kind = 'instagram'
+            source_tables = INSTAGRAM_SOURCE_TABLES
+            agrupamento = 'semanal'
+            coluna_data = colunas.get('data') or frozen.get('coluna_data', 'data')
+            coluna_valor = colunas.get('valor') or frozen.get('coluna_valor')
+        elif frozen.get('use_cto_percentual_template', False):
+            template_kind = 'cto_percentual'
+            source_tables = CTO_PERCENTUAL_SOURCE_TABLES
+            agrupamento = frozen['agrupamento']
+            coluna_data = colunas['data']
+            coluna_valor = colunas['valor']
+        else:
+            template_kind = 'padrao'
+            source_tables = (frozen['tabela'],)
+            agrupamento = frozen['agrupamento']
+            coluna_data = colunas['data']
+            coluna_valor = colunas['valor']
+
+        return CompiledChartConfig(
+            grafico_id=frozen['grafico_id'],
+            config=frozen,
+            template_kind=template_kind,
+            source_tables=source_tables,
+            is_rgm=bool(frozen.get('is_rgm', False)),
+            agrupamento=agrupamento,
+            coluna_data=coluna_data,
+            coluna_valor=coluna_valor,
+            validate_columns=template_kind == 'padrao',
+        )
+
+    def _read_json(self, config_file: Path, config_id: str) -> Dict[str, Any]:
+        """
+        Lê e faz parse de um arquivo JSON de configuração.
+
+        Raises:
+            ConfigNotFoundException: Se arquivo não for encontrado
+            InvalidConfigException: Se JSON estiver mal formatado
+        """
         if not config_file.exists():
             raise ConfigNotFoundException(
-                grafico_id=grafico_id,
+                grafico_id=config_id,
                 config_path=str(config_file)
             )
 
@@ -63,12 +208,12 @@ class ConfigLoader:
         except json.JSONDecodeError as e:
             raise InvalidConfigException(
                 message=f"Erro ao fazer parse do JSON: {str(e)}",
-                grafico_id=grafico_id
+                grafico_id=config_id
             )
         except Exception as e:
             raise InvalidConfigException(
                 message=f"Erro ao carregar configuração: {str(e)}",
-                grafico_id=grafico_id
+                grafico_id=config_id
             )
 
         return config
@@ -179,35 +324,49 @@ class ConfigLoader:
         Raises:
             ConfigNotFoundException: Se arquivo não for encontrado
         """
-        pages_dir = self.config_dir.parent / 'pages'
-        config_file = pages_dir / f"{page_id}.json"
+        config = self._read_json(self.pages_dir / f"{page_id}.json", page_id)
+        self.validate_page(config, page_id)
+        return config
 
-        if not config_file.exists():
-            raise ConfigNotFoundException(
-                grafico_id=page_id,
-                config_path=str(config_file)
-            )
+    def get_page(self, page_id: str) -> CompiledPageConfig:
+        """
+        Carrega, valida e congela a configuração de uma página.
 
-        try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-        except json.JSONDecodeError as e:
-            raise InvalidConfigException(
-                message=f"Erro ao fazer parse do JSON: {str(e)}",
-                grafico_id=page_id
-            )
+        Args:
+            page_id: Identificador da página
+
+        Returns:
+            CompiledPageConfig
+        """
+        return self.compile_page(self.load_page_config(page_id), page_id)
 
-        # Valida estrutura da página
+    def compile_page(self, config: Dict[str, Any], page_id: str) -> CompiledPageConfig:
+        """Congela uma configuração de página já validada"""
+        frozen = freeze(config)
+        return CompiledPageConfig(page_id=page_id, config=frozen, graficos=frozen['graficos'])
+
+    @property
+    def pages_dir(self) -> Path:
+        """Diretório com as configurações de páginas"""
+        return self.config_dir.parent / 'pages'
+
+    def validate_page(self, config: Dict[str, Any], page_id: str) -> bool:
+        """
+        Valida estrutura de uma configuração de página.
+
+        Raises:
+            InvalidConfigException: Se configuração estiver inválida
+        """
         if 'page_id' not in config or 'graficos' not in config:
             raise InvalidConfigException(
                 message="Configuração de página deve conter 'page_id' e 'graficos'",
                 grafico_id=page_id
             )
 
-        if not isinstance(config['graficos'], list):
+        if not isinstance(config['graficos'], (list, tuple)):
             raise InvalidConfigException(
                 message="Campo 'graficos' deve ser uma lista",
                 grafico_id=page_id
             )
 
-        return config
+        return True
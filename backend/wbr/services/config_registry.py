@@ -0,0 +1,203 @@
+"""
+ConfigRegistry - Registro compilado das configurações de gráficos e páginas
+
+Carrega, valida e congela todas as configurações uma única vez (no startup,
+via WbrConfig.ready()) e as serve a partir da memória. Um arquivo só é lido
+novamente quando o seu mtime muda (hot reload).
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from wbr.exceptions import ConfigNotFoundException, InvalidConfigException
+from wbr.services.config_loader import (
+    ConfigLoader,
+    CompiledChartConfig,
+    CompiledPageConfig,
+    FrozenConfig,
+)
+
+
+class _Entry:
+    """Item do registro: valor compilado + metadados do arquivo de origem"""
+
+    __slots__ = ('value', 'path', 'mtime_ns', 'checked_at')
+
+    def __init__(self, value: Any, path: Path, mtime_ns: int):
+        self.value = value
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.checked_at = time.monotonic()
+
+
+class ConfigRegistry(ConfigLoader):
+    """
+    ConfigLoader com cache em memória e recarga por mtime.
+
+    Mantém a mesma interface do ConfigLoader (load, validate, get,
+    load_page_config, get_page), mas nenhuma delas acessa o disco no
+    caminho quente.
+    """
+
+    def __init__(self, config_dir: str = None, reload_interval: float = 5.0, logger=None):
+        """
+        Inicializa o registro (vazio até preload() ou primeiro acesso).
+
+        Args:
+            config_dir: Diretório dos JSON de gráficos (ver ConfigLoader)
+            reload_interval: Intervalo mínimo em segundos entre verificações
+                             de mtime de um mesmo arquivo. <= 0 desativa o hot reload.
+            logger: Logger estruturado (opcional)
+        """
+        super().__init__(config_dir)
+        self.reload_interval = reload_interval
+        self.logger = logger
+        self._charts: Dict[str, _Entry] = {}
+        self._pages: Dict[str, _Entry] = {}
+        self._lock = threading.RLock()
+
+    def preload(self) -> int:
+        """
+        Carrega, valida e compila todas as configurações de gráficos e páginas.
+
+        Deve ser chamado no startup: uma configuração inválida levanta
+        exceção aqui em vez de falhar na requisição de um usuário.
+
+        Returns:
+            Número de configurações carregadas
+
+        Raises:
+            InvalidConfigException: Se alguma configuração estiver inválida
+        """
+        with self._lock:
+            for config_file in sorted(self.config_dir.glob('*.json')):
+                self._charts[config_file.stem] = self._compile_chart(config_file, config_file.stem)
+
+            if self.pages_dir.exists():
+                for config_file in sorted(self.pages_dir.glob('*.json')):
+                    self._pages[config_file.stem] = self._compile_page(config_file, config_file.stem)
+
+            # Páginas só podem referenciar gráficos existentes
+            for page_id, entry in self._pages.items():
+                missing = [gid for gid in entry.value.graficos if gid not in self._charts]
+                if missing:
+                    raise InvalidConfigException(
+                        message=f"Página referencia gráficos inexistentes: {', '.join(missing)}",
+                        grafico_id=page_id,
+                        missing_fields=missing
+                    )
+
+            return len(self._charts) + len(self._pages)
+
+    def get(self, grafico_id: str) -> CompiledChartConfig:
+        """
+        Retorna configuração compilada de um gráfico.
+
+        Raises:
+            ConfigNotFoundException: Se o gráfico não existir
+        """
+        return self._lookup(
+            self._charts, grafico_id, self.config_dir / f"{grafico_id}.json", self._compile_chart
+        )
+
+    def get_page(self, page_id: str) -> CompiledPageConfig:
+        """
+        Retorna configuração compilada de uma página.
+
+        Raises:
+            ConfigNotFoundException: Se a página não existir
+        """
+        return self._lookup(
+            self._pages, page_id, self.pages_dir / f"{page_id}.json", self._compile_page
+        )
+
+    def load(self, grafico_id: str) -> FrozenConfig:
+        """Configuração (somente leitura) de um gráfico"""
+        return self.get(grafico_id).config
+
+    def validate(self, config: Dict[str, Any]) -> bool:
+        """Configurações do registro já foram validadas na compilação"""
+        if isinstance(config, FrozenConfig):
+            return True
+        return super().validate(config)
+
+    def load_page_config(self, page_id: str) -> FrozenConfig:
+        """Configuração (somente leitura) de uma página"""
+        return self.get_page(page_id).config
+
+    def _lookup(self, entries: Dict[str, _Entry], key: str, path: Path, compiler: Callable) -> Any:
+        """Busca item no registro, recarregando o arquivo se o mtime mudou"""
+        entry = entries.get(key)
+
+        if entry is not None:
+            if self.reload_interval <= 0 or time.monotonic() - entry.checked_at < self.reload_interval:
+                return entry.value
+            return self._revalidate(entries, key, entry, compiler)
+
+        # Arquivo novo (criado após o preload)
+        with self._lock:
+            entry = entries.get(key)
+            if entry is None:
+                entry = compiler(path, key)
+                entries[key] = entry
+            return entry.value
+
+    def _revalidate(self, entries: Dict[str, _Entry], key: str, entry: _Entry, compiler: Callable) -> Any:
+        """Compara mtime do arquivo e recompila se necessário"""
+        with self._lock:
+            entry.checked_at = time.monotonic()
+
+            try:
+                mtime_ns = os.stat(entry.path).st_mtime_ns
+            except FileNotFoundError:
+                entries.pop(key, None)
+                raise ConfigNotFoundException(grafico_id=key, config_path=str(entry.path))
+
+            if mtime_ns == entry.mtime_ns:
+                return entry.value
+
+            try:
+                new_entry = compiler(entry.path, key)
+            except (ConfigNotFoundException, InvalidConfigException) as e:
+                # Mantém a última versão válida; tenta novamente no próximo mtime
+                entry.mtime_ns = mtime_ns
+                if self.logger:
+                    self.logger.warning("Configuração alterada é inválida, mantendo versão anterior", {
+                        'config_id': key,
+                        'error': e.message,
+                    })
+                return entry.value
+
+            entries[key] = new_entry
+            return new_entry.value
+
+    def _compile_chart(self, config_file: Path, grafico_id: str) -> _Entry:
+        """Lê, valida e compila um JSON de gráfico"""
+        mtime_ns = self._stat_mtime(config_file, grafico_id)
+        config = self._read_json(config_file, grafico_id)
+        self.validate(config)
+
+        if config['grafico_id'] != grafico_id:
+            raise InvalidConfigException(
+                message=f"grafico_id '{config['grafico_id']}' não corresponde ao nome do arquivo",
+                grafico_id=grafico_id
+            )
+
+        return _Entry(self.compile(config), config_file, mtime_ns)
+
+    def _compile_page(self, config_file: Path, page_id: str) -> _Entry:
+        """Lê, valida e congela um JSON de página"""
+        mtime_ns = self._stat_mtime(config_file, page_id)
+        config = self._read_json(config_file, page_id)
+        self.validate_page(config, page_id)
+        return _Entry(self.compile_page(config, page_id), config_file, mtime_ns)
+
+    def _stat_mtime(self, config_file: Path, config_id: str) -> int:
+        """mtime do arquivo em nanossegundos"""
+        try:
+            return os.stat(config_file).st_mtime_ns
+        except FileNotFoundError:
+            raise ConfigNotFoundException(grafico_id=config_id, config_path=str(config_file))
@@ -1,6 +1,6 @@
 """
 DataProcessor - Transforma dados brutos em formato WBR completo
-Agrupa por semana/mês, converte datas para ISO 8601, calcula flags parciais
+Agrupa por semana/mês, converte datas para ISO 8601 (via DateCalendar), calcula flags parciais
 """
 
 from datetime import datetime, date, timedelta
@@ -8,11 +8,20 @@ from typing import List, Dict, Any
 from collections import defaultdict
 
 from wbr.exceptions import DataTransformationException
+from wbr.services.date_calendar import DateCalendar
 
 
 class DataProcessor:
     """Processa e transforma dados brutos para formato WBR"""
 
+    def __init__(self, calendar: DateCalendar = None):
+        """
+        Args:
+            calendar: Calendário de dim_data (rótulos ISO 8601 pré-calculados).
+                      Sem calendário, usa um próprio, sem banco.
+        """
+        self.calendar = calendar if calendar is not None else DateCalendar()
+
     def transform_to_wbr(
         self,
         dados_cy: List[Dict[str, Any]],
@@ -58,15 +67,7 @@ class DataProcessor:
             # Agrupa dados por semana
             if usar_semana_movel and data_referencia:
                 semanas_cy = self.group_by_rolling_week(dados_cy, data_referencia)
-
-                # Calcula data do ano anterior (trata ano bissexto)
-                try:
-                    data_ref_py = date(data_referencia.year - 1, data_referencia.month, data_referencia.day)
-                except ValueError:
-                    # 29 de fevereiro em ano não bissexto -> usa 28 de fevereiro
-                    data_ref_py = date(data_referencia.year - 1, data_referencia.month, 28)
-
-                semanas_py = self.group_by_rolling_week(dados_py, data_ref_py)
+                semanas_py = self.group_by_rolling_week(dados_py, self._reference_py(data_referencia))
             else:
                 semanas_cy = self.group_by_week(dados_cy)
                 semanas_py = self.group_by_week(dados_py)
@@ -97,6 +98,122 @@ class DataProcessor:
                 data_sample={'cy_count': len(dados_cy), 'py_count': len(dados_py)}
             )
 
+    def transform_tagged_to_wbr(
+        self,
+        dados: List[Dict[str, Any]],
+        agrupamento: str,
+        ano_atual: int,
+        ano_anterior: int,
+        data_referencia: date = None,
+        usar_semana_movel: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Transforma resultado de varredura única (CY + PY na mesma lista).
+
+        Cada linha possui a coluna 'periodo' ('cy' ou 'py'), gerada por
+        QueryBuilder.build_single_scan. As linhas são separadas mantendo a
+        ordem original e o restante segue transform_to_wbr.
+
+        Args:
+            dados: Lista de {periodo, data, valor}
+            demais: ver transform_to_wbr
+
+        Returns:
+            Dicionário no formato WBR
+        """
+        dados_cy, dados_py = self.split_periods(dados)
+
+        return self.transform_to_wbr(
+            dados_cy=dados_cy,
+            dados_py=dados_py,
+            agrupamento=agrupamento,
+            ano_atual=ano_atual,
+            ano_anterior=ano_anterior,
+            data_referencia=data_referencia,
+            usar_semana_movel=usar_semana_movel
+        )
+
+    def transform_aggregated_to_wbr(
+        self,
+        dados: List[Dict[str, Any]],
+        ano_atual: int,
+        ano_anterior: int
+    ) -> Dict[str, Any]:
+        """
+        Transforma resultado já agregado no banco (QueryBuilder.build_pushdown).
+
+        Cada linha é {periodo, bucket, data, valor}, com bucket 'semana'
+        (data = último dia da semana móvel) ou 'mes' (data = primeiro dia do
+        mês). Os valores são usados como vieram; só as datas são convertidas
+        para ISO 8601.
+
+        Args:
+            dados: Lista de {periodo, bucket, data, valor}
+            ano_atual: Ano atual (ex: 2025)
+            ano_anterior: Ano anterior (ex: 2024)
+
+        Returns:
+            Dicionário no formato WBR (mesmo de transform_to_wbr)
+
+        Raises:
+            DataTransformationException: Se houver erro na transformação
+        """
+        try:
+            series = {
+                ('cy', 'semana'): {},
+                ('py', 'semana'): {},
+                ('cy', 'mes'): {},
+                ('py', 'mes'): {},
+            }
+
+            label = self.calendar.label
+            for row in dados:
+                data = row['data']
+                data_iso = label(data if type(data) is date else self._parse_date(data))
+                series[(row['periodo'], row['bucket'])][data_iso] = float(row['valor'])
+
+            flags = self.calculate_partial_flags([], [])
+
+            return {
+                "semanas_cy": self._format_metric_data(series[('cy', 'semana')]),
+                "semanas_py": self._format_metric_data(series[('py', 'semana')]),
+                "meses_cy": self._format_metric_data(series[('cy', 'mes')]),
+                "meses_py": self._format_metric_data(series[('py', 'mes')]),
+                "ano_atual": ano_atual,
+                "ano_anterior": ano_anterior,
+                **flags
+            }
+
+        except Exception as e:
+            raise DataTransformationException(
+                message=f"Erro ao transformar dados agregados: {str(e)}",
+                data_sample={'row_count': len(dados)}
+            )
+
+    def split_periods(self, dados: List[Dict[str, Any]]) -> tuple:
+        """
+        Separa linhas marcadas com a coluna 'periodo' em (dados_cy, dados_py).
+
+        Raises:
+            DataTransformationException: Se alguma linha tiver período desconhecido
+        """
+        dados_cy = []
+        dados_py = []
+
+        for row in dados:
+            periodo = row.get('periodo')
+            if periodo == 'cy':
+                dados_cy.append(row)
+            elif periodo == 'py':
+                dados_py.append(row)
+            else:
+                raise DataTransformationException(
+                    message=f"Período desconhecido na linha: {periodo!r}",
+                    data_sample={'row': {k: str(v) for k, v in row.items()}}
+                )
+
+        return dados_cy, dados_py
+
     def group_by_week(self, dados: List[Dict[str, Any]]) -> Dict[str, float]:
         """
         Agrupa dados por semana (domingo como início).
@@ -114,7 +231,7 @@ class DataProcessor:
             data_obj = self._parse_date(row['data'])
 
             # Encontra domingo da semana (início da semana)
-            days_since_sunday = (data_obj.weekday() + 1) % 7
+            days_since_sunday = (self.calendar.day(data_obj).weekday + 1) % 7
             week_start = data_obj - timedelta(days=days_since_sunday)
 
             # Converte para ISO 8601 UTC
@@ -196,11 +313,8 @@ class DataProcessor:
             # Converte data para objeto date
             data_obj = self._parse_date(row['data'])
 
-            # Primeiro dia do mês
-            month_start = date(data_obj.year, data_obj.month, 1)
-
-            # Converte para ISO 8601 UTC
-            month_start_iso = self._to_iso8601(month_start)
+            # Primeiro dia do mês, já em ISO 8601 UTC
+            month_start_iso = self.calendar.day(data_obj).month
 
             # Soma valores do mesmo mês
             monthly_data[month_start_iso] += float(row['valor'])
@@ -246,6 +360,17 @@ class DataProcessor:
             "mes_parcial_py": mes_parcial_py
         }
 
+    def _reference_py(self, data_referencia: date) -> date:
+        """
+        Data de referência no ano anterior (fim da semana móvel mais recente do PY).
+
+        29 de fevereiro em ano não bissexto -> usa 28 de fevereiro
+        """
+        try:
+            return date(data_referencia.year - 1, data_referencia.month, data_referencia.day)
+        except ValueError:
+            return date(data_referencia.year - 1, data_referencia.month, 28)
+
     def _format_metric_data(self, data: Dict[str, float]) -> Dict[str, Any]:
         """
         Formata dados no formato esperado pelo frontend.
@@ -304,15 +429,15 @@ class DataProcessor:
         """
         Converte date para ISO 8601 UTC.
 
+        O rótulo vem do calendário (calculado uma vez por data no processo).
+
         Args:
             data_obj: Objeto date
 
         Returns:
-            String no formato "YYYY-MM-DDTHH:MM:SS.000Z"
+            String no formato "YYYY-MM-DDTHH:MM:SS.000Z" (hora 00:00:00 UTC)
         """
-        # Converte para datetime com hora 00:00:00 UTC
-        dt = datetime.combine(data_obj, datetime.min.time())
-        return dt.isoformat() + '.000Z'
+        return self.calendar.label(data_obj)
 
     def _get_last_day_of_month(self, data: date) -> date:
         """
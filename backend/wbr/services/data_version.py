@@ -0,0 +1,93 @@
+"""
+DataVersionTracker - Versão dos dados de tabelas do PostgreSQL
+
+Índices em memória construídos a partir de tabelas pequenas (ex:
+Rgm_filtros) só precisam ser reconstruídos quando a tabela muda. A versão
+de uma tabela é lida do catálogo, sem ler a tabela:
+
+    - pg_relation_filenode: muda em TRUNCATE, VACUUM FULL e recriação
+    - n_tup_ins/n_tup_upd/n_tup_del de pg_stat_user_tables: mudam a cada
+      INSERT/UPDATE/DELETE (estatísticas publicadas em alguns segundos;
+      exige track_counts, ativo por padrão)
+
+A consulta ao catálogo é feita no máximo uma vez a cada check_interval
+segundos por tabela.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class DataVersionTracker:
+    """
+    Versões de tabelas com verificação periódica.
+
+    Uso:
+        data_version = get_container().get_data_version()
+        versao = data_version.version('"mapa_do_bosque"."Rgm_filtros"')
+        if versao != versao_do_indice:
+            ...  # reconstrói o índice
+    """
+
+    VERSION_QUERY = """
+        SELECT
+            pg_relation_filenode(C.oid) AS filenode,
+            COALESCE(S.n_tup_ins, 0) AS inseridas,
+            COALESCE(S.n_tup_upd, 0) AS atualizadas,
+            COALESCE(S.n_tup_del, 0) AS removidas
+        FROM pg_class AS C
+        LEFT JOIN pg_stat_user_tables AS S ON S.relid = C.oid
+        WHERE C.oid = to_regclass(:tabela)
+    """
+
+    def __init__(self, db_executor, check_interval: float = 30.0, logger=None):
+        """
+        Args:
+            db_executor: Executor de queries
+            check_interval: Segundos entre consultas ao catálogo para uma
+                            mesma tabela. <= 0 consulta a cada chamada.
+            logger: Logger estruturado (opcional)
+        """
+        self.db_executor = db_executor
+        self.check_interval = check_interval
+        self.logger = logger
+        # tabela -> (versão, instante da verificação)
+        self._versions: Dict[str, Tuple[Optional[tuple], float]] = {}
+        self._lock = threading.Lock()
+
+    def version(self, table: str) -> Optional[tuple]:
+        """
+        Versão atual dos dados da tabela.
+
+        Args:
+            table: Nome qualificado (ex: '"mapa_do_bosque"."Rgm_filtros"')
+
+        Returns:
+            Tupla comparável por igualdade, ou None se a tabela não existir
+        """
+        cached = self._versions.get(table)
+        if cached is not None and time.monotonic() - cached[1] < self.check_interval:
+            return cached[0]
+
+        with self._lock:
+            cached = self._versions.get(table)
+            if cached is None or time.monotonic() - cached[1] >= self.check_interval:
+                rows = self.db_executor.execute(self.VERSION_QUERY, {'tabela': table})
+                version = tuple(rows[0].values()) if rows else None
+
+                if self.logger and cached is not None and cached[0] != version:
+                    self.logger.info("Versão dos dados alterada", {'tabela': table})
+
+                cached = (version, time.monotonic())
+                self._versions[table] = cached
+
+        return cached[0]
+
+    def invalidate(self, table: Optional[str] = None):
+        """Força nova consulta ao catálogo (de uma tabela ou de todas)"""
+        with self._lock:
+            if table is None:
+                self._versions.clear()
+            else:
+                self._versions.pop(table, None)
@@ -0,0 +1,179 @@
+"""
+DateCalendar - Calendário do processo a partir de "mapa_do_bosque"."dim_data"
+
+O conjunto de datas usado pelos gráficos é pequeno e o mesmo em todas as
+páginas, mas cada linha de cada gráfico formatava a sua data em ISO 8601
+(datetime.combine(...).isoformat() + '.000Z') e os endpoints de datas
+reliam e reformatavam dim_data inteira a cada chamada.
+
+Aqui cada data tem um CalendarDay montado uma única vez por processo:
+
+    - label: 'YYYY-MM-DDT00:00:00.000Z' (string internada, compartilhada
+      por todos os gráficos e pelo cache)
+    - ordinal: date.toordinal() (aritmética de semanas móveis)
+    - month: label do primeiro dia do mês
+    - weekday: date.weekday()
+
+Os atributos de uma data são calculados em Python na primeira vez que ela
+aparece e reutilizados: o label de uma data nunca muda, só o conjunto de
+datas da dimensão. A transformação dos gráficos não consulta o banco.
+
+A lista de datas de dim_data (dates/dates_json) é carregada na primeira
+chamada e recarregada quando a versão dos dados da tabela muda
+(DataVersionTracker), junto com o JSON de /available-dates/.
+"""
+
+import json
+import sys
+import threading
+from datetime import date, datetime
+from typing import Dict, NamedTuple, Optional, Tuple
+
+
+class CalendarDay(NamedTuple):
+    """Atributos pré-calculados de uma data"""
+
+    label: str
+    ordinal: int
+    month: str
+    weekday: int
+
+
+def _iso_label(value: date) -> str:
+    """Data em ISO 8601 UTC à meia-noite (formato de DataProcessor._to_iso8601)"""
+    return sys.intern(f'{value.isoformat()}T00:00:00.000Z')
+
+
+class _Snapshot:
+    """Datas de dim_data em uma versão da tabela"""
+
+    __slots__ = ('version', 'dates', 'dates_json')
+
+    def __init__(self, version: Optional[tuple], dates: Tuple[date, ...]):
+        self.version = version
+        # Mais recente primeiro, em YYYY-MM-DD
+        self.dates = tuple(value.isoformat() for value in dates)
+        # Corpo de /available-dates/ (mesmo JSON de JsonResponse)
+        self.dates_json = json.dumps({'dates': list(self.dates), 'count': len(self.dates)}).encode('utf-8')
+
+
+class DateCalendar:
+    """
+    Datas de dim_data e atributos de cada data, compartilhados pelo processo.
+
+    Uso:
+        calendar = get_container().get_date_calendar()
+        calendar.day(date(2025, 10, 15)).label   # '2025-10-15T00:00:00.000Z'
+        calendar.dates()                         # ('2025-10-20', '2025-10-19', ...)
+        calendar.dates_json()                    # b'{"dates": [...], "count": 659}'
+
+    Sem db_executor (ex: DataProcessor fora do container), dates() e
+    dates_json() não estão disponíveis; day() e label() nunca usam o banco.
+    """
+
+    TABLE = '"mapa_do_bosque"."dim_data"'
+
+    def __init__(self, db_executor=None, data_version=None, logger=None):
+        """
+        Args:
+            db_executor: Executor de queries (opcional)
+            data_version: DataVersionTracker (recarga de dim_data)
+            logger: Logger estruturado (opcional)
+        """
+        self.db_executor = db_executor
+        self.data_version = data_version
+        self.logger = logger
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.Lock()
+        # Atributos por data e por ordinal (só crescem: o label de uma data não muda)
+        self._days: Dict[date, CalendarDay] = {}
+        self._ordinals: Dict[int, CalendarDay] = {}
+
+    def day(self, value: date) -> CalendarDay:
+        """
+        Atributos de uma data.
+
+        Calculados em Python na primeira vez e memorizados (sem consultar o
+        banco: uma falha em dim_data não afeta a transformação dos gráficos).
+
+        Args:
+            value: date (datetime usa apenas a data)
+        """
+        day = self._days.get(value)
+        if day is None:
+            if isinstance(value, datetime):
+                value = value.date()
+            day = self._days.get(value) or self._add(value)
+        return day
+
+    def day_from_ordinal(self, ordinal: int) -> CalendarDay:
+        """Atributos da data com o ordinal (date.toordinal()) informado"""
+        day = self._ordinals.get(ordinal)
+        if day is None:
+            day = self.day(date.fromordinal(ordinal))
+        return day
+
+    def label(self, value: date) -> str:
+        """Data em ISO 8601 UTC ('YYYY-MM-DDT00:00:00.000Z')"""
+        return self.day(value).label
+
+    def dates(self) -> Tuple[str, ...]:
+        """Datas de dim_data (mais recente primeiro) em YYYY-MM-DD"""
+        return self._current().dates
+
+    def dates_json(self) -> bytes:
+        """Resposta de /available-dates/ já serializada: {"dates": [...], "count": n}"""
+        return self._current().dates_json
+
+    def _add(self, value: date) -> CalendarDay:
+        """Calcula e registra os atributos de uma data"""
+        day = CalendarDay(
+            label=_iso_label(value),
+            ordinal=value.toordinal(),
+            month=_iso_label(value.replace(day=1)),
+            weekday=value.weekday(),
+        )
+        self._days[value] = day
+        self._ordinals[day.ordinal] = day
+        return day
+
+    def _current(self) -> _Snapshot:
+        """Snapshot da versão atual de dim_data (recarrega se mudou)"""
+        if self.db_executor is None:
+            raise RuntimeError("DateCalendar sem db_executor não tem as datas de dim_data")
+
+        version = self.data_version.version(self.TABLE)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = self._load(version)
+                self._snapshot = snapshot
+
+        return snapshot
+
+    def _load(self, version: Optional[tuple]) -> _Snapshot:
+        """Lê as datas de dim_data e registra os atributos de cada uma"""
+        rows = self.db_executor.execute(f"""
+            SELECT DISTINCT "data"
+            FROM {self.TABLE}
+            WHERE "data" IS NOT NULL
+            ORDER BY "data" DESC
+        """)
+
+        dates = []
+        for row in rows:
+            value = row['data']
+            if isinstance(value, datetime):
+                value = value.date()
+            if value not in self._days:
+                self._add(value)
+            dates.append(value)
+
+        if self.logger:
+            self.logger.info("Calendário de dim_data carregado", {'datas': len(dates)})
+
+        return _Snapshot(version, tuple(dates))
@@ -0,0 +1,163 @@
+"""
+FacetEngine - Opções dos filtros do dashboard a partir de dimensões em memória
+
+Monta as respostas de /filters/options/, /filters/filtered-options/ e
+/filters/search/ sem consultas no caminho quente:
+
+    - ramos, categorias e lojas: RgmFiltrosIndex (bitsets sobre as linhas de
+      Rgm_filtros); as opções em cascata (ramos de um shopping, lojas de um
+      ramo + categoria) são um AND dos bitsets dos filtros selecionados e o
+      autocomplete é uma busca por prefixo no índice ordenado
+    - datas (dim_data): DateCalendar, compartilhado com o processamento dos
+      gráficos
+    - shoppings (dm_shopping): lista pronta, recarregada quando a versão dos
+      dados da tabela muda (DataVersionTracker)
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class FacetEngine:
+    """
+    Opções de filtros (datas, shoppings, ramos, categorias, lojas).
+
+    Uso:
+        facets = get_container().get_facet_engine()
+        opcoes = facets.filter_options()
+        opcoes = facets.filtered_options(shopping='SCIB', ramo='Moda')
+        lojas = facets.search('loja', 'cafe', limit=10, shopping='SCIB')
+    """
+
+    SHOPPINGS_TABLE = '"mapa_do_bosque"."dm_shopping"'
+
+    # Opção da resposta -> coluna de Rgm_filtros
+    RGM_FACETS = {
+        'ramos': 'grupo',
+        'categorias': 'categoria',
+        'lojas': 'name',
+    }
+
+    # Campo de busca (search) -> coluna de Rgm_filtros
+    SEARCH_FIELDS = {
+        'loja': 'name',
+        'categoria': 'categoria',
+        'ramo': 'grupo',
+    }
+
+    # Limite de resultados de uma busca
+    MAX_SEARCH_LIMIT = 50
+
+    def __init__(self, db_executor, rgm_index, calendar, data_version, logger=None):
+        """
+        Args:
+            db_executor: Executor de queries
+            rgm_index: RgmFiltrosIndex (ramos, categorias e lojas)
+            calendar: DateCalendar (datas de dim_data)
+            data_version: DataVersionTracker (recarga de dm_shopping)
+            logger: Logger estruturado (opcional)
+        """
+        self.db_executor = db_executor
+        self.rgm_index = rgm_index
+        self.calendar = calendar
+        self.data_version = data_version
+        self.logger = logger
+        # tabela -> (versão, valor carregado)
+        self._loaded: Dict[str, Tuple[Optional[tuple], Any]] = {}
+        self._lock = threading.Lock()
+
+    def filter_options(self) -> Dict[str, Any]:
+        """
+        Todas as opções disponíveis para filtros.
+
+        Returns:
+            {'datas': [...], 'shoppings': [{'value', 'label'}], 'ramos': [...],
+             'categorias': [...], 'lojas': [...]}
+        """
+        options = {
+            'datas': self.calendar.dates(),
+            'shoppings': self._table(self.SHOPPINGS_TABLE, self._load_shoppings),
+        }
+        for option, column in self.RGM_FACETS.items():
+            options[option] = self.rgm_index.options(column)
+        return options
+
+    def filtered_options(
+        self,
+        shopping: Optional[str] = None,
+        ramo: Optional[str] = None,
+        categoria: Optional[str] = None
+    ) -> Dict[str, Tuple[str, ...]]:
+        """
+        Ramos, categorias e lojas das linhas de Rgm_filtros que atendem a
+        todos os filtros selecionados.
+
+        Args:
+            shopping: Sigla do shopping (opcional)
+            ramo: Grupo/ramo (opcional)
+            categoria: Categoria (opcional)
+
+        Returns:
+            {'ramos': [...], 'categorias': [...], 'lojas': [...]}
+        """
+        return {
+            option: self.rgm_index.options(column, sigla=shopping, grupo=ramo, categoria=categoria)
+            for option, column in self.RGM_FACETS.items()
+        }
+
+    def search(
+        self,
+        field: str,
+        query: str,
+        limit: int = 10,
+        shopping: Optional[str] = None,
+        ramo: Optional[str] = None
+    ) -> Tuple[str, ...]:
+        """
+        Autocomplete: valores de um campo com alguma palavra iniciada por
+        query, sem diferenciar acentos e maiúsculas.
+
+        Args:
+            field: 'loja', 'categoria' ou 'ramo'
+            query: Texto digitado
+            limit: Número máximo de resultados (1 a MAX_SEARCH_LIMIT)
+            shopping: Restringe às lojas do shopping (opcional)
+            ramo: Restringe às lojas do ramo (opcional)
+
+        Returns:
+            Até limit valores (os que começam por query primeiro)
+
+        Raises:
+            ValueError: Se field ou limit forem inválidos
+        """
+        if field not in self.SEARCH_FIELDS:
+            raise ValueError(f"field deve ser um de: {', '.join(self.SEARCH_FIELDS)}")
+        if not 1 <= limit <= self.MAX_SEARCH_LIMIT:
+            raise ValueError(f"limit deve estar entre 1 e {self.MAX_SEARCH_LIMIT}")
+
+        return self.rgm_index.search(self.SEARCH_FIELDS[field], query, limit, sigla=shopping, grupo=ramo)
+
+    def _table(self, table: str, loader: Callable[[], Any]) -> Any:
+        """Valor carregado da tabela na versão atual dos dados"""
+        version = self.data_version.version(table)
+        loaded = self._loaded.get(table)
+        if loaded is not None and loaded[0] == version:
+            return loaded[1]
+
+        with self._lock:
+            loaded = self._loaded.get(table)
+            if loaded is None or loaded[0] != version:
+                loaded = (version, loader())
+                self._loaded[table] = loaded
+
+        return loaded[1]
+
+    def _load_shoppings(self) -> Tuple[Dict[str, str], ...]:
+        """Shoppings de dm_shopping como opções {value, label}"""
+        rows = self.db_executor.execute(f"""
+            SELECT DISTINCT "sigla", "nome_shopping"
+            FROM {self.SHOPPINGS_TABLE}
+            WHERE "sigla" IS NOT NULL
+            ORDER BY "sigla", "nome_shopping"
+        """)
+        return tuple({'value': row['sigla'], 'label': row['nome_shopping']} for row in rows)
@@ -0,0 +1,379 @@
+"""
+InstagramKPIEngine - KPIs do Instagram (seguidores, engajamento e alcance)
+
+Os KPIs de um dia (métricas do dia, acumulado do mês até a data e médias
+diárias) são todos derivados das linhas diárias de all_data do mês:
+
+    - uma única query por (shopping, mês) via InstagramQueryBuilder.build_daily
+      (um join Post x último PostInsight, ou ig_daily_rollup quando disponível)
+    - as linhas do mês ficam em cache por shopping; trocar a data dentro do
+      mesmo mês não consulta o banco novamente
+    - as chaves de cache incluem a versão dos dados (DataVersionTracker) das
+      tabelas lidas (Post/PostInsight, ig_daily_rollup ou UserInsight): uma
+      ingestão, um refresh dos rollups ou a troca entre rollups e tabelas da
+      ingestão geram chaves novas, sem esperar o TTL
+    - linhas do mês e seguidores fora do cache são consultados ao mesmo
+      tempo, em conexões diferentes
+
+Seguidores são extraídos do JSON de follower_demographics no próprio
+PostgreSQL: a resposta traz apenas o total numérico, não o documento
+demográfico.
+"""
+
+import calendar
+import hashlib
+from datetime import date, datetime
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+from wbr.database.interface import CompiledQuery
+from wbr.services.instagram_query_builder import InstagramQueryBuilder
+
+
+# Métrica de UserInsight com a quantidade de seguidores
+FOLLOWERS_METRIC = 'follower_demographics'
+
+# Total de seguidores extraído no PostgreSQL a partir de "value": número
+# direto ou soma dos valores numéricos do objeto demográfico
+# (ex: {"18-24": 1000, "25-34": 1500} -> 2500)
+FOLLOWERS_TOTAL_SQL = """CAST(ROUND(CASE jsonb_typeof("value")
+            WHEN 'number' THEN CAST("value" #>> '{}' AS numeric)
+            WHEN 'object' THEN COALESCE((
+                SELECT SUM(CAST(N.total #>> '{}' AS numeric))
+                FROM jsonb_path_query("value", 'strict $.* ? (@.type() == "number")') AS N(total)
+            ), 0)
+            ELSE 0
+        END) AS bigint)"""
+
+
+class InstagramKPIEngine:
+    """
+    Calcula os KPIs do endpoint /instagram/kpis/.
+
+    Uso:
+        engine = get_container().get_instagram_kpi_engine()
+        kpis = engine.get_kpis('2024-06-12', shopping='SBI')
+    """
+
+    # Limite da série histórica de seguidores (get_follower_history)
+    MAX_HISTORY_DAYS = 366
+
+    # Métricas de engajamento (somadas em engajamento_total)
+    ENGAGEMENT_COLUMNS = ('total_likes', 'total_comentarios', 'total_compartilhamentos', 'total_salvos')
+
+    # Tabela lida por build_daily quando os rollups estão disponíveis
+    ROLLUP_TABLE = 'mapa_do_bosque.ig_daily_rollup'
+
+    def __init__(
+        self,
+        db_executor,
+        query_builder: InstagramQueryBuilder,
+        cache,
+        data_version,
+        cache_ttl: int = 3600,
+        logger=None
+    ):
+        """
+        Args:
+            db_executor: Executor de queries
+            query_builder: InstagramQueryBuilder (build_daily)
+            cache: Sistema de cache (Redis, memória ou nulo)
+            data_version: DataVersionTracker (versão dos dados nas chaves de cache)
+            cache_ttl: Validade em segundos das linhas diárias e seguidores em cache
+            logger: Logger estruturado (opcional)
+        """
+        self.db_executor = db_executor
+        self.query_builder = query_builder
+        self.cache = cache
+        self.data_version = data_version
+        self.cache_ttl = cache_ttl
+        self.logger = logger
+
+    def get_kpis(self, data_referencia: str, shopping: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        KPIs do Instagram na data de referência.
+
+        Args:
+            data_referencia: Data de referência (YYYY-MM-DD)
+            shopping: Sigla do shopping (opcional; default: todos)
+
+        Returns:
+            {'seguidores': [...], 'engagement': [...]}, uma linha por shopping
+            (engagement apenas para shoppings com posts na data)
+
+        Raises:
+            ValueError: Se data_referencia for inválida
+        """
+        data_obj = datetime.strptime(data_referencia, '%Y-%m-%d').date()
+
+        siglas = self._siglas(shopping)
+        if not siglas:
+            return {'seguidores': [], 'engagement': []}
+
+        # Chaves calculadas uma vez: o valor consultado é salvo na versão lida antes da query
+        seguidores_keys = {sigla: self._followers_key(sigla, data_obj) for sigla in siglas}
+        dias_keys = {sigla: self._month_days_key(sigla, data_obj) for sigla in siglas}
+        seguidores, seguidores_faltantes = self._from_cache(seguidores_keys, 'linha')
+        dias_mes, dias_faltantes = self._from_cache(dias_keys, 'dias')
+
+        # Seguidores e linhas do mês fora do cache: queries independentes,
+        # executadas ao mesmo tempo (execute_many_concurrent)
+        pendentes = []
+        if seguidores_faltantes:
+            pendentes.append((
+                self._followers_query(seguidores_faltantes, data_obj),
+                partial(self._store_followers, seguidores, seguidores_faltantes, seguidores_keys)
+            ))
+        if dias_faltantes:
+            pendentes.append((
+                self._month_days_query(dias_faltantes, data_obj),
+                partial(self._store_month_days, dias_mes, dias_faltantes, dias_keys)
+            ))
+
+        resultados = self.db_executor.execute_many_concurrent([query for query, _ in pendentes])
+        for (_, store), rows in zip(pendentes, resultados):
+            store(rows)
+
+        engagement = []
+        for sigla in sorted(siglas):
+            linha = self._engagement(dias_mes[sigla], data_obj)
+            if linha is not None:
+                engagement.append(linha)
+
+        # Data mais recente primeiro; empates por sigla (ordenação estável)
+        seguidores_ordenados = sorted(
+            sorted(
+                (seguidores[sigla] for sigla in siglas if seguidores[sigla] is not None),
+                key=lambda linha: linha['shopping']
+            ),
+            key=lambda linha: linha['data'],
+            reverse=True
+        )
+
+        return {
+            'seguidores': seguidores_ordenados,
+            'engagement': engagement,
+        }
+
+    def _siglas(self, shopping: Optional[str]) -> List[str]:
+        """Shoppings consultados (lista vazia se a sigla não existir)"""
+        schemas = InstagramQueryBuilder.SHOPPING_SCHEMAS
+        if shopping:
+            return [shopping] if shopping in schemas else []
+        return list(schemas)
+
+    def _engagement(self, dias: List[Dict[str, Any]], data_obj: date) -> Optional[Dict[str, Any]]:
+        """
+        Métricas do dia + acumulado do mês até a data, a partir das linhas diárias.
+
+        As médias usam divisão inteira, como bigint / bigint no PostgreSQL.
+        """
+        data_iso = data_obj.isoformat()
+        do_dia = None
+        engajamento_mes = 0
+        alcance_mes = 0
+        dias_com_posts = 0
+
+        for dia in dias:
+            if dia['data'] > data_iso:
+                break
+            engajamento_mes += sum(dia[coluna] for coluna in self.ENGAGEMENT_COLUMNS)
+            alcance_mes += dia['total_alcance']
+            dias_com_posts += 1
+            if dia['data'] == data_iso:
+                do_dia = dia
+
+        if do_dia is None:
+            return None
+
+        return {
+            'shopping': do_dia['shopping'],
+            'data': do_dia['data'],
+            'total_likes': do_dia['total_likes'],
+            'total_alcance': do_dia['total_alcance'],
+            'total_impressoes': do_dia['total_impressoes'],
+            'total_comentarios': do_dia['total_comentarios'],
+            'total_compartilhamentos': do_dia['total_compartilhamentos'],
+            'total_salvos': do_dia['total_salvos'],
+            'engajamento_total': sum(do_dia[coluna] for coluna in self.ENGAGEMENT_COLUMNS),
+            'total_posts': do_dia['total_posts'],
+            'engajamento_total_mes': engajamento_mes,
+            'dias_disponiveis': dias_com_posts,
+            'engajamento_medio_dia': engajamento_mes // dias_com_posts,
+            'alcance_total_mes': alcance_mes,
+            'alcance_medio_dia': alcance_mes // dias_com_posts,
+        }
+
+    def _from_cache(self, keys: Dict[str, str], campo: str) -> Tuple[Dict[str, Any], List[str]]:
+        """Valores em cache por shopping ({sigla: chave}) e shoppings que precisam ser consultados"""
+        resultado = {}
+        faltantes = []
+        for sigla, key in keys.items():
+            cached = self.cache.get(key)
+            if cached is not None:
+                resultado[sigla] = cached[campo]
+            else:
+                faltantes.append(sigla)
+        return resultado, faltantes
+
+    def _month_days_key(self, sigla: str, data_obj: date) -> str:
+        """Chave de cache das linhas diárias do mês de data_obj (na versão atual dos dados)"""
+        rollups = self.query_builder.rollups
+        if rollups is not None and rollups.available():
+            tabelas = [self.ROLLUP_TABLE]
+        else:
+            schema = InstagramQueryBuilder.SHOPPING_SCHEMAS[sigla]
+            tabelas = [f'"{schema}"."Post"', f'"{schema}"."PostInsight"']
+        return (
+            f"wbr:instagram:dias:{sigla}:{data_obj.year:04d}-{data_obj.month:02d}:"
+            f"{self._data_version_hash(tabelas)}"
+        )
+
+    def _followers_key(self, sigla: str, data_obj: date) -> str:
+        """Chave de cache do total de seguidores na data (na versão atual dos dados)"""
+        return (
+            f"wbr:instagram:seguidores_total:{sigla}:{data_obj.isoformat()}:"
+            f"{self._data_version_hash([self._user_insight_table(sigla)])}"
+        )
+
+    @staticmethod
+    def _user_insight_table(sigla: str) -> str:
+        """Tabela UserInsight do shopping (seguidores)"""
+        return f'"{InstagramQueryBuilder.SHOPPING_SCHEMAS[sigla]}"."UserInsight"'
+
+    def _data_version_hash(self, tabelas: List[str]) -> str:
+        """Hash das tabelas lidas e da versão dos dados de cada uma"""
+        versoes = [(tabela, self.data_version.version(tabela)) for tabela in tabelas]
+        return hashlib.md5(repr(versoes).encode()).hexdigest()[:8]
+
+    def _month_days_query(self, faltantes: List[str], data_obj: date) -> CompiledQuery:
+        """
+        Linhas diárias de all_data do mês inteiro.
+
+        Os shoppings fora do cache são consultados juntos em uma única query.
+        """
+        ano, mes = data_obj.year, data_obj.month
+        return self.query_builder.build_daily(
+            date(ano, mes, 1).isoformat(),
+            date(ano, mes, calendar.monthrange(ano, mes)[1]).isoformat(),
+            faltantes
+        )
+
+    def _store_month_days(
+        self,
+        resultado: Dict[str, List[Dict[str, Any]]],
+        faltantes: List[str],
+        keys: Dict[str, str],
+        rows: List[Dict[str, Any]]
+    ):
+        """Separa as linhas diárias por shopping e guarda no cache"""
+        por_shopping = {sigla: [] for sigla in faltantes}
+        for row in rows:
+            row['data'] = row['data'].isoformat()
+            por_shopping[row['shopping']].append(row)
+
+        for sigla, dias in por_shopping.items():
+            self.cache.set(keys[sigla], {'dias': dias}, ttl=self.cache_ttl)
+            resultado[sigla] = dias
+
+    def _followers_query(self, faltantes: List[str], data_obj: date) -> Tuple[str, Dict[str, Any]]:
+        """
+        Total de seguidores de cada shopping no último follower_demographics
+        até a data de referência.
+
+        Os shoppings fora do cache são consultados juntos em uma única query.
+        """
+        schemas = InstagramQueryBuilder.SHOPPING_SCHEMAS
+        # Último registro por shopping: busca reversa no índice
+        # ("metricName", "startTime"), sem ler o histórico
+        branches = '\n\nUNION ALL\n\n'.join(f"""(
+    SELECT
+        '{sigla}' as shopping,
+        "startTime"::date AS data,
+        "metricName"::text AS metrica,
+        {FOLLOWERS_TOTAL_SQL} AS total_seguidores
+    FROM "{schemas[sigla]}"."UserInsight"
+    WHERE "metricName" = '{FOLLOWERS_METRIC}'
+      AND "startTime" < CAST(:data_referencia AS date) + 1
+    ORDER BY "startTime" DESC
+    LIMIT 1
+)""" for sigla in faltantes)
+
+        return branches, {'data_referencia': data_obj.isoformat()}
+
+    def _store_followers(
+        self,
+        resultado: Dict[str, Optional[Dict[str, Any]]],
+        faltantes: List[str],
+        keys: Dict[str, str],
+        rows: List[Dict[str, Any]]
+    ):
+        """Linha de seguidores por shopping (None se não houver) e cache"""
+        linhas = {sigla: None for sigla in faltantes}
+        for row in rows:
+            row['data'] = row['data'].isoformat()
+            linhas[row['shopping']] = row
+
+        for sigla, linha in linhas.items():
+            self.cache.set(keys[sigla], {'linha': linha}, ttl=self.cache_ttl)
+            resultado[sigla] = linha
+
+    def get_follower_history(
+        self,
+        data_referencia: str,
+        dias: int,
+        shopping: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Série diária do total de seguidores nos N dias até a data de referência.
+
+        Um ponto por shopping e dia com registro (o último registro do dia),
+        lido por intervalo no índice ("metricName", "startTime").
+
+        Args:
+            data_referencia: Data de referência (YYYY-MM-DD)
+            dias: Número de dias da série (1 a MAX_HISTORY_DAYS)
+            shopping: Sigla do shopping (opcional; default: todos)
+
+        Returns:
+            Lista de {shopping, data, total_seguidores} ordenada por shopping e data
+
+        Raises:
+            ValueError: Se data_referencia ou dias forem inválidos
+        """
+        if not 1 <= dias <= self.MAX_HISTORY_DAYS:
+            raise ValueError(f"historico_dias deve estar entre 1 e {self.MAX_HISTORY_DAYS}")
+
+        data_obj = datetime.strptime(data_referencia, '%Y-%m-%d').date()
+        siglas = self._siglas(shopping)
+        if not siglas:
+            return []
+
+        versao = self._data_version_hash([self._user_insight_table(sigla) for sigla in siglas])
+        cache_key = f"wbr:instagram:seguidores_historico:{','.join(siglas)}:{data_obj.isoformat()}:{dias}:{versao}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached['serie']
+
+        schemas = InstagramQueryBuilder.SHOPPING_SCHEMAS
+        branches = '\n\nUNION ALL\n\n'.join(f"""(
+    SELECT DISTINCT ON ("startTime"::date)
+        '{sigla}' as shopping,
+        "startTime"::date AS data,
+        {FOLLOWERS_TOTAL_SQL} AS total_seguidores
+    FROM "{schemas[sigla]}"."UserInsight"
+    WHERE "metricName" = '{FOLLOWERS_METRIC}'
+      AND "startTime" >= CAST(:data_referencia AS date) - :dias + 1
+      AND "startTime" < CAST(:data_referencia AS date) + 1
+    ORDER BY "startTime"::date, "startTime" DESC
+)""" for sigla in siglas)
+
+        serie = self.db_executor.execute(f"SELECT * FROM (\n{branches}\n) AS serie\nORDER BY shopping, data", {
+            'data_referencia': data_obj.isoformat(),
+            'dias': dias,
+        })
+        for row in serie:
+            row['data'] = row['data'].isoformat()
+
+        self.cache.set(cache_key, {'serie': serie}, ttl=self.cache_ttl)
+        return serie
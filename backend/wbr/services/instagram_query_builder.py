@@ -4,8 +4,10 @@ Herda do QueryBuilder mas usa template específico para Instagram
 """
 
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from wbr.database.interface import CompiledQuery
 from wbr.services.query_builder import QueryBuilder
+from wbr.services.sql_templates import SqlTemplate, load_template
 
 
 class InstagramQueryBuilder(QueryBuilder):
@@ -13,45 +15,205 @@ class InstagramQueryBuilder(QueryBuilder):
     QueryBuilder especializado para dados do Instagram.
 
     Diferenças do QueryBuilder padrão:
-    - Usa template SQL com UNION de múltiplos schemas (SCIB, SBGP, SBI)
-    - Agrupa dados por shopping antes de aplicar filtros
+    - Usa template SQL com UNION de múltiplos schemas (SCIB, SBGP, SBI),
+      um ramo por shopping (ver SHOPPING_SCHEMAS)
+    - Filtro de shopping é aplicado dentro de cada ramo; demais filtros
+      depois da agregação por shopping
     - Não precisa de campos 'tabela' e 'colunas' no config
+    - Modo página (build_all_metrics): todas as métricas em uma única query
     """
 
-    def __init__(self):
-        """Inicializa com template do Instagram"""
+    # Colunas de métricas calculadas em all_data (ver sql/instagram/base_cte.sql)
+    METRIC_COLUMNS = frozenset({
+        'total_likes',
+        'total_alcance',
+        'total_impressoes',
+        'total_comentarios',
+        'total_compartilhamentos',
+        'total_salvos',
+        'engajamento_total',
+        'total_posts',
+    })
+
+    # Schema com as tabelas Post/PostInsight de cada shopping (ordem dos ramos)
+    SHOPPING_SCHEMAS = {
+        'SCIB': 'instagram-data-fetch-scib',
+        'SBGP': 'instagram-data-fetch-sbgp',
+        'SBI': 'instagram-data-fetch-sbi',
+    }
+
+    # Coluna de filtro avaliada dentro dos ramos de all_data
+    SHOPPING_COLUMN = 'shopping'
+
+    # Config usado por build_daily (o template não depende de colunas do gráfico)
+    DAILY_CONFIG = {'grafico_id': 'instagram_diario', 'coluna_data': 'data', 'coluna_valor': 'engajamento_total'}
+
+    def __init__(self, rollups=None):
+        """
+        Inicializa com template do Instagram.
+
+        Args:
+            rollups: InstagramRollups (opcional). Quando rollups.available(),
+                     all_data é lido de ig_daily_rollup (ver rollup_cte.sql)
+                     em vez das tabelas da ingestão.
+        """
+        self.rollups = rollups
         # Caminho para o template do Instagram
-        module_dir = Path(__file__).parent.parent
-        template_path = module_dir / 'sql' / 'instagram' / 'query_template.sql'
-        super().__init__(template_path=str(template_path))
+        sql_dir = Path(__file__).parent.parent / 'sql' / 'instagram'
+        # CTEs compartilhadas pelos templates (placeholder {instagram_base})
+        self.base_template = load_template(sql_dir / 'base_cte.sql')
+        self.rollup_base_template = load_template(sql_dir / 'rollup_cte.sql')
+        # Ramo de all_data de um shopping (sem o cabeçalho de comentários,
+        # que seria repetido a cada ramo)
+        self.branch_template = load_template(sql_dir / 'post_branch.sql').without_header()
+        super().__init__(template_path=str(sql_dir / 'query_template.sql'))
+        self.all_metrics_template = self._with_base(load_template(sql_dir / 'all_metrics_template.sql'))
+        self.daily_template = self._with_base(load_template(sql_dir / 'daily_template.sql'))
+
+        # Variante de cada template lendo dos rollups: id(template) -> template
+        self._rollup_templates = {
+            id(self.compiled_template): super()._load_template().substitute(
+                {'instagram_base': self.rollup_base_template}
+            ),
+            id(self.all_metrics_template): load_template(sql_dir / 'all_metrics_template.sql').substitute(
+                {'instagram_base': self.rollup_base_template}
+            ),
+            id(self.daily_template): load_template(sql_dir / 'daily_template.sql').substitute(
+                {'instagram_base': self.rollup_base_template}
+            ),
+        }
+
+    def _load_template(self) -> SqlTemplate:
+        """Carrega template do Instagram já com as CTEs base"""
+        return self._with_base(super()._load_template())
+
+    def _with_base(self, template: SqlTemplate) -> SqlTemplate:
+        """Substitui {instagram_base} pelas CTEs de base_cte.sql"""
+        return template.substitute({'instagram_base': self.base_template})
+
+    def _get_query_text(self, config: Dict[str, Any], shape: tuple, template: SqlTemplate = None):
+        """Usa a variante do template sobre os rollups quando disponíveis"""
+        template = template or self.compiled_template
+        if self.rollups is not None and self.rollups.available():
+            template = self._rollup_templates.get(id(template), template)
+        return super()._get_query_text(config, shape, template)
+
+    def _filter_values(self, shape: tuple) -> Dict[str, str]:
+        """
+        Filtros do Instagram:
+          {instagram_posts} -> ramos de all_data, com o filtro de shopping
+          {filtro_shopping} -> filtro de shopping sobre ig_daily_rollup
+          {filtros_dinamicos} -> demais filtros, aplicados sobre all_data
+        """
+        return {
+            'instagram_posts': self._compile_branches(shape),
+            'filtro_shopping': self._shopping_clause(shape, self.SHOPPING_COLUMN),
+            'filtros_dinamicos': self._compile_filters(shape, exclude=frozenset({self.SHOPPING_COLUMN})),
+        }
+
+    def _compile_branches(self, shape: tuple) -> str:
+        """
+        Monta um ramo de all_data por shopping, unidos com UNION ALL.
+
+        O filtro de shopping compara o parâmetro com a sigla do ramo: uma
+        condição constante, que o PostgreSQL avalia antes de ler o schema
+        (One-Time Filter), pulando os ramos dos outros shoppings.
+        """
+        branches = []
+        for sigla, schema in self.SHOPPING_SCHEMAS.items():
+            branches.append(self.branch_template.render({
+                'sigla': sigla,
+                'schema': schema,
+                'filtro_shopping': self._shopping_clause(shape, f"CAST('{sigla}' AS text)"),
+            }).rstrip())
+
+        return '\n\n    UNION ALL\n\n'.join(branches)
+
+    def _shopping_clause(self, shape: tuple, coluna_ref: str) -> str:
+        """
+        Cláusula do filtro de shopping do shape sobre coluna_ref ('' se não houver).
+
+        As siglas de all_data já estão normalizadas, então a comparação é
+        direta (sem TRIM(UPPER())).
+        """
+        for i, (coluna, kind) in enumerate(shape):
+            if coluna == self.SHOPPING_COLUMN:
+                if kind.endswith('lista'):
+                    return f"AND {coluna_ref} = ANY(:filtro_{i})"
+                return f"AND {coluna_ref} = :filtro_{i}"
+        return ''
+
+    def metric_column(self, config: Dict[str, Any]) -> Optional[str]:
+        """
+        Coluna de all_data usada pelo gráfico, se for uma métrica conhecida.
+
+        Returns:
+            Nome da coluna (ex: 'total_likes') ou None se o gráfico não puder
+            usar o resultado de build_all_metrics
+        """
+        coluna_valor = self._template_key(config)[1]
+        return coluna_valor if coluna_valor in self.METRIC_COLUMNS else None
 
-    def build(
+    def build_all_metrics(
         self,
         config: Dict[str, Any],
         data_inicio: str,
         data_fim: str,
         user_filters: Optional[Dict[str, Any]] = None
-    ) -> str:
+    ) -> CompiledQuery:
         """
-        Constrói query SQL para Instagram substituindo placeholders.
+        Constrói query com todas as métricas de all_data por dia.
 
-        Placeholders específicos do Instagram:
-          {coluna_data} -> config['coluna_data']
-          {coluna_valor} -> config['coluna_valor']
-          {filtros_dinamicos} -> resultado de build_filters()
+        O resultado ({data, total_likes, total_alcance, ...}) atende todos os
+        gráficos do Instagram com os mesmos filtros: cada gráfico usa a
+        coluna indicada por metric_column().
 
         Args:
-            config: Dicionário de configuração do gráfico
+            config: Configuração de qualquer gráfico do grupo (usa coluna_data)
             data_inicio: Data inicial (formato: YYYY-MM-DD)
             data_fim: Data final (formato: YYYY-MM-DD)
             user_filters: Filtros aplicados pelo usuário (opcional)
 
         Returns:
-            Query SQL completa e pronta para execução
+            CompiledQuery com SQL parametrizado e valores (datas + filtros)
+        """
+        shape, params = self._filter_shape(self._combine_filters(config, user_filters))
+        sql, statement_key = self._get_query_text(config, shape, self.all_metrics_template)
+
+        params['data_inicio'] = data_inicio
+        params['data_fim'] = data_fim
+
+        return CompiledQuery(sql=sql, params=params, statement_key=statement_key)
+
+    def build_daily(
+        self,
+        data_inicio: str,
+        data_fim: str,
+        shoppings: Optional[List[str]] = None
+    ) -> CompiledQuery:
+        """
+        Constrói query com as linhas diárias de all_data, por shopping.
+
+        Args:
+            data_inicio: Data inicial (formato: YYYY-MM-DD)
+            data_fim: Data final, inclusiva (formato: YYYY-MM-DD)
+            shoppings: Siglas a consultar (default: todas)
+
+        Returns:
+            CompiledQuery com linhas {shopping, data, total_likes, ...,
+            engajamento_total, total_posts} ordenadas por shopping e data
         """
-        query = self.template
+        user_filters = {self.SHOPPING_COLUMN: list(shoppings)} if shoppings else None
+        shape, params = self._filter_shape(self._combine_filters(self.DAILY_CONFIG, user_filters))
+        sql, statement_key = self._get_query_text(self.DAILY_CONFIG, shape, self.daily_template)
 
-        # Substitui placeholders específicos do Instagram
+        params['data_inicio'] = data_inicio
+        params['data_fim'] = data_fim
+
+        return CompiledQuery(sql=sql, params=params, statement_key=statement_key)
+
+    def _template_key(self, config: Dict[str, Any]) -> tuple:
+        """Colunas de data e valor do config (chave de memorização)"""
         # Suporta dois formatos de config:
         # 1. Formato novo: config['colunas']['data'] e config['colunas']['valor']
         # 2. Formato antigo: config['coluna_data'] e config['coluna_valor']
@@ -62,16 +224,17 @@ class InstagramQueryBuilder(QueryBuilder):
         if not coluna_valor:
             raise ValueError(f"Configuração inválida: 'colunas.valor' ou 'coluna_valor' não encontrado no config do gráfico {config.get('grafico_id')}")
 
-        query = query.replace('{coluna_data}', self._sanitize_identifier(coluna_data))
-        query = query.replace('{coluna_valor}', self._sanitize_identifier(coluna_valor))
-
-        # Combina filtros de configuração + filtros do usuário
-        combined_filters = {**config.get('filtros', {})}
-        if user_filters:
-            combined_filters.update(user_filters)
+        return (coluna_data, coluna_valor)
 
-        # Constrói e substitui filtros dinâmicos
-        filtros_sql = self.build_filters(combined_filters)
-        query = query.replace('{filtros_dinamicos}', filtros_sql)
-
-        return query
+    def _template_values(self, config: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Placeholders específicos do Instagram:
+          {coluna_data} -> config['coluna_data']
+          {coluna_valor} -> config['coluna_valor']
+          {filtros_dinamicos} -> resultado de build_filters()
+        """
+        coluna_data, coluna_valor = self._template_key(config)
+        return {
+            'coluna_data': self._sanitize_identifier(coluna_data),
+            'coluna_valor': self._sanitize_identifier(coluna_valor),
+        }
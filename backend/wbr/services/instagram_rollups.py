@@ -0,0 +1,261 @@
+"""
+InstagramRollups - Tabelas de rollup do Instagram mantidas pela ingestão
+
+As queries do Instagram precisam do último PostInsight de cada post, o que
+exige uma janela por "postId" sobre todo o histórico de insights. Os
+rollups (sql/instagram/rollups/) guardam esse resultado já calculado e são
+atualizados de forma incremental a partir da marca d'água de "measuredAt":
+
+    python manage.py wbr_refresh_instagram_rollups --migrate   # cria tabelas
+    python manage.py wbr_refresh_instagram_rollups             # incremental
+
+Enquanto as tabelas não existirem (ou não tiverem sido atualizadas para
+todos os shoppings, ou a atualização mais antiga passar de max_age), o
+InstagramQueryBuilder e as views do Instagram continuam consultando as
+tabelas da ingestão.
+"""
+
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from wbr.exceptions import InvalidConfigException
+from wbr.services.instagram_query_builder import InstagramQueryBuilder
+from wbr.services.sql_templates import load_template
+
+
+class InstagramRollups:
+    """
+    Migração, atualização e detecção dos rollups do Instagram.
+
+    Uso:
+        rollups = get_container().get_instagram_rollups()
+        if rollups.available():
+            ...  # consulta mapa_do_bosque.ig_daily_rollup
+    """
+
+    TABLES = (
+        'mapa_do_bosque.ig_latest_post_insight',
+        'mapa_do_bosque.ig_daily_rollup',
+        'mapa_do_bosque.ig_rollup_watermark',
+        'mapa_do_bosque.ig_top_post',
+    )
+
+    # Migrações executadas um comando por vez, fora de bloco de transação
+    CONCURRENT_SUFFIX = '_concurrently'
+
+    # Índice e schema de um CREATE INDEX CONCURRENTLY IF NOT EXISTS
+    # (identificadores entre aspas ou simples)
+    CONCURRENT_INDEX_PATTERN = re.compile(
+        r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+'
+        r'("[^"]+"|\w+)\s+ON\s+(?:ONLY\s+)?("[^"]+"|\w+)\.',
+        re.IGNORECASE
+    )
+
+    # Índice INVALID (construção CONCURRENTLY interrompida) com o nome e schema informados
+    INVALID_INDEX_QUERY = """
+        SELECT quote_ident(N.nspname) || '.' || quote_ident(C.relname) AS indice
+        FROM pg_index AS I
+        JOIN pg_class AS C ON C.oid = I.indexrelid
+        JOIN pg_namespace AS N ON N.oid = C.relnamespace
+        WHERE NOT I.indisvalid
+          AND N.nspname = :schema
+          AND C.relname = :indice
+    """
+
+    def __init__(
+        self,
+        db_executor,
+        enabled: bool = True,
+        check_interval: float = 300.0,
+        max_age: float = 86400.0,
+        logger=None
+    ):
+        """
+        Args:
+            db_executor: Executor de queries
+            enabled: Se False, available() sempre retorna False (leitura
+                     desativada; migrate/refresh continuam funcionando)
+            check_interval: Segundos entre verificações de disponibilidade
+            max_age: Idade máxima (segundos) da atualização mais antiga dos
+                     shoppings; acima disso os rollups são ignorados (0 = sem limite)
+            logger: Logger estruturado (opcional)
+        """
+        self.db_executor = db_executor
+        self.enabled = enabled
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self.logger = logger
+
+        sql_dir = Path(__file__).parent.parent / 'sql' / 'instagram' / 'rollups'
+        # Migrações numeradas (001_*.sql, 002_*.sql, ...), aplicadas em ordem
+        self.migration_paths = sorted(sql_dir.glob('[0-9][0-9][0-9]_*.sql'))
+        self.refresh_template = load_template(sql_dir / 'refresh.sql')
+
+        self._available = False
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """
+        True se os rollups existem, já foram atualizados para todos os
+        shoppings e a atualização mais antiga tem no máximo max_age segundos.
+
+        O resultado é memorizado por check_interval segundos.
+        """
+        if not self.enabled:
+            return False
+
+        checked_at = self._checked_at
+        if checked_at is not None and time.monotonic() - checked_at < self.check_interval:
+            return self._available
+
+        with self._lock:
+            if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval:
+                self._available = self._check()
+                self._checked_at = time.monotonic()
+
+        return self._available
+
+    def invalidate(self):
+        """Força nova verificação de disponibilidade no próximo available()"""
+        self._checked_at = None
+
+    def _check(self) -> bool:
+        """Consulta o catálogo, a marca d'água e a idade da última atualização"""
+        try:
+            condicoes = ' AND '.join(f"to_regclass('{tabela}') IS NOT NULL" for tabela in self.TABLES)
+            existentes = self.db_executor.execute(f"SELECT ({condicoes}) AS existem")
+            if not existentes or not existentes[0]['existem']:
+                return False
+
+            atualizados = self.db_executor.execute("""
+                SELECT
+                    COUNT(*) AS shoppings,
+                    EXTRACT(EPOCH FROM MAX(now() - refreshed_at)) AS idade
+                FROM mapa_do_bosque.ig_rollup_watermark
+            """)
+            if atualizados[0]['shoppings'] < len(InstagramQueryBuilder.SHOPPING_SCHEMAS):
+                return False
+
+            # Atualização parada (ex: agendamento do refresh desligado): volta
+            # para as tabelas da ingestão em vez de servir números congelados
+            idade = float(atualizados[0]['idade'] or 0)
+            if self.max_age and idade > self.max_age:
+                if self.logger:
+                    self.logger.warning("Rollups do Instagram desatualizados, usando tabelas da ingestão", {
+                        'idade_segundos': round(idade),
+                        'max_age': self.max_age,
+                    })
+                return False
+
+            return True
+
+        except Exception as e:
+            if self.logger:
+                self.logger.warning("Falha ao verificar rollups do Instagram", {'error': str(e)})
+            return False
+
+    def migrate(self):
+        """
+        Aplica as migrações do Instagram: tabelas e índices (idempotente).
+
+        Cada arquivo roda em uma única chamada (transação implícita), exceto
+        os *_concurrently.sql: CREATE INDEX CONCURRENTLY não roda em bloco
+        de transação, então cada comando vai em uma chamada própria
+        (conexões em autocommit). Um índice deixado INVALID por uma
+        construção interrompida é removido e criado de novo (o IF NOT
+        EXISTS o manteria como está).
+
+        Índices e backfills em tabelas grandes passam do WBR_QUERY_TIMEOUT
+        das requisições: use um executor sem timeout (ver o comando
+        wbr_refresh_instagram_rollups).
+        """
+        for migration_path in self.migration_paths:
+            with open(migration_path, 'r', encoding='utf-8') as f:
+                sql = f.read()
+            if migration_path.stem.endswith(self.CONCURRENT_SUFFIX):
+                for statement in self._statements(sql):
+                    self._drop_invalid_index(statement)
+                    self.db_executor.execute(statement)
+            else:
+                self.db_executor.execute(sql)
+        self.invalidate()
+
+    def _drop_invalid_index(self, statement: str):
+        """Remove (DROP INDEX CONCURRENTLY) o índice do comando se estiver INVALID"""
+        match = self.CONCURRENT_INDEX_PATTERN.search(statement)
+        if match is None:
+            return
+
+        indice, schema = (
+            nome[1:-1] if nome.startswith('"') else nome.lower()
+            for nome in match.groups()
+        )
+        invalidos = self.db_executor.execute(self.INVALID_INDEX_QUERY, {'schema': schema, 'indice': indice})
+        for row in invalidos:
+            if self.logger:
+                self.logger.warning("Índice INVALID recriado", {'indice': row['indice']})
+            self.db_executor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {row['indice']}")
+
+    @staticmethod
+    def _statements(sql: str) -> List[str]:
+        """Comandos de um arquivo de migração (sem linhas de comentário, separados por ';')"""
+        linhas = [linha for linha in sql.splitlines() if not linha.lstrip().startswith('--')]
+        return [comando.strip() for comando in '\n'.join(linhas).split(';') if comando.strip()]
+
+    def refresh(
+        self,
+        shoppings: Optional[List[str]] = None,
+        full: bool = False,
+        overlap_minutes: int = 60
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Atualiza os rollups a partir dos insights novos desde a marca d'água.
+
+        Cada shopping é atualizado em uma única transação.
+
+        Args:
+            shoppings: Siglas a atualizar (default: todas)
+            full: Descarta os rollups do shopping e reconstrói do zero
+            overlap_minutes: Reprocessa insights até N minutos anteriores
+                             à marca d'água
+
+        Returns:
+            {sigla: {'insights': n, 'dias': n, 'marca_dagua': datetime}}
+
+        Raises:
+            InvalidConfigException: Se alguma sigla não existir
+        """
+        schemas = InstagramQueryBuilder.SHOPPING_SCHEMAS
+        shoppings = shoppings or list(schemas)
+
+        desconhecidos = [sigla for sigla in shoppings if sigla not in schemas]
+        if desconhecidos:
+            raise InvalidConfigException(
+                message=f"Shopping desconhecido: {', '.join(desconhecidos)}"
+            )
+
+        resultados = {}
+        for sigla in shoppings:
+            query = self.refresh_template.render({'schema': schemas[sigla]})
+            rows = self.db_executor.execute(query, {
+                'sigla': sigla,
+                'completo': full,
+                'sobreposicao_minutos': overlap_minutes,
+            })
+            resultado = rows[0] if rows else {}
+            resultados[sigla] = resultado
+
+            if self.logger:
+                self.logger.info("Rollups do Instagram atualizados", {
+                    'shopping': sigla,
+                    'insights': resultado.get('insights'),
+                    'dias': resultado.get('dias'),
+                    'marca_dagua': str(resultado.get('marca_dagua')),
+                })
+
+        self.invalidate()
+        return resultados
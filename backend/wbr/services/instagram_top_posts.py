@@ -0,0 +1,227 @@
+"""
+InstagramTopPosts - Ranking de posts do Instagram por engajamento
+
+O top N do mês é lido de mapa_do_bosque.ig_top_post (mantida pela
+ingestão, ver InstagramRollups): uma leitura ordenada do índice
+(mes, engajamento_total, ...), sem reclassificar todos os posts e insights
+dos três schemas a cada requisição. Enquanto os rollups não estiverem
+disponíveis, o ranking é calculado sobre as tabelas da ingestão.
+
+A ordem é total (engajamento_total, data, shopping, post_id, todos
+decrescentes), o que permite paginação por chave: o cursor retornado
+codifica a última linha da página e a próxima página continua a partir
+dela, em vez de usar OFFSET.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from wbr.services.instagram_query_builder import InstagramQueryBuilder
+
+
+class InstagramTopPosts:
+    """
+    Top posts do endpoint /instagram/top-posts/.
+
+    Uso:
+        top_posts = get_container().get_instagram_top_posts()
+        pagina = top_posts.get_top_posts('2024-06-12', shopping='SBI', limit=3)
+        proxima = top_posts.get_top_posts('2024-06-12', cursor=pagina['proximo_cursor'])
+    """
+
+    # Limite de posts por página
+    MAX_LIMIT = 50
+
+    # Ordem total do ranking (chave da paginação)
+    ORDER_BY = 'engajamento_total DESC, data DESC, shopping DESC, post_id DESC'
+    KEYSET_FILTER = (
+        'AND (engajamento_total, data, shopping, post_id) < '
+        '(:cursor_engajamento, CAST(:cursor_data AS date), :cursor_shopping, :cursor_post_id)'
+    )
+
+    def __init__(self, db_executor, rollups, logger=None):
+        """
+        Args:
+            db_executor: Executor de queries
+            rollups: InstagramRollups (disponibilidade de ig_top_post)
+            logger: Logger estruturado (opcional)
+        """
+        self.db_executor = db_executor
+        self.rollups = rollups
+        self.logger = logger
+
+    def get_top_posts(
+        self,
+        data_referencia: Optional[str] = None,
+        shopping: Optional[str] = None,
+        limit: int = 3,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Posts com maior engajamento.
+
+        Args:
+            data_referencia: Data (YYYY-MM-DD) cujo mês é considerado
+                             (opcional; default: todos os posts)
+            shopping: Sigla do shopping (opcional; default: todos)
+            limit: Posts por página (1 a MAX_LIMIT)
+            cursor: proximo_cursor da página anterior (opcional)
+
+        Returns:
+            {'posts': [...], 'proximo_cursor': str ou None (última página)}
+
+        Raises:
+            ValueError: Se data_referencia, limit ou cursor forem inválidos
+        """
+        if not 1 <= limit <= self.MAX_LIMIT:
+            raise ValueError(f"limit deve estar entre 1 e {self.MAX_LIMIT}")
+
+        schemas = InstagramQueryBuilder.SHOPPING_SCHEMAS
+        if shopping:
+            siglas = [shopping] if shopping in schemas else []
+        else:
+            siglas = list(schemas)
+        if not siglas:
+            return {'posts': [], 'proximo_cursor': None}
+
+        # Uma linha a mais indica se existe próxima página
+        params: Dict[str, Any] = {'limit': limit + 1}
+        keyset = ''
+        if cursor:
+            params.update(self._decode_cursor(cursor))
+            keyset = self.KEYSET_FILTER
+
+        inicio_mes = None
+        if data_referencia:
+            inicio_mes = datetime.strptime(data_referencia, '%Y-%m-%d').date().replace(day=1)
+
+        if self.rollups.available():
+            query = self._rollup_query(siglas, inicio_mes, keyset, params)
+        else:
+            query = self._live_query(siglas, inicio_mes, keyset, params)
+
+        posts = self.db_executor.execute(query, params)
+
+        proximo_cursor = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            proximo_cursor = self._encode_cursor(posts[-1])
+
+        for post in posts:
+            del post['post_id']
+
+        return {'posts': posts, 'proximo_cursor': proximo_cursor}
+
+    def _rollup_query(self, siglas: List[str], inicio_mes: Optional[date], keyset: str, params: Dict[str, Any]) -> str:
+        """Leitura ordenada de ig_top_post pelo índice do ranking"""
+        filtros = []
+        if inicio_mes:
+            params['mes'] = inicio_mes
+            filtros.append('AND mes = :mes')
+        if len(siglas) < len(InstagramQueryBuilder.SHOPPING_SCHEMAS):
+            params['shoppings'] = siglas
+            filtros.append('AND shopping = ANY(:shoppings)')
+        filtros.append(keyset)
+
+        return f"""
+            SELECT
+                shopping,
+                data,
+                link_foto,
+                link_insta,
+                tipo_midia,
+                total_likes,
+                total_comentarios,
+                total_compartilhamentos,
+                total_salvos,
+                engajamento_total,
+                post_id
+            FROM mapa_do_bosque.ig_top_post
+            WHERE 1=1 {' '.join(filtros)}
+            ORDER BY {self.ORDER_BY}
+            LIMIT :limit
+        """
+
+    def _live_query(self, siglas: List[str], inicio_mes: Optional[date], keyset: str, params: Dict[str, Any]) -> str:
+        """
+        Ranking sobre as tabelas da ingestão: último PostInsight de cada post
+        (DISTINCT ON), um ramo por shopping.
+        """
+        date_filter = ''
+        if inicio_mes:
+            # Intervalo semiaberto [dia 1 do mês, dia 1 do mês seguinte)
+            if inicio_mes.month == 12:
+                fim_mes = inicio_mes.replace(year=inicio_mes.year + 1, month=1)
+            else:
+                fim_mes = inicio_mes.replace(month=inicio_mes.month + 1)
+            params['inicio_mes'] = inicio_mes
+            params['fim_mes'] = fim_mes
+            date_filter = 'AND P."postedAt" >= :inicio_mes AND P."postedAt" < :fim_mes'
+
+        schemas = InstagramQueryBuilder.SHOPPING_SCHEMAS
+        posts_branches = '\n\n                UNION ALL\n\n'.join(f"""
+                (
+                    SELECT DISTINCT ON (I."postId")
+                        '{sigla}' as shopping,
+                        P."id" as post_id,
+                        P."mediaUrl" as link_foto,
+                        P."permalink" as link_insta,
+                        COALESCE(P."mediaType"::text, 'IMAGE') as tipo_midia,
+                        DATE(P."postedAt") as data,
+                        COALESCE(I.likes, 0) as total_likes,
+                        COALESCE(I.comments, 0) as total_comentarios,
+                        COALESCE(I.shares, 0) as total_compartilhamentos,
+                        COALESCE(I.saved, 0) as total_salvos
+                    FROM "{schemas[sigla]}"."Post" AS P
+                    JOIN "{schemas[sigla]}"."PostInsight" AS I ON I."postId" = P."id"
+                    WHERE P."postedAt" IS NOT NULL {date_filter}
+                    ORDER BY I."postId", I."measuredAt" DESC
+                )""" for sigla in siglas)
+
+        return f"""
+            WITH all_data AS (
+                {posts_branches}
+            ),
+            ranking AS (
+                SELECT
+                    *,
+                    (total_likes + total_comentarios + total_compartilhamentos + total_salvos) as engajamento_total
+                FROM all_data
+            )
+            SELECT
+                shopping,
+                data,
+                link_foto,
+                link_insta,
+                tipo_midia,
+                total_likes,
+                total_comentarios,
+                total_compartilhamentos,
+                total_salvos,
+                engajamento_total,
+                post_id
+            FROM ranking
+            WHERE 1=1 {keyset}
+            ORDER BY {self.ORDER_BY}
+            LIMIT :limit
+        """
+
+    def _encode_cursor(self, post: Dict[str, Any]) -> str:
+        """Cursor opaco com a chave da última linha da página"""
+        chave = [post['engajamento_total'], post['data'].isoformat(), post['shopping'], post['post_id']]
+        return base64.urlsafe_b64encode(json.dumps(chave).encode('utf-8')).decode('ascii')
+
+    def _decode_cursor(self, cursor: str) -> Dict[str, Any]:
+        """Parâmetros da condição de paginação a partir do cursor"""
+        try:
+            engajamento, data, shopping, post_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return {
+                'cursor_engajamento': int(engajamento),
+                'cursor_data': date.fromisoformat(data).isoformat(),
+                'cursor_shopping': str(shopping),
+                'cursor_post_id': str(post_id),
+            }
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"cursor inválido: {str(e)}")
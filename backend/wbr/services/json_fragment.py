@@ -0,0 +1,109 @@
+"""
+JSONFragment - Valor já serializado em JSON (bytes UTF-8)
+
+Um gráfico era serializado a cada requisição: o RedisCache fazia json.loads
+em todo acerto e o JsonResponse fazia json.dumps de novo sobre os mesmos
+dados (o MemoryCache também reserializava a cada requisição). Aqui o JSON de
+um gráfico é produzido uma única vez, ao gerar os dados, e é o que vai para
+o cache; as views escrevem esses bytes direto no HttpResponse e uma página é
+a junção dos fragmentos dos gráficos, sem reserializar um dict gigante.
+
+O valor Python só é decodificado se alguém pedir (value), por exemplo para
+o formato colunar ou MessagePack.
+
+Serialização com orjson quando instalado (dependência opcional) e json da
+biblioteca padrão caso contrário, ambos compactos e em UTF-8.
+"""
+
+import json
+from typing import Any, Callable, Dict, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import orjson
+except ImportError:  # dependência opcional
+    orjson = None
+
+
+_json_encoder = DjangoJSONEncoder()
+
+# Chaves não-string e datas convertidas como na biblioteca padrão / DjangoJSONEncoder
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson is not None else 0
+
+# Valor ainda não decodificado
+_PENDING = object()
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Serializa em JSON compacto (bytes UTF-8).
+
+    Tipos sem equivalente em JSON (date, Decimal...) são convertidos como no
+    DjangoJSONEncoder.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=_json_encoder.default, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        value, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+def loads(data: bytes) -> Any:
+    """Decodifica JSON (bytes ou str)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class JSONFragment:
+    """
+    JSON pronto para envio, com o valor decodificado sob demanda.
+
+    Uso:
+        fragment = JSONFragment.from_value({'titulo': 'Vendas', ...})
+        HttpResponse(fragment.data, content_type='application/json')
+        pagina = JSONFragment.join({'vendas': fragment, 'fluxo': outro})
+        pagina.value['vendas']['titulo']
+    """
+
+    __slots__ = ('data', '_value', '_load')
+
+    def __init__(self, data: bytes, value: Any = _PENDING, load: Optional[Callable[[], Any]] = None):
+        """
+        Args:
+            data: JSON em bytes UTF-8
+            value: Valor já conhecido (evita decodificar data)
+            load: Monta o valor sob demanda (default: decodifica data)
+        """
+        self.data = data
+        self._value = value
+        self._load = load
+
+    @classmethod
+    def from_value(cls, value: Any) -> 'JSONFragment':
+        """Serializa um valor (mantendo o próprio valor)"""
+        if isinstance(value, JSONFragment):
+            return value
+        return cls(dumps(value), value)
+
+    @classmethod
+    def join(cls, items: Dict[str, Any]) -> 'JSONFragment':
+        """
+        Objeto JSON {chave: valor} montado pela junção dos bytes.
+
+        Valores JSONFragment entram como estão; os demais são serializados.
+        """
+        fragments = {key: cls.from_value(value) for key, value in items.items()}
+        data = b'{' + b','.join(dumps(key) + b':' + fragment.data for key, fragment in fragments.items()) + b'}'
+        return cls(data, load=lambda: {key: fragment.value for key, fragment in fragments.items()})
+
+    @property
+    def value(self) -> Any:
+        """Valor Python (decodificado na primeira vez)"""
+        if self._value is _PENDING:
+            self._value = self._load() if self._load is not None else loads(self.data)
+        return self._value
+
+    def __repr__(self) -> str:
+        return f'JSONFragment({self.data[:60]!r}{"..." if len(self.data) > 60 else ""})'
@@ -0,0 +1,112 @@
+"""
+PageExecutor - Execução concorrente das unidades de trabalho de uma página
+
+Uma página (ex: dashboard_vendas) é gerada em várias unidades independentes
+(queries em lote e gráficos individuais, ver WBRService.generate_many). Em
+sequência, a latência da página é a soma das latências; aqui as unidades
+rodam em um thread pool e a página leva aproximadamente o tempo da unidade
+mais lenta.
+
+O thread pool é único por processo: o número de workers limita as conexões
+usadas por páginas em todas as requisições ao mesmo tempo, e é derivado da
+capacidade do connection pool do executor (ver ComponentFactory.create_page_executor),
+deixando conexões livres para os demais endpoints.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Hashable, Iterator, Tuple
+
+
+class PageExecutor:
+    """
+    Executa tarefas de uma página em paralelo, isolando erros.
+
+    Uso:
+        page_executor = get_container().get_page_executor()
+        resultados = page_executor.run({'vendas': gerar_vendas, 'fluxo': gerar_fluxo})
+        valor, segundos = resultados['vendas']
+    """
+
+    def __init__(self, max_workers: int, logger=None):
+        """
+        Args:
+            max_workers: Tarefas executadas ao mesmo tempo no processo
+                         (<= 1: execução sequencial na thread da requisição)
+            logger: Logger estruturado (opcional)
+        """
+        self.max_workers = max_workers
+        self.logger = logger
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def run(self, tasks: Dict[Hashable, Callable[[], Any]]) -> Dict[Hashable, Tuple[Any, float]]:
+        """
+        Executa as tarefas e aguarda todas.
+
+        Uma tarefa que levanta exceção não interrompe as demais: a exceção
+        vira o resultado da tarefa.
+
+        Args:
+            tasks: {chave: função sem argumentos}
+
+        Returns:
+            {chave: (resultado ou exceção, segundos)} na ordem de tasks
+        """
+        completed = {key: (result, seconds) for key, result, seconds in self.iter_completed(tasks)}
+        return {key: completed[key] for key in tasks}
+
+    def iter_completed(self, tasks: Dict[Hashable, Callable[[], Any]]) -> Iterator[Tuple[Hashable, Any, float]]:
+        """
+        Executa as tarefas e entrega cada uma assim que termina.
+
+        Todas as tarefas são submetidas antes da primeira entrega; se o
+        consumidor parar no meio, as restantes terminam em segundo plano.
+
+        Args:
+            tasks: {chave: função sem argumentos}
+
+        Yields:
+            (chave, resultado ou exceção, segundos) na ordem de término
+        """
+        if self.max_workers <= 1 or len(tasks) <= 1:
+            for key, task in tasks.items():
+                yield (key, *self._timed(task))
+            return
+
+        pool = self._get_pool()
+        futures = {pool.submit(self._timed, task): key for key, task in tasks.items()}
+        for future in as_completed(futures):
+            yield (futures[future], *future.result())
+
+    def close(self):
+        """Encerra o thread pool (aguarda tarefas em andamento)"""
+        with self._lock:
+            pool = self._pool
+            self._pool = None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Thread pool do processo, criado na primeira página"""
+        pool = self._pool
+        if pool is None:
+            with self._lock:
+                pool = self._pool
+                if pool is None:
+                    pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='wbr-page')
+                    self._pool = pool
+                    if self.logger:
+                        self.logger.info("Thread pool de páginas criado", {'workers': self.max_workers})
+        return pool
+
+    @staticmethod
+    def _timed(task: Callable[[], Any]) -> Tuple[Any, float]:
+        """Executa uma tarefa medindo o tempo; exceções viram o resultado"""
+        start = time.perf_counter()
+        try:
+            result = task()
+        except Exception as e:
+            result = e
+        return result, time.perf_counter() - start
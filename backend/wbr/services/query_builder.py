@@ -2,46 +2,110 @@
 QueryBuilder - Constrói queries SQL dinâmicas a partir de configurações
 """
 
+import hashlib
 import re
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
+from wbr.database.interface import CompiledQuery
 from wbr.exceptions import InvalidConfigException
+from wbr.services.sql_templates import SqlTemplate, load_template
+
+
+# Identificador SQL válido: letras, números, underscore, ponto e aspas duplas
+IDENTIFIER_PATTERN = re.compile(r'^[a-zA-Z0-9_."]+$')
+
+
+@dataclass(frozen=True)
+class RgmFiltrosSemiJoin:
+    """
+    Valor de filtro resolvido no próprio banco: a coluna filtrada (chave)
+    precisa estar entre as chaves de Rgm_filtros que atendem aos critérios.
+
+    Usado no lugar de uma lista longa de chaves (ex: todas as lojas de um
+    ramo): o SQL recebe apenas os critérios, não as centenas de chaves.
+
+    Attributes:
+        match: 'all' (critérios combinados com AND) ou 'any' (OR)
+        criteria: Pares (coluna de Rgm_filtros, valor)
+    """
+
+    match: str
+    criteria: Tuple[Tuple[str, str], ...]
 
 
 class QueryBuilder:
-    """Constrói queries SQL substituindo placeholders no template"""
+    """
+    Constrói queries SQL substituindo placeholders no template.
+
+    O template é compilado uma única vez (ver sql_templates) e, para cada
+    combinação de identificadores do gráfico + formato dos filtros
+    (colunas e tipos, sem os valores), o texto SQL é memorizado. Os valores
+    dos filtros nunca entram no texto: viram parâmetros nomeados
+    (:filtro_<i>), de modo que o mesmo texto (e o mesmo statement_key) é
+    reutilizado para qualquer shopping, lista de chaves ou período.
+    """
 
-    def __init__(self, template_path: str = None):
+    # Placeholders de filtros no template -> alias de tabela das colunas filtradas
+    FILTER_PLACEHOLDERS = {'filtros_dinamicos': None}
+
+    # Colunas que precisam de TRIM(UPPER()) para comparação case-insensitive
+    TEXT_COLUMNS = frozenset({'grupo', 'categoria', 'nome_loja', 'shopping'})
+
+    # Dimensão consultada pelos filtros RgmFiltrosSemiJoin e colunas aceitas
+    RGM_FILTROS_TABLE = '"mapa_do_bosque"."Rgm_filtros"'
+    RGM_FILTROS_COLUMNS = frozenset({'grupo', 'categoria', 'name', 'sigla'})
+
+    # Limite de queries memorizadas por builder (proteção contra crescimento)
+    MAX_CACHED_QUERIES = 512
+
+    def __init__(
+        self,
+        template_path: str = None,
+        single_scan_template_path: str = None,
+        pushdown_template_path: str = None
+    ):
         """
         Inicializa QueryBuilder.
 
         Args:
             template_path: Caminho para o arquivo SQL template.
                           Se None, usa 'wbr/sql/query_template.sql'
+            single_scan_template_path: Template que cobre CY e PY em uma única
+                          query (ver build_single_scan). Se None e template_path
+                          também for None, usa 'wbr/sql/query_template_single_scan.sql';
+                          templates customizados não suportam varredura única.
+            pushdown_template_path: Template que já retorna semanas móveis e
+                          meses agregados (ver build_pushdown). Mesma regra de
+                          default, com 'wbr/sql/query_template_pushdown.sql'.
         """
+        module_dir = Path(__file__).parent.parent
         if template_path is None:
             # Caminho relativo ao módulo wbr
-            module_dir = Path(__file__).parent.parent
             self.template_path = module_dir / 'sql' / 'query_template.sql'
+            if single_scan_template_path is None:
+                single_scan_template_path = module_dir / 'sql' / 'query_template_single_scan.sql'
+            if pushdown_template_path is None:
+                pushdown_template_path = module_dir / 'sql' / 'query_template_pushdown.sql'
         else:
             self.template_path = Path(template_path)
 
-        self.template = self._load_template()
-
-    def _load_template(self) -> str:
-        """Carrega template SQL do arquivo"""
-        try:
-            with open(self.template_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except FileNotFoundError:
-            raise InvalidConfigException(
-                message=f"Template SQL não encontrado: {self.template_path}"
-            )
-        except Exception as e:
-            raise InvalidConfigException(
-                message=f"Erro ao carregar template SQL: {str(e)}"
-            )
+        self.compiled_template = self._load_template()
+        self.single_scan_template = (
+            load_template(single_scan_template_path) if single_scan_template_path else None
+        )
+        self.pushdown_template = (
+            load_template(pushdown_template_path) if pushdown_template_path else None
+        )
+        self.template = self.compiled_template.text
+        self._queries: Dict[tuple, Tuple[str, str]] = {}
+        self._queries_lock = threading.Lock()
+
+    def _load_template(self) -> SqlTemplate:
+        """Carrega template SQL compilado (lido do disco uma vez por processo)"""
+        return load_template(self.template_path)
 
     def build(
         self,
@@ -49,7 +113,7 @@ class QueryBuilder:
         data_inicio: str,
         data_fim: str,
         user_filters: Optional[Dict[str, Any]] = None
-    ) -> str:
+    ) -> CompiledQuery:
         """
         Constrói query SQL substituindo placeholders do template.
 
@@ -59,6 +123,9 @@ class QueryBuilder:
           {tabela} -> config['tabela']
           {filtros_dinamicos} -> resultado de build_filters()
 
+        As datas e os valores dos filtros são parâmetros e não alteram o
+        texto da query: CY e PY compartilham o mesmo statement_key.
+
         Args:
             config: Dicionário de configuração do gráfico
             data_inicio: Data inicial (formato: YYYY-MM-DD)
@@ -66,25 +133,273 @@ class QueryBuilder:
             user_filters: Filtros aplicados pelo usuário (opcional)
 
         Returns:
-            Query SQL completa e pronta para execução
+            CompiledQuery com SQL parametrizado e valores (datas + filtros)
+        """
+        shape, params = self._filter_shape(self._combine_filters(config, user_filters))
+        sql, statement_key = self._get_query_text(config, shape)
+
+        params['data_inicio'] = data_inicio
+        params['data_fim'] = data_fim
+
+        return CompiledQuery(sql=sql, params=params, statement_key=statement_key)
+
+    @property
+    def supports_single_scan(self) -> bool:
+        """True se o builder possui template de varredura única CY+PY"""
+        return self.single_scan_template is not None
+
+    def build_single_scan(
+        self,
+        config: Dict[str, Any],
+        cy_inicio: str,
+        cy_fim: str,
+        py_inicio: str,
+        py_fim: str,
+        user_filters: Optional[Dict[str, Any]] = None
+    ) -> CompiledQuery:
+        """
+        Constrói uma única query que cobre as janelas CY e PY.
+
+        Cada linha retornada possui a coluna periodo ('cy' ou 'py'), que
+        DataProcessor.transform_tagged_to_wbr usa para separar as séries.
+        Metade das idas ao banco e das varreduras em relação a build() x2.
+
+        Args:
+            config: Dicionário de configuração do gráfico
+            cy_inicio, cy_fim: Janela do ano atual (YYYY-MM-DD)
+            py_inicio, py_fim: Janela do ano anterior (YYYY-MM-DD)
+            user_filters: Filtros aplicados pelo usuário (opcional)
+
+        Returns:
+            CompiledQuery com SQL parametrizado e valores (janelas + filtros)
+
+        Raises:
+            InvalidConfigException: Se o builder não suportar varredura única
+        """
+        if not self.supports_single_scan:
+            raise InvalidConfigException(
+                message=f"Template não suporta varredura única: {self.template_path}",
+                grafico_id=config.get('grafico_id')
+            )
+
+        return self._build_windows(
+            self.single_scan_template, config, cy_inicio, cy_fim, py_inicio, py_fim, user_filters
+        )
+
+    @property
+    def supports_pushdown(self) -> bool:
+        """True se o builder possui template com agregação semanal/mensal no SQL"""
+        return self.pushdown_template is not None
+
+    def build_pushdown(
+        self,
+        config: Dict[str, Any],
+        cy_inicio: str,
+        cy_fim: str,
+        py_inicio: str,
+        py_fim: str,
+        user_filters: Optional[Dict[str, Any]] = None
+    ) -> CompiledQuery:
+        """
+        Constrói query que já agrega semanas móveis e meses no PostgreSQL.
+
+        Retorna cerca de 110 linhas {periodo, bucket, data, valor} (bucket =
+        'semana' ou 'mes') em vez de ~600 linhas diárias; o resultado é
+        consumido por DataProcessor.transform_aggregated_to_wbr.
+
+        A semana móvel termina em cy_fim (CY) ou py_fim (PY), que coincidem
+        com as datas de referência usadas por group_by_rolling_week.
+
+        Args:
+            mesmos de build_single_scan
+
+        Returns:
+            CompiledQuery com SQL parametrizado e valores (janelas + filtros)
+
+        Raises:
+            InvalidConfigException: Se o builder não suportar pushdown
+        """
+        if not self.supports_pushdown:
+            raise InvalidConfigException(
+                message=f"Template não suporta agregação no SQL: {self.template_path}",
+                grafico_id=config.get('grafico_id')
+            )
+
+        return self._build_windows(
+            self.pushdown_template, config, cy_inicio, cy_fim, py_inicio, py_fim, user_filters
+        )
+
+    def _build_windows(
+        self,
+        template: SqlTemplate,
+        config: Dict[str, Any],
+        cy_inicio: str,
+        cy_fim: str,
+        py_inicio: str,
+        py_fim: str,
+        user_filters: Optional[Dict[str, Any]] = None
+    ) -> CompiledQuery:
+        """Monta template que recebe as duas janelas (CY e PY) como parâmetros"""
+        shape, params = self._filter_shape(self._combine_filters(config, user_filters))
+        sql, statement_key = self._get_query_text(config, shape, template)
+
+        params['cy_inicio'] = cy_inicio
+        params['cy_fim'] = cy_fim
+        params['py_inicio'] = py_inicio
+        params['py_fim'] = py_fim
+
+        return CompiledQuery(sql=sql, params=params, statement_key=statement_key)
+
+    def build_batch(
+        self,
+        charts: List[Tuple[str, Dict[str, Any]]],
+        cy_inicio: str,
+        cy_fim: str,
+        py_inicio: str,
+        py_fim: str,
+        user_filters: Optional[Dict[str, Any]] = None,
+        pushdown: bool = True
+    ) -> CompiledQuery:
+        """
+        Constrói uma única query (UNION ALL) para vários gráficos.
+
+        Cada ramo é a query de build_pushdown (ou build_single_scan, se
+        pushdown=False) de um gráfico, com a coluna grafico_id identificando
+        as linhas. Todos os gráficos precisam ter a mesma filter_signature
+        (mesmos filtros combinados), pois os parâmetros são compartilhados.
+
+        Args:
+            charts: Lista de (grafico_id, config)
+            cy_inicio, cy_fim, py_inicio, py_fim: Janelas CY e PY (YYYY-MM-DD)
+            user_filters: Filtros aplicados pelo usuário (opcional)
+            pushdown: Usa template com agregação no SQL (default) ou varredura única
+
+        Returns:
+            CompiledQuery com linhas {grafico_id, periodo, ...} ordenadas por
+            grafico_id, periodo, data
+
+        Raises:
+            InvalidConfigException: Se o template não suportar o modo ou os
+                                    filtros dos gráficos forem diferentes
         """
-        query = self.template
+        template = self.pushdown_template if pushdown else self.single_scan_template
+        if template is None:
+            raise InvalidConfigException(
+                message=f"Template não suporta consultas em lote: {self.template_path}"
+            )
 
-        # Substitui placeholders básicos
-        query = query.replace('{coluna_data}', self._sanitize_identifier(config['colunas']['data']))
-        query = query.replace('{coluna_valor}', self._sanitize_identifier(config['colunas']['valor']))
-        query = query.replace('{tabela}', self._sanitize_identifier(config['tabela']))
+        signatures = {self.filter_signature(config, user_filters) for _, config in charts}
+        if len(signatures) > 1:
+            raise InvalidConfigException(
+                message="Gráficos de um lote precisam ter os mesmos filtros",
+                grafico_id=', '.join(grafico_id for grafico_id, _ in charts)
+            )
+
+        shape, params = self._filter_shape(self._combine_filters(charts[0][1], user_filters))
+
+        key = (
+            'lote',
+            id(template),
+            tuple((grafico_id, self._template_key(config)) for grafico_id, config in charts),
+            shape
+        )
+        cached = self._queries.get(key)
+        if cached is None:
+            branches = []
+            for grafico_id, config in charts:
+                sql, _ = self._get_query_text(config, shape, template)
+                grafico_literal = grafico_id.replace("'", "''")
+                branches.append(
+                    f"SELECT '{grafico_literal}' AS grafico_id, B.*\n"
+                    f"FROM (\n{sql.strip().rstrip(';')}\n) AS B"
+                )
+            sql = '\nUNION ALL\n'.join(branches) + '\nORDER BY grafico_id, periodo, data;'
+            cached = (sql, hashlib.md5(sql.encode('utf-8')).hexdigest())
+
+            with self._queries_lock:
+                if len(self._queries) >= self.MAX_CACHED_QUERIES:
+                    self._queries.clear()
+                self._queries[key] = cached
+
+        params['cy_inicio'] = cy_inicio
+        params['cy_fim'] = cy_fim
+        params['py_inicio'] = py_inicio
+        params['py_fim'] = py_fim
+
+        return CompiledQuery(sql=cached[0], params=params, statement_key=cached[1])
+
+    def filter_signature(self, config: Dict[str, Any], user_filters: Optional[Dict[str, Any]] = None) -> tuple:
+        """
+        Assinatura (hashable) dos filtros combinados de um gráfico.
 
-        # Combina filtros de configuração + filtros do usuário
+        Gráficos com a mesma assinatura geram os mesmos parâmetros e podem
+        ser agrupados em build_batch.
+        """
+        shape, params = self._filter_shape(self._combine_filters(config, user_filters))
+        values = tuple(
+            tuple(valor) if isinstance(valor, list) else valor
+            for valor in params.values()
+        )
+        return (shape, values)
+
+    def _combine_filters(self, config: Dict[str, Any], user_filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combina filtros de configuração + filtros do usuário"""
         combined_filters = {**config.get('filtros', {})}
         if user_filters:
             combined_filters.update(user_filters)
+        return combined_filters
+
+    def _template_key(self, config: Dict[str, Any]) -> tuple:
+        """Identificadores do config usados no template (chave de memorização)"""
+        colunas = config['colunas']
+        return (colunas['data'], colunas['valor'], config['tabela'])
+
+    def _template_values(self, config: Dict[str, Any]) -> Dict[str, str]:
+        """Valores sanitizados dos placeholders de identificadores"""
+        return {
+            'coluna_data': self._sanitize_identifier(config['colunas']['data']),
+            'coluna_valor': self._sanitize_identifier(config['colunas']['valor']),
+            'tabela': self._sanitize_identifier(config['tabela']),
+        }
+
+    def _get_query_text(
+        self,
+        config: Dict[str, Any],
+        shape: tuple,
+        template: SqlTemplate = None
+    ) -> Tuple[str, str]:
+        """
+        Retorna (sql, statement_key) para um config e formato de filtros.
 
-        # Constrói e substitui filtros dinâmicos
-        filtros_sql = self.build_filters(combined_filters)
-        query = query.replace('{filtros_dinamicos}', filtros_sql)
+        Memorizado por (template, identificadores do config, formato dos filtros).
 
-        return query
+        Args:
+            template: Template a usar (default: template principal do builder)
+        """
+        template = template or self.compiled_template
+        key = (id(template), self._template_key(config), shape)
+        cached = self._queries.get(key)
+        if cached is not None:
+            return cached
+
+        values = self._template_values(config)
+        values.update(self._filter_values(shape))
+        sql = template.render(values)
+        cached = (sql, hashlib.md5(sql.encode('utf-8')).hexdigest())
+
+        with self._queries_lock:
+            if len(self._queries) >= self.MAX_CACHED_QUERIES:
+                self._queries.clear()
+            self._queries[key] = cached
+
+        return cached
+
+    def _filter_values(self, shape: tuple) -> Dict[str, str]:
+        """Cláusulas de filtro de cada placeholder de FILTER_PLACEHOLDERS"""
+        return {
+            placeholder: self._compile_filters(shape, table_alias)
+            for placeholder, table_alias in self.FILTER_PLACEHOLDERS.items()
+        }
 
     @staticmethod
     def calculate_date_range(data_referencia: str) -> tuple[str, str]:
@@ -128,72 +443,138 @@ class QueryBuilder:
                 message=f"Data de referência inválida: '{data_referencia}'. Use formato YYYY-MM-DD"
             )
 
-    def build_filters(self, filtros: Dict[str, Any]) -> str:
+    def build_filters(self, filtros: Dict[str, Any], table_alias: str = None) -> str:
         """
-        Converte dicionário de filtros em cláusulas SQL WHERE.
+        Converte dicionário de filtros em cláusulas SQL WHERE parametrizadas.
 
         Regras:
         - Valores None/null são ignorados
-        - Strings são escapadas para prevenir SQL injection
+        - Valores nunca entram no SQL: cada filtro usa o parâmetro :filtro_<i>
+          (valores obtidos via _filter_shape)
+        - Listas viram "= ANY(:filtro_<i>)" (parâmetro do tipo array)
+        - RgmFiltrosSemiJoin vira "IN (SELECT chave FROM Rgm_filtros WHERE ...)",
+          com um parâmetro :filtro_<i>_<n> por critério
         - Cada filtro vira uma cláusula AND
         - Colunas de texto (grupo, categoria, nome_loja, shopping) usam TRIM(UPPER())
           para comparação case-insensitive
 
         Args:
             filtros: Dicionário {coluna: valor}
+            table_alias: Alias da tabela usado como prefixo das colunas (opcional)
 
         Returns:
-            String com cláusulas WHERE (ex: "AND regiao = 'Nordeste'\nAND status = 'APROVADO'")
+            String com cláusulas WHERE
 
         Example:
-            Input: {"regiao": "Nordeste", "status": "APROVADO", "tipo": None}
-            Output: "AND regiao = 'Nordeste'\nAND status = 'APROVADO'"
+            Input: {"regiao": "Nordeste", "chave": ["1", "2"], "tipo": None}
+            Output: "AND regiao = :filtro_0\n    AND chave = ANY(:filtro_1)"
+        """
+        shape, _ = self._filter_shape(filtros)
+        return self._compile_filters(shape, table_alias)
+
+    def _filter_shape(self, filtros: Dict[str, Any]) -> Tuple[tuple, Dict[str, Any]]:
+        """
+        Separa filtros em formato (colunas + tipo de comparação) e valores.
+
+        Returns:
+            Tupla (shape, params):
+              shape: tupla de (coluna, tipo) na ordem dos filtros
+              params: {'filtro_<i>': valor} para cada item do shape
         """
         if not filtros:
-            return ""
+            return (), {}
 
-        clauses = []
-        # Colunas que precisam de TRIM(UPPER()) para comparação case-insensitive
-        text_columns = ['grupo', 'categoria', 'nome_loja', 'shopping']
+        shape = []
+        params = {}
 
         for coluna, valor in filtros.items():
             # Ignora valores None/null ou strings vazias
             if valor is None or (isinstance(valor, str) and not valor.strip()):
                 continue
 
+            if isinstance(valor, RgmFiltrosSemiJoin):
+                colunas = [criterio for criterio, _ in valor.criteria]
+                if valor.match not in ('all', 'any') or not self.RGM_FILTROS_COLUMNS.issuperset(colunas):
+                    raise InvalidConfigException(
+                        message=f"Semi-join em Rgm_filtros inválido para '{coluna}': {valor}"
+                    )
+                for n, (_, criterio_valor) in enumerate(valor.criteria):
+                    params[f'filtro_{len(shape)}_{n}'] = criterio_valor
+                shape.append((coluna, f"semijoin_{valor.match}:{','.join(colunas)}"))
+                continue
+
+            if isinstance(valor, (list, tuple)):
+                kind = 'lista'
+                valor = list(valor)
+            elif isinstance(valor, (str, int, float)):
+                kind = 'valor'
+            else:
+                continue
+
+            # Colunas de texto só aceitam strings (ou listas de strings)
+            if coluna in self.TEXT_COLUMNS:
+                if kind == 'valor' and not isinstance(valor, str):
+                    continue
+                kind = f'texto_{kind}'
+
+            params[f'filtro_{len(shape)}'] = valor
+            shape.append((coluna, kind))
+
+        return tuple(shape), params
+
+    def _compile_filters(self, shape: tuple, table_alias: str = None, exclude: frozenset = frozenset()) -> str:
+        """
+        Monta cláusulas WHERE para um formato de filtros.
+
+        As colunas são sanitizadas aqui, uma única vez por formato.
+
+        Args:
+            exclude: Colunas do shape que não entram nas cláusulas (aplicadas
+                     em outro ponto do template); os índices dos parâmetros
+                     :filtro_<i> das demais colunas não mudam
+        """
+        clauses = []
+
+        for i, (coluna, kind) in enumerate(shape):
+            if coluna in exclude:
+                continue
+
             # Sanitiza nome da coluna (previne SQL injection)
             coluna_safe = self._sanitize_identifier(coluna)
+            coluna_ref = f"{table_alias}.{coluna_safe}" if table_alias else coluna_safe
+
+            if kind.startswith('semijoin_'):
+                clauses.append(f"AND {coluna_ref} IN ({self._compile_semijoin(kind, i)})")
+                continue
 
-            # Para colunas de texto, usa TRIM(UPPER()) na comparação
-            if coluna in text_columns:
-                if isinstance(valor, str):
-                    valor_safe = self._sanitize_string_value(valor)
-                    clauses.append(f"AND TRIM(UPPER({coluna_safe})) = '{valor_safe}'")
-                elif isinstance(valor, list):
-                    valores_safe = [self._sanitize_string_value(v) for v in valor]
-                    valores_str = "', '".join(valores_safe)
-                    clauses.append(f"AND TRIM(UPPER({coluna_safe})) IN ('{valores_str}')")
+            if kind.startswith('texto_'):
+                coluna_ref = f"TRIM(UPPER({coluna_ref}))"
+
+            if kind.endswith('lista'):
+                clauses.append(f"AND {coluna_ref} = ANY(:filtro_{i})")
             else:
-                # Para outras colunas, usa o comportamento padrão
-                if isinstance(valor, str):
-                    valor_safe = self._sanitize_string_value(valor)
-                    clauses.append(f"AND {coluna_safe} = '{valor_safe}'")
-                elif isinstance(valor, (int, float)):
-                    clauses.append(f"AND {coluna_safe} = {valor}")
-                elif isinstance(valor, bool):
-                    clauses.append(f"AND {coluna_safe} = {str(valor).upper()}")
-                elif isinstance(valor, list):
-                    # Para listas, usa IN
-                    if all(isinstance(v, str) for v in valor):
-                        valores_safe = [self._sanitize_string_value(v) for v in valor]
-                        valores_str = "', '".join(valores_safe)
-                        clauses.append(f"AND {coluna_safe} IN ('{valores_str}')")
-                    else:
-                        valores_str = ", ".join(str(v) for v in valor)
-                        clauses.append(f"AND {coluna_safe} IN ({valores_str})")
+                clauses.append(f"AND {coluna_ref} = :filtro_{i}")
 
         return '\n    '.join(clauses)
 
+    def _compile_semijoin(self, kind: str, i: int) -> str:
+        """
+        Subquery de chaves de Rgm_filtros de um filtro RgmFiltrosSemiJoin.
+
+        Não correlacionada (colunas internas sempre com o alias RF): o
+        PostgreSQL a executa como semi-join com a tabela do gráfico.
+        """
+        match, _, colunas = kind[len('semijoin_'):].partition(':')
+        condicoes = [
+            f"RF.{coluna} = :filtro_{i}_{n}"
+            for n, coluna in enumerate(colunas.split(',') if colunas else [])
+        ]
+
+        subquery = f"SELECT RF.chave FROM {self.RGM_FILTROS_TABLE} AS RF"
+        if condicoes:
+            subquery += ' WHERE ' + (' AND ' if match == 'all' else ' OR ').join(condicoes)
+        return subquery
+
     def _sanitize_identifier(self, identifier: str) -> str:
         """
         Sanitiza identificadores SQL (nomes de tabelas, colunas).
@@ -216,7 +597,7 @@ class QueryBuilder:
         #   - public.users
         #   - "mapa_do_bosque"."Rgm_valor_bruto"
         #   - vendas_gshop
-        if not re.match(r'^[a-zA-Z0-9_."]+$', identifier):
+        if not IDENTIFIER_PATTERN.match(identifier):
             raise InvalidConfigException(
                 message=f"Identificador SQL inválido: '{identifier}'"
             )
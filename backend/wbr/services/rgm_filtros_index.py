@@ -0,0 +1,316 @@
+"""
+RgmFiltrosIndex - Índice em memória de "mapa_do_bosque"."Rgm_filtros"
+
+Rgm_filtros é uma dimensão pequena (lojas com grupo, categoria, nome e
+sigla do shopping) que só muda na sincronização. O índice é carregado uma
+única vez por processo e recarregado quando a versão dos dados da tabela
+muda (DataVersionTracker). Resolver ramo/categoria/loja em chaves e montar
+as opções em cascata dos filtros passa a ser operação de bits em memória,
+sem ida ao banco.
+
+Cada valor de cada coluna é codificado como um bitset (int) sobre os ids
+sequenciais das linhas da dimensão: a interseção é feita por linha, como o
+WHERE grupo = ... AND categoria = ... da consulta original, e só então as
+linhas são convertidas em chaves ou valores.
+
+Os valores distintos de cada coluna são mantidos na ordem do ORDER BY do
+PostgreSQL (collation do banco), calculada na própria carga.
+
+Para o autocomplete (search), cada coluna tem também uma lista ordenada de
+chaves normalizadas (sem acentos, minúsculas) a partir do início de cada
+palavra do valor: uma busca por prefixo é uma busca binária nessa lista.
+"""
+
+import bisect
+import re
+import threading
+import unicodedata
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
+
+from wbr.services.query_builder import RgmFiltrosSemiJoin
+
+
+# Início de cada palavra de um valor já normalizado
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def normalize(text: str) -> str:
+    """Texto para comparação: sem acentos, minúsculo e com espaços simples"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
+
+
+class _Snapshot:
+    """Conteúdo imutável do índice em uma versão da tabela"""
+
+    __slots__ = ('version', 'chaves', 'bits', 'ordered', 'all_rows', 'prefixes')
+
+    def __init__(
+        self,
+        version: Optional[tuple],
+        chaves: List[Optional[str]],
+        bits: Dict[str, Dict[str, int]],
+        ordered: Dict[str, Tuple[str, ...]]
+    ):
+        self.version = version
+        # id da linha -> chave (None se a linha não tiver chave)
+        self.chaves = chaves
+        # coluna -> valor -> bitset das linhas
+        self.bits = bits
+        # coluna -> valores distintos na ordem do banco
+        self.ordered = ordered
+        self.all_rows = (1 << len(chaves)) - 1
+        # coluna -> (chaves de busca ordenadas, [(palavra inicial?, posição em ordered)])
+        self.prefixes = {column: self._prefixes(values) for column, values in ordered.items()}
+
+    @staticmethod
+    def _prefixes(values: Tuple[str, ...]) -> Tuple[List[str], List[Tuple[bool, int]]]:
+        """Chaves normalizadas a partir de cada palavra de cada valor"""
+        entries = []
+        for position, value in enumerate(values):
+            normalized = normalize(value)
+            for word in WORD_PATTERN.finditer(normalized):
+                entries.append((normalized[word.start():], word.start() == 0, position))
+        entries.sort()
+        return [entry[0] for entry in entries], [(entry[1], entry[2]) for entry in entries]
+
+
+class RgmFiltrosIndex:
+    """
+    Resolve filtros de RGM (ramo, categoria, loja, shopping) em chaves.
+
+    Uso:
+        index = get_container().get_rgm_filtros_index()
+        chaves = index.match_all(grupo='Moda', categoria='Vestuário')
+        chaves = index.match_any(grupo='Moda', name='Loja B1')
+        lojas = index.options('name', sigla='SCIB', grupo='Moda')
+        lojas = index.search('name', 'loja b', limit=10, sigla='SCIB')
+        user_filters['chave'] = index.chave_filter('all', grupo='Moda')
+    """
+
+    TABLE = '"mapa_do_bosque"."Rgm_filtros"'
+
+    # Colunas indexadas (critérios de match_all/match_any/options/search)
+    COLUMNS = ('grupo', 'categoria', 'name', 'sigla')
+
+    def __init__(self, db_executor, data_version, semijoin_threshold: int = 100, logger=None):
+        """
+        Args:
+            db_executor: Executor de queries
+            data_version: DataVersionTracker (detecta sincronizações da tabela)
+            semijoin_threshold: Acima deste número de chaves, chave_filter
+                                retorna um semi-join em vez da lista (<= 0: sempre lista)
+            logger: Logger estruturado (opcional)
+        """
+        self.db_executor = db_executor
+        self.data_version = data_version
+        self.semijoin_threshold = semijoin_threshold
+        self.logger = logger
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.Lock()
+
+    def match_all(self, **criteria: Optional[str]) -> FrozenSet[str]:
+        """
+        Chaves das linhas que atendem a todos os critérios (AND).
+
+        Critérios vazios/None são ignorados; sem critérios retorna todas as
+        chaves da dimensão.
+
+        Args:
+            **criteria: Valores por coluna (grupo, categoria, name, sigla)
+
+        Returns:
+            Conjunto de chaves
+        """
+        snapshot = self._current()
+        return self._chaves(snapshot, self._mask_all(snapshot, criteria))
+
+    def match_any(self, **criteria: Optional[str]) -> FrozenSet[str]:
+        """
+        Chaves das linhas que atendem a pelo menos um dos critérios (OR).
+
+        Critérios vazios/None são ignorados; sem critérios retorna conjunto vazio.
+
+        Args:
+            **criteria: Valores por coluna (grupo, categoria, name, sigla)
+
+        Returns:
+            Conjunto de chaves
+        """
+        snapshot = self._current()
+        mask = 0
+        for column, value in self._criteria(criteria):
+            mask |= snapshot.bits[column].get(value, 0)
+        return self._chaves(snapshot, mask)
+
+    def chave_filter(self, match: str, **criteria: Optional[str]) -> Union[None, str, List[str], RgmFiltrosSemiJoin]:
+        """
+        Valor do filtro de chave dos gráficos RGM.
+
+        Args:
+            match: 'all' (match_all) ou 'any' (match_any)
+            **criteria: Valores por coluna (grupo, categoria, name, sigla)
+
+        Returns:
+            None se nenhuma chave atender (sem filtro), a chave (=) se for
+            única, a lista ordenada de chaves (= ANY) ou, acima de
+            semijoin_threshold chaves, os próprios critérios como
+            RgmFiltrosSemiJoin (resolvidos no banco junto com a agregação)
+        """
+        chaves = self.match_all(**criteria) if match == 'all' else self.match_any(**criteria)
+        if not chaves:
+            return None
+        if len(chaves) == 1:
+            return next(iter(chaves))
+        if self.semijoin_threshold <= 0 or len(chaves) <= self.semijoin_threshold:
+            return sorted(chaves)
+        return RgmFiltrosSemiJoin(match, tuple(self._criteria(criteria)))
+
+    def options(self, column: str, **criteria: Optional[str]) -> Tuple[str, ...]:
+        """
+        Valores distintos (não nulos) de uma coluna nas linhas que atendem a
+        todos os critérios, na ordem do banco.
+
+        Equivale a SELECT DISTINCT coluna ... WHERE critérios AND coluna IS
+        NOT NULL ORDER BY coluna.
+
+        Args:
+            column: Coluna das opções (grupo, categoria, name, sigla)
+            **criteria: Valores por coluna (vazios/None são ignorados)
+
+        Returns:
+            Tupla de valores
+        """
+        if column not in self.COLUMNS:
+            raise ValueError(f"Coluna não indexada em Rgm_filtros: {column}")
+
+        snapshot = self._current()
+        mask = self._mask_all(snapshot, criteria)
+        if mask == snapshot.all_rows:
+            return snapshot.ordered[column]
+
+        bits = snapshot.bits[column]
+        return tuple(value for value in snapshot.ordered[column] if bits[value] & mask)
+
+    def search(self, column: str, query: str, limit: int = 10, **criteria: Optional[str]) -> Tuple[str, ...]:
+        """
+        Valores de uma coluna com alguma palavra iniciada por query
+        (sem diferenciar acentos e maiúsculas), nas linhas que atendem a
+        todos os critérios.
+
+        Valores que começam por query vêm primeiro; em seguida os que têm
+        outra palavra iniciada por query. Dentro de cada grupo, ordem do banco.
+
+        Args:
+            column: Coluna pesquisada (grupo, categoria, name, sigla)
+            query: Prefixo buscado (vazio: primeiros valores da coluna)
+            limit: Número máximo de valores
+            **criteria: Valores por coluna (vazios/None são ignorados)
+
+        Returns:
+            Tupla com até limit valores
+        """
+        if column not in self.COLUMNS:
+            raise ValueError(f"Coluna não indexada em Rgm_filtros: {column}")
+
+        prefix = normalize(query)
+        if not prefix:
+            return self.options(column, **criteria)[:limit]
+
+        snapshot = self._current()
+        mask = self._mask_all(snapshot, criteria)
+        values = snapshot.ordered[column]
+        bits = snapshot.bits[column]
+        keys, entries = snapshot.prefixes[column]
+
+        # posição em ordered -> melhor ranking (0: início do valor, 1: outra palavra)
+        matches: Dict[int, int] = {}
+        for i in range(bisect.bisect_left(keys, prefix), len(keys)):
+            if not keys[i].startswith(prefix):
+                break
+            at_start, position = entries[i]
+            if bits[values[position]] & mask:
+                rank = 0 if at_start else 1
+                matches[position] = min(rank, matches.get(position, rank))
+
+        ranked = sorted(matches, key=lambda position: (matches[position], position))
+        return tuple(values[position] for position in ranked[:limit])
+
+    def _mask_all(self, snapshot: _Snapshot, criteria: Dict[str, Optional[str]]) -> int:
+        """Bitset das linhas que atendem a todos os critérios"""
+        mask = snapshot.all_rows
+        for column, value in self._criteria(criteria):
+            mask &= snapshot.bits[column].get(value, 0)
+            if not mask:
+                break
+        return mask
+
+    def _chaves(self, snapshot: _Snapshot, mask: int) -> FrozenSet[str]:
+        """Chaves das linhas de um bitset"""
+        chaves = set()
+        while mask:
+            lowest = mask & -mask
+            chave = snapshot.chaves[lowest.bit_length() - 1]
+            if chave is not None:
+                chaves.add(chave)
+            mask ^= lowest
+        return frozenset(chaves)
+
+    def _criteria(self, criteria: Dict[str, Optional[str]]) -> Iterator[Tuple[str, str]]:
+        """Critérios preenchidos, validando os nomes de coluna"""
+        for column, value in criteria.items():
+            if column not in self.COLUMNS:
+                raise ValueError(f"Coluna não indexada em Rgm_filtros: {column}")
+            if value:
+                yield column, value
+
+    def _current(self) -> _Snapshot:
+        """Snapshot da versão atual da tabela (recarrega se mudou)"""
+        version = self.data_version.version(self.TABLE)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = self._load(version)
+                self._snapshot = snapshot
+
+        return snapshot
+
+    def _load(self, version: Optional[tuple]) -> _Snapshot:
+        """
+        Lê a dimensão inteira e monta os bitsets.
+
+        A posição de cada valor no ORDER BY do banco vem junto, em
+        dense_rank() por coluna.
+        """
+        ranks = ', '.join(
+            f'dense_rank() OVER (ORDER BY {column}) AS "ordem_{column}"' for column in self.COLUMNS
+        )
+        rows = self.db_executor.execute(
+            f"SELECT chave, {', '.join(self.COLUMNS)}, {ranks} FROM {self.TABLE}"
+        )
+
+        chaves = []
+        bits: Dict[str, Dict[str, int]] = {column: {} for column in self.COLUMNS}
+        ranking: Dict[str, Dict[str, int]] = {column: {} for column in self.COLUMNS}
+        for row_id, row in enumerate(rows):
+            chaves.append(row['chave'])
+            for column in self.COLUMNS:
+                value = row[column]
+                if value is not None:
+                    bits[column][value] = bits[column].get(value, 0) | (1 << row_id)
+                    ranking[column][value] = row[f'ordem_{column}']
+
+        ordered = {
+            column: tuple(sorted(values, key=values.get))
+            for column, values in ranking.items()
+        }
+
+        if self.logger:
+            self.logger.info("Índice de Rgm_filtros carregado", {'linhas': len(chaves)})
+
+        return _Snapshot(version, chaves, bits, ordered)
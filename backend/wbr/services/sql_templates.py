@@ -0,0 +1,158 @@
+"""
+SqlTemplate - Templates SQL pré-compilados em segmentos
+
+Cada arquivo .sql em wbr/sql/ é lido e dividido uma única vez por processo
+em uma lista de segmentos (texto literal + placeholders {nome}). Montar uma
+query passa a ser um simples ''.join() dos segmentos, sem str.replace
+repetidos sobre o texto completo.
+"""
+
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+from wbr.exceptions import InvalidConfigException
+
+
+# Placeholder no formato {nome}
+PLACEHOLDER_PATTERN = re.compile(r'\{(\w+)\}')
+
+
+class SqlTemplate:
+    """
+    Template SQL dividido em segmentos.
+
+    Segmentos em posições pares são texto literal e em posições ímpares são
+    nomes de placeholders:
+        "SELECT {col} FROM {tabela}" -> ['SELECT ', 'col', ' FROM ', 'tabela', '']
+
+    Instâncias são imutáveis: substitute() retorna um novo template.
+    """
+
+    __slots__ = ('segments', 'placeholders')
+
+    def __init__(self, segments: List[str]):
+        self.segments: Tuple[str, ...] = tuple(segments)
+        self.placeholders = frozenset(self.segments[1::2])
+
+    @classmethod
+    def parse(cls, text: str) -> 'SqlTemplate':
+        """Divide texto SQL em segmentos (re.split mantém os grupos capturados)"""
+        return cls(PLACEHOLDER_PATTERN.split(text))
+
+    def substitute(self, values: Dict[str, Union[str, 'SqlTemplate']]) -> 'SqlTemplate':
+        """
+        Substitui parte dos placeholders, retornando novo template.
+
+        Valores podem ser strings (inseridas como texto literal, sem nova
+        interpretação de placeholders) ou outros SqlTemplate (cujos
+        placeholders passam a fazer parte do resultado).
+
+        Args:
+            values: Dicionário {placeholder: valor}
+
+        Returns:
+            Novo SqlTemplate com segmentos literais adjacentes já concatenados
+        """
+        segments = [self.segments[0]]
+
+        for i in range(1, len(self.segments), 2):
+            name = self.segments[i]
+            literal = self.segments[i + 1]
+            value = values.get(name)
+
+            if value is None:
+                segments.extend((name, literal))
+            elif isinstance(value, SqlTemplate):
+                segments[-1] += value.segments[0]
+                segments.extend(value.segments[1:])
+                segments[-1] += literal
+            else:
+                segments[-1] += value + literal
+
+        return SqlTemplate(segments)
+
+    def render(self, values: Dict[str, str] = None) -> str:
+        """
+        Monta o texto final.
+
+        Placeholders sem valor são mantidos como {nome}, igual ao
+        comportamento de str.replace quando o placeholder não é substituído.
+        """
+        segments = self.segments
+        if len(segments) == 1:
+            return segments[0]
+
+        values = values or {}
+        parts = list(segments)
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            value = values.get(name)
+            parts[i] = value if value is not None else '{' + name + '}'
+
+        return ''.join(parts)
+
+    def without_header(self) -> 'SqlTemplate':
+        """
+        Template sem o cabeçalho de comentários (linhas iniciais "--" ou em branco).
+
+        Raises:
+            InvalidConfigException: Se não houver SQL depois do cabeçalho
+        """
+        lines = self.segments[0].splitlines(keepends=True)
+        start = 0
+        while start < len(lines) and (not lines[start].strip() or lines[start].lstrip().startswith('--')):
+            start += 1
+
+        if start == len(lines) and len(self.segments) == 1:
+            raise InvalidConfigException(
+                message="Template SQL sem comandos depois do cabeçalho de comentários"
+            )
+
+        return SqlTemplate([''.join(lines[start:]), *self.segments[1:]])
+
+    @property
+    def text(self) -> str:
+        """Texto original do template (placeholders intactos)"""
+        return self.render()
+
+
+_templates: Dict[Path, SqlTemplate] = {}
+_templates_lock = threading.Lock()
+
+
+def load_template(template_path: Union[str, Path]) -> SqlTemplate:
+    """
+    Retorna template compilado para um arquivo .sql.
+
+    O arquivo é lido e compilado apenas na primeira chamada para cada
+    caminho; as chamadas seguintes (de qualquer QueryBuilder) reutilizam o
+    mesmo SqlTemplate.
+
+    Raises:
+        InvalidConfigException: Se o arquivo não existir ou não puder ser lido
+    """
+    path = Path(template_path).resolve()
+
+    template = _templates.get(path)
+    if template is not None:
+        return template
+
+    with _templates_lock:
+        template = _templates.get(path)
+        if template is None:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    template = SqlTemplate.parse(f.read())
+            except FileNotFoundError:
+                raise InvalidConfigException(
+                    message=f"Template SQL não encontrado: {template_path}"
+                )
+            except Exception as e:
+                raise InvalidConfigException(
+                    message=f"Erro ao carregar template SQL: {str(e)}"
+                )
+            _templates[path] = template
+
+    return template
@@ -0,0 +1,159 @@
+"""
+VectorizedDataProcessor - DataProcessor com agregações em NumPy
+
+Mesmo formato de saída do DataProcessor (byte a byte), mas cada série
+(CY e PY) é convertida uma única vez em arrays (datas em datetime64[D] e
+valores em float64) e as semanas e meses saem de operações sobre os arrays:
+
+    - semana móvel: (data_referencia - data) // 7
+    - semana fixa (domingo): (dias desde a época + 4) // 7
+    - mês: astype('datetime64[M]')
+
+A soma de cada bucket usa np.bincount sobre o código do bucket, que
+acumula na ordem das linhas como o loop em Python (mesmo resultado de
+ponto flutuante). Os buckets saem em ordem de código, sem ordenar as
+chaves ISO depois, e cada rótulo vem do DateCalendar pelo ordinal do dia.
+"""
+
+from datetime import date, datetime
+from operator import itemgetter
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from wbr.exceptions import DataTransformationException
+from wbr.services.data_processor import DataProcessor
+
+
+# date.toordinal() de 1970-01-01 (época do datetime64)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+_get_data = itemgetter('data')
+_get_valor = itemgetter('valor')
+
+
+class VectorizedDataProcessor(DataProcessor):
+    """
+    Processa e transforma dados brutos para formato WBR usando NumPy.
+
+    Selecionado com WBR_DATA_PROCESSOR=numpy (ver ComponentFactory.create_data_processor).
+    """
+
+    def transform_to_wbr(
+        self,
+        dados_cy: List[Dict[str, Any]],
+        dados_py: List[Dict[str, Any]],
+        agrupamento: str,
+        ano_atual: int,
+        ano_anterior: int,
+        data_referencia: date = None,
+        usar_semana_movel: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Transforma dados brutos em formato WBR completo (ver DataProcessor.transform_to_wbr).
+
+        Raises:
+            DataTransformationException: Se houver erro na transformação
+        """
+        try:
+            dias_cy, valores_cy = self._to_arrays(dados_cy)
+            dias_py, valores_py = self._to_arrays(dados_py)
+
+            if usar_semana_movel and data_referencia:
+                if isinstance(data_referencia, datetime):
+                    data_referencia = data_referencia.date()
+                semanas_cy = self._rolling_weeks(dias_cy, valores_cy, data_referencia)
+                semanas_py = self._rolling_weeks(dias_py, valores_py, self._reference_py(data_referencia))
+            else:
+                semanas_cy = self._weeks(dias_cy, valores_cy)
+                semanas_py = self._weeks(dias_py, valores_py)
+
+            flags = self.calculate_partial_flags(dados_cy, dados_py)
+
+            return {
+                "semanas_cy": semanas_cy,
+                "semanas_py": semanas_py,
+                "meses_cy": self._months(dias_cy, valores_cy),
+                "meses_py": self._months(dias_py, valores_py),
+                "ano_atual": ano_atual,
+                "ano_anterior": ano_anterior,
+                **flags
+            }
+
+        except Exception as e:
+            raise DataTransformationException(
+                message=f"Erro ao transformar dados: {str(e)}",
+                data_sample={'cy_count': len(dados_cy), 'py_count': len(dados_py)}
+            )
+
+    def _to_arrays(self, dados: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Datas como dias desde a época (int64) e valores como float64.
+
+        date e datetime são convertidos por toordinal (datetime: a data,
+        como em _parse_date); strings passam por _parse_date.
+        """
+        datas = list(map(_get_data, dados))
+        try:
+            ordinais = np.fromiter(map(date.toordinal, datas), dtype=np.int64, count=len(datas))
+        except TypeError:
+            ordinais = np.fromiter(
+                (self._parse_date(data).toordinal() for data in datas), dtype=np.int64, count=len(datas)
+            )
+
+        # float() por valor, como no DataProcessor (None falha da mesma forma)
+        valores = np.fromiter(map(float, map(_get_valor, dados)), dtype=np.float64, count=len(dados))
+        return ordinais - EPOCH_ORDINAL, valores
+
+    def _rolling_weeks(self, dias: np.ndarray, valores: np.ndarray, data_referencia: date) -> Dict[str, Any]:
+        """Semanas móveis de 7 dias terminando em data_referencia (datas futuras ignoradas)"""
+        referencia = data_referencia.toordinal() - EPOCH_ORDINAL
+        dias_antes = referencia - dias
+        passado = dias_antes >= 0
+        semanas, somas = self._sum_by(dias_antes[passado] // 7, valores[passado])
+        # Semana 0 é a mais recente: ordem crescente de data é a inversa
+        return self._format(referencia - semanas[::-1] * 7, somas[::-1])
+
+    def _weeks(self, dias: np.ndarray, valores: np.ndarray) -> Dict[str, Any]:
+        """Semanas fixas iniciando no domingo (1970-01-01 foi quinta-feira)"""
+        semanas, somas = self._sum_by((dias + 4) // 7, valores)
+        return self._format(semanas * 7 - 4, somas)
+
+    def _months(self, dias: np.ndarray, valores: np.ndarray) -> Dict[str, Any]:
+        """Meses (primeiro dia do mês)"""
+        meses, somas = self._sum_by(dias.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64), valores)
+        return self._format(meses.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64), somas)
+
+    def _sum_by(self, codigos: np.ndarray, valores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Soma dos valores por código de bucket (inteiro).
+
+        np.bincount acumula na ordem das linhas, como o defaultdict(float)
+        do DataProcessor.
+
+        Returns:
+            (códigos presentes em ordem crescente, soma de cada um)
+        """
+        if not len(codigos):
+            return codigos, valores
+
+        inicio = codigos.min()
+        posicoes = codigos - inicio
+        presentes = np.flatnonzero(np.bincount(posicoes))
+        somas = np.bincount(posicoes, weights=valores)
+        return presentes + inicio, somas[presentes]
+
+    def _format(self, dias: np.ndarray, somas: np.ndarray) -> Dict[str, Any]:
+        """
+        Buckets já ordenados no formato de _format_metric_data.
+
+        Args:
+            dias: Dia (desde a época) do rótulo de cada bucket, em ordem crescente
+            somas: Valor de cada bucket
+        """
+        day_from_ordinal = self.calendar.day_from_ordinal
+        index = [day_from_ordinal(dia).label for dia in (dias + EPOCH_ORDINAL).tolist()]
+        return {
+            "metric_value": dict(zip(index, somas.tolist())),
+            "index": index
+        }
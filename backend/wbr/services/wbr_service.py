@@ -3,7 +3,10 @@ WBRService - Orquestrador principal que coordena toda a geração de dados WBR
 """
 
 from datetime import date, datetime
-from typing import Dict, Any
+from functools import partial
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+import hashlib
+import json
 import os
 import random
 
@@ -13,6 +16,8 @@ from wbr.services.instagram_query_builder import InstagramQueryBuilder
 from wbr.services.rgm_cto_percentual_query_builder import RgmCtoPercentualQueryBuilder
 from wbr.database.interface import DatabaseInterface
 from wbr.services.data_processor import DataProcessor
+from wbr.services.json_fragment import JSONFragment
+from wbr.services.page_executor import PageExecutor
 from wbr.cache.interface import CacheInterface
 from wbr.cache.null_cache import NullCache
 from wbr.services.logger import StructuredLogger, NullLogger
@@ -30,8 +35,8 @@ class WBRService:
     4. Calcula períodos (CY e PY)
     5. Monta e executa queries
     6. Transforma dados para formato WBR
-    7. Salva no cache
-    8. Retorna resultado
+    7. Serializa e salva no cache (JSON em bytes)
+    8. Retorna resultado (JSONFragment)
     """
 
     def __init__(
@@ -41,7 +46,12 @@ class WBRService:
         db_executor: DatabaseInterface,
         data_processor: DataProcessor,
         cache: CacheInterface = None,
-        logger: StructuredLogger = None
+        logger: StructuredLogger = None,
+        instagram_query_builder: InstagramQueryBuilder = None,
+        cto_percentual_query_builder: RgmCtoPercentualQueryBuilder = None,
+        single_scan: bool = False,
+        sql_pushdown: bool = False,
+        page_executor: PageExecutor = None
     ):
         """
         Inicializa WBRService com dependências injetadas.
@@ -53,6 +63,15 @@ class WBRService:
             data_processor: Processador de dados
             cache: Sistema de cache (opcional)
             logger: Logger estruturado (opcional)
+            instagram_query_builder: Construtor de queries do Instagram (opcional)
+            cto_percentual_query_builder: Construtor de queries do CTO Percentual (opcional)
+            single_scan: Se True, gráficos com template padrão buscam CY e PY
+                         em uma única query (ver QueryBuilder.build_single_scan)
+            sql_pushdown: Se True, gráficos com template padrão recebem semanas
+                          e meses já agregados pelo banco (tem precedência
+                          sobre single_scan; ver QueryBuilder.build_pushdown)
+            page_executor: Executa as queries de generate_many em paralelo
+                           (opcional; default: em sequência)
         """
         self.config_loader = config_loader
         self.query_builder = query_builder
@@ -60,13 +79,20 @@ class WBRService:
         self.data_processor = data_processor
         self.cache = cache or NullCache()
         self.logger = logger or NullLogger()
+        self.instagram_query_builder = instagram_query_builder or InstagramQueryBuilder()
+        self.cto_percentual_query_builder = cto_percentual_query_builder or RgmCtoPercentualQueryBuilder()
+        self.single_scan = single_scan
+        self.sql_pushdown = sql_pushdown
+        self.page_executor = page_executor or PageExecutor(max_workers=1)
+        # (tabela, coluna_data, coluna_valor) já validados no banco
+        self._validated_columns = set()
 
     def generate(
         self,
         grafico_id: str,
         user_filters: Dict[str, Any] = None,
         data_referencia: str = None
-    ) -> Dict[str, Any]:
+    ) -> JSONFragment:
         """
         Gera dados WBR completos para um gráfico.
 
@@ -76,7 +102,8 @@ class WBRService:
             data_referencia: Data de referência para cálculo do período (opcional, default: hoje)
 
         Returns:
-            Dicionário com dados WBR no formato esperado:
+            JSONFragment (JSON já serializado; dicionário em .value) com os
+            dados WBR no formato esperado:
             {
               "semanas_cy": {"metric_value": {...}, "index": [...]},
               "semanas_py": {"metric_value": {...}, "index": [...]},
@@ -102,101 +129,429 @@ class WBRService:
         if data_referencia is None:
             data_referencia = date.today().isoformat()
 
-        # 1. Verifica cache (chave única por gráfico + data + filtros)
-        # Inclui hash dos filtros para diferenciar requests com filtros diferentes
-        import hashlib
-        import json
-        filters_hash = hashlib.md5(json.dumps(user_filters or {}, sort_keys=True).encode()).hexdigest()[:8]
-        cache_key = f"wbr:{grafico_id}:{data_referencia}:{filters_hash}"
-        cached = self.cache.get(cache_key)
+        # 1. Verifica cache (chave única por gráfico + data + filtros):
+        # o JSON volta como foi salvo, sem desserializar
+        cache_key = self._cache_key(grafico_id, data_referencia, user_filters)
+        cached = self.cache.get_bytes(cache_key)
 
         if cached:
-            return cached
+            return JSONFragment(cached)
 
         try:
-            # 2. Carrega e valida configuração
-            config = self.config_loader.load(grafico_id)
-            self.config_loader.validate(config)
-
-            # Validação de colunas (apenas para gráficos padrão)
-            # Pula validação para templates customizados (Instagram, CTO Percentual, etc)
-            if not config.get('use_instagram_template', False) and not config.get('use_cto_percentual_template', False):
-                # 3. Valida se colunas existem no banco (apenas para gráficos padrão)
-                colunas_necessarias = [
-                    config['colunas']['data'],
-                    config['colunas']['valor']
-                ]
-                self.db_executor.validate_columns(config['tabela'], colunas_necessarias)
+            # 2. Carrega configuração compilada (validada e com fatos derivados)
+            compiled = self.config_loader.get(grafico_id)
+            config = compiled.config
+
+            # 3. Valida se colunas existem no banco (apenas para gráficos padrão)
+            self._validate_columns(compiled)
 
             # 4. Calcula períodos baseado na data de referência
             cy_inicio, cy_fim, py_inicio, py_fim = self._calculate_periods(data_referencia)
 
-            # 5. Monta queries com filtros do usuário
-            # Detecta qual QueryBuilder usar baseado no tipo de gráfico
-            if config.get('use_instagram_template', False):
-                # Gráficos do Instagram
-                instagram_builder = InstagramQueryBuilder()
-                query_cy = instagram_builder.build(config, cy_inicio, cy_fim, user_filters)
-                query_py = instagram_builder.build(config, py_inicio, py_fim, user_filters)
-            elif config.get('use_cto_percentual_template', False):
-                # Gráfico de CTO Percentual (RGM)
-                cto_percentual_builder = RgmCtoPercentualQueryBuilder()
-                query_cy = cto_percentual_builder.build(config, cy_inicio, cy_fim, user_filters)
-                query_py = cto_percentual_builder.build(config, py_inicio, py_fim, user_filters)
-            else:
-                # Gráficos padrão
-                query_cy = self.query_builder.build(config, cy_inicio, cy_fim, user_filters)
-                query_py = self.query_builder.build(config, py_inicio, py_fim, user_filters)
-
-            # 6. Executa queries
-            dados_cy = self.db_executor.execute(query_cy, {
-                'data_inicio': cy_inicio,
-                'data_fim': cy_fim
-            })
-
-            dados_py = self.db_executor.execute(query_py, {
-                'data_inicio': py_inicio,
-                'data_fim': py_fim
-            })
-
-            # 7. Transforma dados para formato WBR
+            # QueryBuilder definido pelo tipo de template do gráfico
+            builder = self._get_query_builder(compiled.template_kind)
+
+            # Parâmetros da transformação para formato WBR
             ano_atual = date.today().year
             ano_anterior = ano_atual - 1
 
             # Define agrupamento
-            usar_instagram = config.get('use_instagram_template', False)
-            agrupamento = 'semanal' if usar_instagram else config['agrupamento']
+            agrupamento = compiled.agrupamento
 
             # Converte data_referencia string para objeto date
             data_ref_obj = datetime.strptime(data_referencia, '%Y-%m-%d').date()
 
-            # TODOS os gráficos agora usam semanas móveis
+            if self.sql_pushdown and builder.supports_pushdown:
+                # 5-6. Semanas móveis e meses de CY e PY agregados no banco
+                query = builder.build_pushdown(
+                    config, cy_inicio, cy_fim, py_inicio, py_fim, user_filters
+                )
+                dados = self.db_executor.execute(query)
+
+                # 7. Dados já estão no formato final, só converte datas
+                resultado = self.data_processor.transform_aggregated_to_wbr(
+                    dados=dados,
+                    ano_atual=ano_atual,
+                    ano_anterior=ano_anterior
+                )
+            elif self.single_scan and builder.supports_single_scan:
+                # 5-6. Uma única query cobre CY e PY (linhas marcadas com 'periodo')
+                query = builder.build_single_scan(
+                    config, cy_inicio, cy_fim, py_inicio, py_fim, user_filters
+                )
+                dados = self.db_executor.execute(query)
+
+                # 7. Transforma dados para formato WBR
+                # TODOS os gráficos agora usam semanas móveis
+                resultado = self.data_processor.transform_tagged_to_wbr(
+                    dados=dados,
+                    agrupamento=agrupamento,
+                    ano_atual=ano_atual,
+                    ano_anterior=ano_anterior,
+                    data_referencia=data_ref_obj,
+                    usar_semana_movel=True  # Sempre True para todos os gráficos
+                )
+            else:
+                # 5. Monta queries com filtros do usuário
+                # CY e PY compartilham o texto SQL (datas e filtros são parâmetros)
+                query_cy = builder.build(config, cy_inicio, cy_fim, user_filters)
+                query_py = builder.build(config, py_inicio, py_fim, user_filters)
+
+                # 6. Executa CY e PY ao mesmo tempo, em conexões diferentes
+                dados_cy, dados_py = self.db_executor.execute_many_concurrent([query_cy, query_py])
+
+                # 7. Transforma dados para formato WBR
+                # TODOS os gráficos agora usam semanas móveis
+                resultado = self.data_processor.transform_to_wbr(
+                    dados_cy=dados_cy,
+                    dados_py=dados_py,
+                    agrupamento=agrupamento,
+                    ano_atual=ano_atual,
+                    ano_anterior=ano_anterior,
+                    data_referencia=data_ref_obj,
+                    usar_semana_movel=True  # Sempre True para todos os gráficos
+                )
+
+            # 8. Adiciona metadados e salva no cache
+            return self._finalize(grafico_id, compiled, resultado, cache_key)
+
+        except WBRException:
+            # Re-raise exceções WBR (já são tratadas)
+            raise
+        except Exception as e:
+            # Captura qualquer outra exceção
+            raise
+
+    def generate_many(
+        self,
+        grafico_ids: List[str],
+        filters: Dict[str, Dict[str, Any]] = None,
+        data_referencia: str = None,
+        timings: Dict[str, float] = None
+    ) -> Dict[str, Any]:
+        """
+        Gera dados WBR de vários gráficos (ex: uma página inteira).
+
+        Reúne os resultados de iter_many (ver detalhes do agrupamento lá).
+
+        Args:
+            grafico_ids: Identificadores dos gráficos
+            filters: Filtros por gráfico {grafico_id: user_filters} (opcional)
+            data_referencia: Data de referência (opcional, default: hoje)
+            timings: Se informado, recebe {grafico_id: segundos} dos gráficos
+                     gerados (gráficos de um lote recebem o tempo do lote)
+
+        Returns:
+            Dicionário {grafico_id: JSONFragment} na ordem de grafico_ids. Gráficos
+            com erro recebem a exceção (WBRException ou outra) como valor.
+        """
+        results: Dict[str, Any] = {}
+        for grafico_id, resultado, segundos in self.iter_many(grafico_ids, filters, data_referencia):
+            results[grafico_id] = resultado
+            if timings is not None and segundos is not None:
+                timings[grafico_id] = segundos
+
+        return {grafico_id: results[grafico_id] for grafico_id in grafico_ids}
+
+    def iter_many(
+        self,
+        grafico_ids: List[str],
+        filters: Dict[str, Dict[str, Any]] = None,
+        data_referencia: str = None
+    ) -> Iterator[Tuple[str, Any, Optional[float]]]:
+        """
+        Gera dados WBR de vários gráficos, entregando cada um assim que fica pronto.
+
+        Gráficos com template padrão e mesmos filtros são agrupados em uma
+        única query UNION ALL (ver QueryBuilder.build_batch), com uma ida ao
+        banco por grupo em vez de uma ou duas por gráfico. Gráficos do
+        Instagram com os mesmos filtros compartilham um par de queries (CY e
+        PY) com todas as métricas (ver InstagramQueryBuilder.build_all_metrics).
+        Gráficos já em cache, com outros templates (CTO Percentual) ou
+        sozinhos no grupo usam generate(). Se a query do lote falhar, cada
+        gráfico do grupo é gerado individualmente, isolando o erro.
+
+        Lotes e gráficos individuais são independentes e rodam em paralelo
+        no page_executor. Gráficos em cache são entregues primeiro; os
+        demais na ordem em que terminam.
+
+        Args:
+            grafico_ids: Identificadores dos gráficos
+            filters: Filtros por gráfico {grafico_id: user_filters} (opcional)
+            data_referencia: Data de referência (opcional, default: hoje)
+
+        Yields:
+            (grafico_id, JSONFragment ou exceção, segundos). segundos é None
+            para gráficos em cache ou com erro de configuração; gráficos de
+            um lote recebem o tempo do lote.
+        """
+        if data_referencia is None:
+            data_referencia = date.today().isoformat()
+
+        filters = filters or {}
+        individual: List[str] = []
+        groups: Dict[tuple, list] = {}
+
+        for grafico_id in grafico_ids:
+            user_filters = filters.get(grafico_id)
+            cache_key = self._cache_key(grafico_id, data_referencia, user_filters)
+
+            cached = self.cache.get_bytes(cache_key)
+            if cached:
+                yield grafico_id, JSONFragment(cached), None
+                continue
+
+            try:
+                compiled = self.config_loader.get(grafico_id)
+                builder = self._get_query_builder(compiled.template_kind)
+                mode = self._batch_mode(builder, compiled)
+                if mode is None:
+                    individual.append(grafico_id)
+                    continue
+
+                self._validate_columns(compiled)
+                group_key = (mode, compiled.template_kind, builder.filter_signature(compiled.config, user_filters))
+                if mode == 'metricas':
+                    # Todas as métricas do grupo vêm da mesma query: mesma coluna de data
+                    group_key += (compiled.coluna_data,)
+            except Exception as e:
+                yield grafico_id, e, None
+                continue
+
+            groups.setdefault(group_key, []).append(
+                (grafico_id, compiled, user_filters, cache_key)
+            )
+
+        tasks = {}
+        for group_key, charts in groups.items():
+            if len(charts) == 1:
+                individual.append(charts[0][0])
+            elif group_key[0] == 'metricas':
+                tasks[group_key] = partial(self._generate_metrics_batch, charts, data_referencia)
+            else:
+                tasks[group_key] = partial(self._generate_batch, charts, data_referencia)
+
+        fallback = []
+        for key, resultado, segundos in self._run_page_tasks(tasks, individual, filters, data_referencia):
+            if key not in groups:
+                yield key, resultado, segundos
+                continue
+
+            charts = groups[key]
+            if isinstance(resultado, Exception):
+                self.logger.warning("Falha na query em lote, gerando gráficos individualmente", {
+                    'graficos': [grafico_id for grafico_id, *_ in charts],
+                    'error': str(resultado),
+                })
+                fallback.extend(grafico_id for grafico_id, *_ in charts)
+                continue
+            for grafico_id, *_ in charts:
+                yield grafico_id, resultado[grafico_id], segundos
+
+        yield from self._run_page_tasks({}, fallback, filters, data_referencia)
+
+    def _run_page_tasks(
+        self,
+        tasks: Dict[tuple, Callable[[], Any]],
+        grafico_ids: List[str],
+        filters: Dict[str, Dict[str, Any]],
+        data_referencia: str
+    ) -> Iterator[Tuple[Any, Any, float]]:
+        """
+        Executa lotes (tasks) e gráficos individuais (generate) no page_executor.
+
+        Yields:
+            (chave do lote ou grafico_id, resultado ou exceção, segundos) na
+            ordem de término
+        """
+        for grafico_id in grafico_ids:
+            tasks[grafico_id] = partial(
+                self.generate,
+                grafico_id,
+                user_filters=filters.get(grafico_id),
+                data_referencia=data_referencia
+            )
+        return self.page_executor.iter_completed(tasks)
+
+    def _batch_mode(self, builder: QueryBuilder, compiled) -> str:
+        """
+        Modo de geração em grupo suportado pelo gráfico.
+
+        Returns:
+            'metricas' - Instagram: uma query com todas as métricas (build_all_metrics)
+            'lote' - template padrão: UNION ALL por gráfico (build_batch)
+            None - gráfico gerado individualmente
+        """
+        if isinstance(builder, InstagramQueryBuilder):
+            return 'metricas' if builder.metric_column(compiled.config) else None
+        if self.sql_pushdown and builder.supports_pushdown:
+            return 'lote'
+        if self.single_scan and builder.supports_single_scan:
+            return 'lote'
+        return None
+
+    def _generate_batch(self, charts: list, data_referencia: str) -> Dict[str, JSONFragment]:
+        """
+        Executa uma query UNION ALL para um grupo de gráficos e separa o resultado.
+
+        Args:
+            charts: Lista de (grafico_id, compiled, user_filters, cache_key)
+                    com o mesmo template e a mesma filter_signature
+            data_referencia: Data de referência (YYYY-MM-DD)
+
+        Returns:
+            Dicionário {grafico_id: JSONFragment}
+        """
+        cy_inicio, cy_fim, py_inicio, py_fim = self._calculate_periods(data_referencia)
+        builder = self._get_query_builder(charts[0][1].template_kind)
+        pushdown = self.sql_pushdown and builder.supports_pushdown
+
+        query = builder.build_batch(
+            [(grafico_id, compiled.config) for grafico_id, compiled, _, _ in charts],
+            cy_inicio, cy_fim, py_inicio, py_fim,
+            user_filters=charts[0][2],
+            pushdown=pushdown
+        )
+        dados = self.db_executor.execute(query)
+
+        # Separa linhas por gráfico (mantendo a ordem)
+        dados_por_grafico = {grafico_id: [] for grafico_id, *_ in charts}
+        for row in dados:
+            dados_por_grafico[row['grafico_id']].append(row)
+
+        ano_atual = date.today().year
+        ano_anterior = ano_atual - 1
+        data_ref_obj = datetime.strptime(data_referencia, '%Y-%m-%d').date()
+
+        results = {}
+        for grafico_id, compiled, _, cache_key in charts:
+            if pushdown:
+                resultado = self.data_processor.transform_aggregated_to_wbr(
+                    dados=dados_por_grafico[grafico_id],
+                    ano_atual=ano_atual,
+                    ano_anterior=ano_anterior
+                )
+            else:
+                resultado = self.data_processor.transform_tagged_to_wbr(
+                    dados=dados_por_grafico[grafico_id],
+                    agrupamento=compiled.agrupamento,
+                    ano_atual=ano_atual,
+                    ano_anterior=ano_anterior,
+                    data_referencia=data_ref_obj,
+                    usar_semana_movel=True
+                )
+
+            results[grafico_id] = self._finalize(grafico_id, compiled, resultado, cache_key)
+
+        return results
+
+    def _generate_metrics_batch(self, charts: list, data_referencia: str) -> Dict[str, JSONFragment]:
+        """
+        Gera gráficos do Instagram a partir de uma única query por período.
+
+        all_data (a parte mais cara, com a janela por "postId" sobre os três
+        schemas) é calculado uma vez para CY e uma para PY; cada gráfico usa
+        a sua coluna do resultado.
+
+        Args:
+            charts: Lista de (grafico_id, compiled, user_filters, cache_key)
+                    com os mesmos filtros e mesma coluna de data
+            data_referencia: Data de referência (YYYY-MM-DD)
+
+        Returns:
+            Dicionário {grafico_id: JSONFragment}
+        """
+        cy_inicio, cy_fim, py_inicio, py_fim = self._calculate_periods(data_referencia)
+        builder = self._get_query_builder(charts[0][1].template_kind)
+        config = charts[0][1].config
+        user_filters = charts[0][2]
+
+        dados_cy, dados_py = self.db_executor.execute_many_concurrent([
+            builder.build_all_metrics(config, cy_inicio, cy_fim, user_filters),
+            builder.build_all_metrics(config, py_inicio, py_fim, user_filters),
+        ])
+
+        ano_atual = date.today().year
+        ano_anterior = ano_atual - 1
+        data_ref_obj = datetime.strptime(data_referencia, '%Y-%m-%d').date()
+
+        results = {}
+        for grafico_id, compiled, _, cache_key in charts:
+            coluna = builder.metric_column(compiled.config)
+
             resultado = self.data_processor.transform_to_wbr(
-                dados_cy=dados_cy,
-                dados_py=dados_py,
-                agrupamento=agrupamento,
+                dados_cy=[{'data': row['data'], 'valor': row[coluna]} for row in dados_cy],
+                dados_py=[{'data': row['data'], 'valor': row[coluna]} for row in dados_py],
+                agrupamento=compiled.agrupamento,
                 ano_atual=ano_atual,
                 ano_anterior=ano_anterior,
                 data_referencia=data_ref_obj,
-                usar_semana_movel=True  # Sempre True para todos os gráficos
+                usar_semana_movel=True
             )
 
-            # Adiciona metadados do gráfico na resposta
-            resultado['titulo'] = config.get('titulo', grafico_id)
-            resultado['unidade'] = config.get('unidade', '')
-            resultado['is_rgm'] = config.get('is_rgm', False)
+            results[grafico_id] = self._finalize(grafico_id, compiled, resultado, cache_key)
+
+        return results
 
-            # 8. Salva no cache (TTL: 1 hora = 3600 segundos)
-            self.cache.set(cache_key, resultado, ttl=3600)
+    def _cache_key(self, grafico_id: str, data_referencia: str, user_filters: Dict[str, Any] = None) -> str:
+        """
+        Chave de cache única por gráfico + data + filtros.
 
-            return resultado
+        Inclui hash dos filtros para diferenciar requests com filtros diferentes
+        (valores não serializáveis em JSON, como RgmFiltrosSemiJoin, entram
+        pelo repr).
+        """
+        filters_hash = hashlib.md5(
+            json.dumps(user_filters or {}, sort_keys=True, default=repr).encode()
+        ).hexdigest()[:8]
+        return f"wbr:{grafico_id}:{data_referencia}:{filters_hash}"
 
-        except WBRException:
-            # Re-raise exceções WBR (já são tratadas)
-            raise
-        except Exception as e:
-            # Captura qualquer outra exceção
-            raise
+    def _validate_columns(self, compiled):
+        """
+        Valida se colunas de data e valor existem na tabela (gráficos padrão).
+
+        Pula validação para templates customizados (Instagram, CTO Percentual,
+        etc). Cada (tabela, colunas) é validado uma única vez por processo.
+        """
+        if not compiled.validate_columns:
+            return
+
+        key = (compiled.config['tabela'], compiled.coluna_data, compiled.coluna_valor)
+        if key in self._validated_columns:
+            return
+
+        self.db_executor.validate_columns(key[0], [compiled.coluna_data, compiled.coluna_valor])
+        self._validated_columns.add(key)
+
+    def _finalize(self, grafico_id: str, compiled, resultado: Dict[str, Any], cache_key: str) -> JSONFragment:
+        """
+        Adiciona metadados do gráfico na resposta, serializa (uma única vez)
+        e salva o JSON no cache
+        """
+        config = compiled.config
+        resultado['titulo'] = config.get('titulo', grafico_id)
+        resultado['unidade'] = config.get('unidade', '')
+        resultado['is_rgm'] = compiled.is_rgm
+
+        fragment = JSONFragment.from_value(resultado)
+
+        # Salva no cache (TTL: 1 hora = 3600 segundos)
+        self.cache.set_bytes(cache_key, fragment.data, ttl=3600)
+
+        return fragment
+
+    def _get_query_builder(self, template_kind: str) -> QueryBuilder:
+        """
+        Retorna o QueryBuilder correspondente ao tipo de template do gráfico.
+
+        Args:
+            template_kind: 'padrao', 'instagram' ou 'cto_percentual'
+        """
+        if template_kind == 'instagram':
+            return self.instagram_query_builder
+        if template_kind == 'cto_percentual':
+            return self.cto_percentual_query_builder
+        return self.query_builder
 
     def _calculate_periods(self, data_referencia: str) -> tuple:
         """
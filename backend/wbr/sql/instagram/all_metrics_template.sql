@@ -0,0 +1,25 @@
+-- Template SQL com todas as métricas do Instagram em uma única query
+-- Usado no modo página (WBRService.generate_many): all_data é calculado uma
+-- vez e cada gráfico usa a sua coluna do resultado.
+-- Placeholders:
+--   {coluna_data} -> coluna de data (sempre "data" para Instagram)
+--   instagram_base -> CTEs de base_cte.sql (all_data, um ramo por shopping)
+--   Filtro de shopping é aplicado dentro de cada ramo de all_data;
+--   demais filtros dinâmicos são aplicados no WHERE final
+
+{instagram_base}
+SELECT
+    {coluna_data} as data,
+    SUM(total_likes) as total_likes,
+    SUM(total_alcance) as total_alcance,
+    SUM(total_impressoes) as total_impressoes,
+    SUM(total_comentarios) as total_comentarios,
+    SUM(total_compartilhamentos) as total_compartilhamentos,
+    SUM(total_salvos) as total_salvos,
+    SUM(engajamento_total) as engajamento_total,
+    SUM(total_posts) as total_posts
+FROM all_data
+WHERE 1=1
+    {filtros_dinamicos}
+GROUP BY {coluna_data}
+ORDER BY {coluna_data};
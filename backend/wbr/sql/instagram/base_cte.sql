@@ -0,0 +1,16 @@
+-- CTEs base das métricas do Instagram (múltiplos schemas)
+-- Incluído em query_template.sql e all_metrics_template.sql (placeholder instagram_base).
+-- Gera all_data: uma linha por shopping + dia de postagem com todas as métricas.
+--
+-- all_data é a união de um ramo por shopping (ver post_branch.sql), montados
+-- pelo InstagramQueryBuilder no placeholder instagram_posts. Cada ramo lê
+-- apenas o schema do seu shopping:
+--   - a chave (shopping, id) do post vira um equi-join simples
+--     P."id" = I."postId" dentro do schema
+--   - o período é um intervalo semiaberto sobre "postedAt" (usa índice)
+--   - o filtro de shopping é avaliado dentro do ramo, de modo que os
+--     schemas dos outros shoppings não são lidos
+
+WITH all_data AS (
+{instagram_posts}
+)
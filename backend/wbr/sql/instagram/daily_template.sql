@@ -0,0 +1,23 @@
+-- Template SQL com as linhas diárias de all_data por shopping
+-- Usado pelo InstagramKPIEngine: as métricas do dia, do mês até a data e as
+-- médias diárias são derivadas dessas linhas (um mês por consulta).
+-- Placeholders:
+--   instagram_base -> CTEs de base_cte.sql ou rollup_cte.sql (all_data)
+--   Filtro de shopping é aplicado dentro de cada ramo de all_data
+
+{instagram_base}
+SELECT
+    shopping,
+    data,
+    total_likes,
+    total_alcance,
+    total_impressoes,
+    total_comentarios,
+    total_compartilhamentos,
+    total_salvos,
+    engajamento_total,
+    total_posts
+FROM all_data
+WHERE 1=1
+    {filtros_dinamicos}
+ORDER BY shopping, data;
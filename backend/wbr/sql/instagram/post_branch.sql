@@ -0,0 +1,36 @@
+-- Ramo de all_data para um shopping (incluído em base_cte.sql)
+-- Placeholders preenchidos pelo InstagramQueryBuilder para cada shopping:
+--   sigla -> sigla do shopping (SCIB, SBGP, SBI)
+--   schema -> schema com as tabelas Post e PostInsight do shopping
+--   filtro_shopping -> filtro de shopping do usuário (vazio se não houver)
+    SELECT
+        '{sigla}' as shopping,
+        DATE(U."postedAt") as data,
+        COALESCE(SUM(U.likes), 0) as total_likes,
+        COALESCE(SUM(U.reach), 0) as total_alcance,
+        COALESCE(SUM(U.impressions), 0) as total_impressoes,
+        COALESCE(SUM(U.comments), 0) as total_comentarios,
+        COALESCE(SUM(U.shares), 0) as total_compartilhamentos,
+        COALESCE(SUM(U.saved), 0) as total_salvos,
+        (COALESCE(SUM(U.likes), 0) + COALESCE(SUM(U.comments), 0) +
+         COALESCE(SUM(U.shares), 0) + COALESCE(SUM(U.saved), 0)) as engajamento_total,
+        COUNT(DISTINCT U."id") as total_posts
+    FROM (
+        -- Último insight de cada post do período
+        SELECT DISTINCT ON (I."postId")
+            P."id",
+            P."postedAt",
+            I.likes,
+            I.reach,
+            I.impressions,
+            I.comments,
+            I.shares,
+            I.saved
+        FROM "{schema}"."Post" AS P
+        JOIN "{schema}"."PostInsight" AS I ON I."postId" = P."id"
+        WHERE P."postedAt" >= CAST(:data_inicio AS date)
+          AND P."postedAt" < CAST(:data_fim AS date) + 1
+          {filtro_shopping}
+        ORDER BY I."postId", I."measuredAt" DESC
+    ) AS U
+    GROUP BY DATE(U."postedAt")
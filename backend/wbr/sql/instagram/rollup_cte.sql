@@ -0,0 +1,24 @@
+-- CTEs base das métricas do Instagram a partir dos rollups da ingestão
+-- Alternativa a base_cte.sql usada quando as tabelas de rollups/ existem e
+-- foram atualizadas (ver InstagramRollups): all_data vem pronto de
+-- ig_daily_rollup, sem ler o histórico de PostInsight.
+-- Placeholders:
+--   filtro_shopping -> filtro de shopping do usuário (vazio se não houver)
+
+WITH all_data AS (
+    SELECT
+        shopping,
+        data,
+        total_likes,
+        total_alcance,
+        total_impressoes,
+        total_comentarios,
+        total_compartilhamentos,
+        total_salvos,
+        engajamento_total,
+        total_posts
+    FROM mapa_do_bosque.ig_daily_rollup
+    WHERE data >= CAST(:data_inicio AS date)
+      AND data <= CAST(:data_fim AS date)
+      {filtro_shopping}
+)
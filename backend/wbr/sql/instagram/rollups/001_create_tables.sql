@@ -0,0 +1,46 @@
+-- Migração: tabelas de rollup do Instagram
+-- Idempotente; aplicada por: python manage.py wbr_refresh_instagram_rollups --migrate
+--
+-- ig_latest_post_insight: último PostInsight de cada post (chave shopping + post)
+-- ig_daily_rollup: métricas de all_data por shopping + dia de postagem
+-- ig_rollup_watermark: maior "measuredAt" já processado por shopping
+--
+-- Mantidas pela ingestão (ver refresh.sql), substituem a janela por "postId"
+-- sobre todo o histórico de PostInsight nas queries do Instagram.
+--
+-- Os índices nas tabelas da ingestão ficam em 004_ingestion_indexes_concurrently.sql.
+
+CREATE SCHEMA IF NOT EXISTS mapa_do_bosque;
+
+CREATE TABLE IF NOT EXISTS mapa_do_bosque.ig_latest_post_insight (
+    shopping text NOT NULL,
+    post_id text NOT NULL,
+    measured_at timestamp NOT NULL,
+    likes integer,
+    reach integer,
+    impressions integer,
+    comments integer,
+    shares integer,
+    saved integer,
+    PRIMARY KEY (shopping, post_id)
+);
+
+CREATE TABLE IF NOT EXISTS mapa_do_bosque.ig_daily_rollup (
+    shopping text NOT NULL,
+    data date NOT NULL,
+    total_likes bigint NOT NULL,
+    total_alcance bigint NOT NULL,
+    total_impressoes bigint NOT NULL,
+    total_comentarios bigint NOT NULL,
+    total_compartilhamentos bigint NOT NULL,
+    total_salvos bigint NOT NULL,
+    engajamento_total bigint NOT NULL,
+    total_posts bigint NOT NULL,
+    PRIMARY KEY (shopping, data)
+);
+
+CREATE TABLE IF NOT EXISTS mapa_do_bosque.ig_rollup_watermark (
+    shopping text PRIMARY KEY,
+    measured_at timestamp,
+    refreshed_at timestamptz NOT NULL DEFAULT now()
+);
@@ -0,0 +1,13 @@
+-- Migração: índice de UserInsight por métrica e data
+-- Idempotente; aplicada por: python manage.py wbr_refresh_instagram_rollups --migrate
+--
+-- Atende o último follower_demographics até uma data (busca reversa) e a
+-- série diária de seguidores (intervalo de "startTime") sem ler o histórico
+-- das demais métricas.
+--
+-- CONCURRENTLY (sem bloquear as escritas da ingestão): executado um comando
+-- por vez, fora de bloco de transação (ver 004_ingestion_indexes_concurrently.sql).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "UserInsight_metricName_startTime_idx" ON "instagram-data-fetch-scib"."UserInsight" ("metricName", "startTime");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "UserInsight_metricName_startTime_idx" ON "instagram-data-fetch-sbgp"."UserInsight" ("metricName", "startTime");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "UserInsight_metricName_startTime_idx" ON "instagram-data-fetch-sbi"."UserInsight" ("metricName", "startTime");
@@ -0,0 +1,88 @@
+-- Migração: ranking mensal de posts do Instagram
+-- Idempotente; aplicada por: python manage.py wbr_refresh_instagram_rollups --migrate
+--
+-- ig_top_post: um post por linha com as métricas do último PostInsight e o
+-- mês de postagem, mantida pela ingestão (ver refresh.sql). O índice por
+-- mês + engajamento transforma o top N do mês em uma leitura ordenada do
+-- índice, e a paginação por chave continua a partir da última linha lida
+-- (engajamento_total, data, shopping, post_id).
+
+CREATE SCHEMA IF NOT EXISTS mapa_do_bosque;
+
+CREATE TABLE IF NOT EXISTS mapa_do_bosque.ig_top_post (
+    shopping text NOT NULL,
+    post_id text NOT NULL,
+    mes date NOT NULL,
+    data date NOT NULL,
+    link_foto text,
+    link_insta text,
+    tipo_midia text NOT NULL,
+    total_likes integer NOT NULL,
+    total_comentarios integer NOT NULL,
+    total_compartilhamentos integer NOT NULL,
+    total_salvos integer NOT NULL,
+    engajamento_total bigint NOT NULL,
+    PRIMARY KEY (shopping, post_id)
+);
+
+-- Percorrido de trás para frente: engajamento_total DESC, data DESC, ...
+CREATE INDEX IF NOT EXISTS ig_top_post_ranking_idx
+    ON mapa_do_bosque.ig_top_post (mes, engajamento_total, data, shopping, post_id);
+
+-- Carga inicial a partir de ig_latest_post_insight (shoppings já atualizados)
+INSERT INTO mapa_do_bosque.ig_top_post
+SELECT
+    L.shopping,
+    P."id",
+    CAST(date_trunc('month', P."postedAt") AS date),
+    DATE(P."postedAt"),
+    P."mediaUrl",
+    P."permalink",
+    COALESCE(P."mediaType"::text, 'IMAGE'),
+    COALESCE(L.likes, 0),
+    COALESCE(L.comments, 0),
+    COALESCE(L.shares, 0),
+    COALESCE(L.saved, 0),
+    COALESCE(L.likes, 0) + COALESCE(L.comments, 0) + COALESCE(L.shares, 0) + COALESCE(L.saved, 0)
+FROM mapa_do_bosque.ig_latest_post_insight AS L
+JOIN "instagram-data-fetch-scib"."Post" AS P ON P."id" = L.post_id
+WHERE L.shopping = 'SCIB' AND P."postedAt" IS NOT NULL
+ON CONFLICT (shopping, post_id) DO NOTHING;
+
+INSERT INTO mapa_do_bosque.ig_top_post
+SELECT
+    L.shopping,
+    P."id",
+    CAST(date_trunc('month', P."postedAt") AS date),
+    DATE(P."postedAt"),
+    P."mediaUrl",
+    P."permalink",
+    COALESCE(P."mediaType"::text, 'IMAGE'),
+    COALESCE(L.likes, 0),
+    COALESCE(L.comments, 0),
+    COALESCE(L.shares, 0),
+    COALESCE(L.saved, 0),
+    COALESCE(L.likes, 0) + COALESCE(L.comments, 0) + COALESCE(L.shares, 0) + COALESCE(L.saved, 0)
+FROM mapa_do_bosque.ig_latest_post_insight AS L
+JOIN "instagram-data-fetch-sbgp"."Post" AS P ON P."id" = L.post_id
+WHERE L.shopping = 'SBGP' AND P."postedAt" IS NOT NULL
+ON CONFLICT (shopping, post_id) DO NOTHING;
+
+INSERT INTO mapa_do_bosque.ig_top_post
+SELECT
+    L.shopping,
+    P."id",
+    CAST(date_trunc('month', P."postedAt") AS date),
+    DATE(P."postedAt"),
+    P."mediaUrl",
+    P."permalink",
+    COALESCE(P."mediaType"::text, 'IMAGE'),
+    COALESCE(L.likes, 0),
+    COALESCE(L.comments, 0),
+    COALESCE(L.shares, 0),
+    COALESCE(L.saved, 0),
+    COALESCE(L.likes, 0) + COALESCE(L.comments, 0) + COALESCE(L.shares, 0) + COALESCE(L.saved, 0)
+FROM mapa_do_bosque.ig_latest_post_insight AS L
+JOIN "instagram-data-fetch-sbi"."Post" AS P ON P."id" = L.post_id
+WHERE L.shopping = 'SBI' AND P."postedAt" IS NOT NULL
+ON CONFLICT (shopping, post_id) DO NOTHING;
@@ -0,0 +1,22 @@
+-- Migração: índices nas tabelas da ingestão (PostInsight e Post)
+-- Idempotente; aplicada por: python manage.py wbr_refresh_instagram_rollups --migrate
+--
+-- Varredura incremental por "measuredAt" (refresh.sql) e intervalos de
+-- "postedAt" das queries do Instagram.
+--
+-- CONCURRENTLY não bloqueia as escritas da ingestão enquanto o índice é
+-- construído, mas não roda em bloco de transação: arquivos *_concurrently.sql
+-- são executados um comando por vez (InstagramRollups.migrate), então cada
+-- comando é uma instrução completa terminada em ";".
+--
+-- O comando roda sem statement_timeout (--statement-timeout). Se a
+-- construção for interrompida mesmo assim, o índice fica INVALID: o próximo
+-- --migrate o remove (DROP INDEX CONCURRENTLY) e cria de novo.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "PostInsight_measuredAt_idx" ON "instagram-data-fetch-scib"."PostInsight" ("measuredAt");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "PostInsight_measuredAt_idx" ON "instagram-data-fetch-sbgp"."PostInsight" ("measuredAt");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "PostInsight_measuredAt_idx" ON "instagram-data-fetch-sbi"."PostInsight" ("measuredAt");
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "Post_postedAt_idx" ON "instagram-data-fetch-scib"."Post" ("postedAt");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "Post_postedAt_idx" ON "instagram-data-fetch-sbgp"."Post" ("postedAt");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "Post_postedAt_idx" ON "instagram-data-fetch-sbi"."Post" ("postedAt");
@@ -0,0 +1,137 @@
+-- Atualização incremental dos rollups do Instagram para um shopping
+-- Executado por InstagramRollups.refresh em uma única chamada: instruções
+-- enviadas juntas rodam em uma única transação.
+-- Placeholders: schema -> schema da ingestão do shopping
+-- Parâmetros: sigla, completo (reconstrói do zero) e sobreposicao_minutos
+--   (reprocessa insights um pouco anteriores à marca d'água, cobrindo
+--   linhas gravadas fora de ordem)
+
+-- Uma atualização por shopping de cada vez
+SELECT pg_advisory_xact_lock(hashtext('ig_rollup:' || :sigla));
+
+DELETE FROM mapa_do_bosque.ig_latest_post_insight WHERE shopping = :sigla AND :completo;
+DELETE FROM mapa_do_bosque.ig_daily_rollup WHERE shopping = :sigla AND :completo;
+DELETE FROM mapa_do_bosque.ig_top_post WHERE shopping = :sigla AND :completo;
+DELETE FROM mapa_do_bosque.ig_rollup_watermark WHERE shopping = :sigla AND :completo;
+
+-- 1. Último insight de cada post medido após a marca d'água
+CREATE TEMP TABLE ig_novos ON COMMIT DROP AS
+SELECT DISTINCT ON (I."postId")
+    I."postId" AS post_id,
+    I."measuredAt" AS measured_at,
+    I.likes,
+    I.reach,
+    I.impressions,
+    I.comments,
+    I.shares,
+    I.saved
+FROM "{schema}"."PostInsight" AS I
+WHERE I."measuredAt" > COALESCE(
+    (SELECT W.measured_at - make_interval(mins => :sobreposicao_minutos)
+     FROM mapa_do_bosque.ig_rollup_watermark AS W
+     WHERE W.shopping = :sigla),
+    '-infinity'
+)
+ORDER BY I."postId", I."measuredAt" DESC;
+
+-- 2. Dias de postagem dos posts cujo último insight mudou
+CREATE TEMP TABLE ig_dias ON COMMIT DROP AS
+SELECT DISTINCT DATE(P."postedAt") AS data
+FROM ig_novos AS N
+JOIN "{schema}"."Post" AS P ON P."id" = N.post_id
+LEFT JOIN mapa_do_bosque.ig_latest_post_insight AS L
+    ON L.shopping = :sigla AND L.post_id = N.post_id
+WHERE P."postedAt" IS NOT NULL
+  AND (L.measured_at IS NULL OR L.measured_at < N.measured_at);
+
+-- 3. Último insight por post
+INSERT INTO mapa_do_bosque.ig_latest_post_insight AS L
+    (shopping, post_id, measured_at, likes, reach, impressions, comments, shares, saved)
+SELECT :sigla, N.post_id, N.measured_at, N.likes, N.reach, N.impressions, N.comments, N.shares, N.saved
+FROM ig_novos AS N
+ON CONFLICT (shopping, post_id) DO UPDATE SET
+    measured_at = EXCLUDED.measured_at,
+    likes = EXCLUDED.likes,
+    reach = EXCLUDED.reach,
+    impressions = EXCLUDED.impressions,
+    comments = EXCLUDED.comments,
+    shares = EXCLUDED.shares,
+    saved = EXCLUDED.saved
+WHERE L.measured_at < EXCLUDED.measured_at;
+
+-- 4. Ranking mensal: métricas atuais dos posts com insight novo
+INSERT INTO mapa_do_bosque.ig_top_post AS T (
+    shopping, post_id, mes, data, link_foto, link_insta, tipo_midia, total_likes,
+    total_comentarios, total_compartilhamentos, total_salvos, engajamento_total
+)
+SELECT
+    :sigla,
+    P."id",
+    CAST(date_trunc('month', P."postedAt") AS date),
+    DATE(P."postedAt"),
+    P."mediaUrl",
+    P."permalink",
+    COALESCE(P."mediaType"::text, 'IMAGE'),
+    COALESCE(L.likes, 0),
+    COALESCE(L.comments, 0),
+    COALESCE(L.shares, 0),
+    COALESCE(L.saved, 0),
+    COALESCE(L.likes, 0) + COALESCE(L.comments, 0) + COALESCE(L.shares, 0) + COALESCE(L.saved, 0)
+FROM ig_novos AS N
+JOIN "{schema}"."Post" AS P ON P."id" = N.post_id
+JOIN mapa_do_bosque.ig_latest_post_insight AS L
+    ON L.shopping = :sigla AND L.post_id = N.post_id
+WHERE P."postedAt" IS NOT NULL
+ON CONFLICT (shopping, post_id) DO UPDATE SET
+    mes = EXCLUDED.mes,
+    data = EXCLUDED.data,
+    link_foto = EXCLUDED.link_foto,
+    link_insta = EXCLUDED.link_insta,
+    tipo_midia = EXCLUDED.tipo_midia,
+    total_likes = EXCLUDED.total_likes,
+    total_comentarios = EXCLUDED.total_comentarios,
+    total_compartilhamentos = EXCLUDED.total_compartilhamentos,
+    total_salvos = EXCLUDED.total_salvos,
+    engajamento_total = EXCLUDED.engajamento_total;
+
+-- 5. Recalcula apenas os dias afetados (mesmas métricas de all_data)
+DELETE FROM mapa_do_bosque.ig_daily_rollup
+WHERE shopping = :sigla
+  AND data IN (SELECT data FROM ig_dias);
+
+INSERT INTO mapa_do_bosque.ig_daily_rollup (
+    shopping, data, total_likes, total_alcance, total_impressoes, total_comentarios,
+    total_compartilhamentos, total_salvos, engajamento_total, total_posts
+)
+SELECT
+    :sigla,
+    DATE(P."postedAt"),
+    COALESCE(SUM(L.likes), 0),
+    COALESCE(SUM(L.reach), 0),
+    COALESCE(SUM(L.impressions), 0),
+    COALESCE(SUM(L.comments), 0),
+    COALESCE(SUM(L.shares), 0),
+    COALESCE(SUM(L.saved), 0),
+    (COALESCE(SUM(L.likes), 0) + COALESCE(SUM(L.comments), 0) +
+     COALESCE(SUM(L.shares), 0) + COALESCE(SUM(L.saved), 0)),
+    COUNT(DISTINCT P."id")
+FROM "{schema}"."Post" AS P
+JOIN mapa_do_bosque.ig_latest_post_insight AS L
+    ON L.shopping = :sigla AND L.post_id = P."id"
+WHERE P."postedAt" >= (SELECT MIN(data) FROM ig_dias)
+  AND P."postedAt" < (SELECT MAX(data) FROM ig_dias) + 1
+  AND DATE(P."postedAt") IN (SELECT data FROM ig_dias)
+GROUP BY DATE(P."postedAt");
+
+-- 6. Avança a marca d'água
+INSERT INTO mapa_do_bosque.ig_rollup_watermark AS W (shopping, measured_at, refreshed_at)
+SELECT :sigla, MAX(measured_at), now()
+FROM ig_novos
+ON CONFLICT (shopping) DO UPDATE SET
+    measured_at = GREATEST(W.measured_at, EXCLUDED.measured_at),
+    refreshed_at = EXCLUDED.refreshed_at;
+
+SELECT
+    (SELECT COUNT(*) FROM ig_novos) AS insights,
+    (SELECT COUNT(*) FROM ig_dias) AS dias,
+    (SELECT measured_at FROM mapa_do_bosque.ig_rollup_watermark WHERE shopping = :sigla) AS marca_dagua;
@@ -0,0 +1,44 @@
+-- Template SQL com agregação no banco: semanas móveis e meses de CY e PY
+-- Mesmos placeholders do query_template.sql. Retorna uma linha por
+-- (periodo, bucket, data):
+--   periodo -> 'cy' ou 'py'
+--   bucket  -> 'semana' (data = último dia da semana móvel) ou 'mes' (data = dia 1)
+-- A semana móvel termina na data de referência da janela (cy_fim / py_fim),
+-- igual a DataProcessor.group_by_rolling_week. Os totais diários são somados
+-- em float8 na ordem das datas, reproduzindo exatamente a soma feita em Python.
+
+WITH diario AS (
+    SELECT
+        CASE WHEN {coluna_data} >= :cy_inicio THEN 'cy' ELSE 'py' END as periodo,
+        {coluna_data} as data,
+        SUM({coluna_valor}) as valor
+    FROM {tabela}
+    WHERE 1=1
+        AND {coluna_data} >= :py_inicio
+        AND {coluna_data} <= :cy_fim
+        AND ({coluna_data} <= :py_fim OR {coluna_data} >= :cy_inicio)
+        {filtros_dinamicos}
+    GROUP BY {coluna_data}
+),
+buckets AS (
+    SELECT
+        periodo,
+        data,
+        valor,
+        referencia - ((referencia - CAST(data AS date)) / 7) * 7 as semana,
+        CAST(date_trunc('month', data) AS date) as mes
+    FROM (
+        SELECT
+            diario.*,
+            CASE WHEN periodo = 'cy' THEN CAST(:cy_fim AS date) ELSE CAST(:py_fim AS date) END as referencia
+        FROM diario
+    ) AS D
+)
+SELECT
+    periodo,
+    CASE WHEN GROUPING(semana) = 0 THEN 'semana' ELSE 'mes' END as bucket,
+    COALESCE(semana, mes) as data,
+    SUM(CAST(valor AS float8) ORDER BY data) as valor
+FROM buckets
+GROUP BY GROUPING SETS ((periodo, semana), (periodo, mes))
+ORDER BY periodo, bucket, data;
@@ -0,0 +1,19 @@
+-- Template SQL de varredura única: CY e PY na mesma query
+-- Mesmos placeholders do query_template.sql; cada linha recebe a coluna
+-- periodo ('cy' ou 'py') de acordo com a janela em que a data cai.
+-- As janelas são disjuntas (PY termina antes do início do CY), então o
+-- range externo permite um único index/seq scan e o filtro descarta o
+-- intervalo entre py_fim e cy_inicio.
+
+SELECT
+    CASE WHEN {coluna_data} >= :cy_inicio THEN 'cy' ELSE 'py' END as periodo,
+    {coluna_data} as data,
+    SUM({coluna_valor}) as valor
+FROM {tabela}
+WHERE 1=1
+    AND {coluna_data} >= :py_inicio
+    AND {coluna_data} <= :cy_fim
+    AND ({coluna_data} <= :py_fim OR {coluna_data} >= :cy_inicio)
+    {filtros_dinamicos}
+GROUP BY {coluna_data}
+ORDER BY {coluna_data};
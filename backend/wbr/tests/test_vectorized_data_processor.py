@@ -0,0 +1,180 @@
+"""
+Paridade entre VectorizedDataProcessor e DataProcessor
+
+O VectorizedDataProcessor (WBR_DATA_PROCESSOR=numpy, padrão) deve produzir
+a mesma saída do DataProcessor byte a byte: mesmos buckets, mesma ordem de
+chaves e mesmos floats (somas na ordem das linhas). Os testes comparam o
+json.dumps dos dois motores sobre séries diárias aleatórias (semente fixa).
+
+    python manage.py test wbr.tests.test_vectorized_data_processor
+"""
+
+import json
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from wbr.services.data_processor import DataProcessor
+from wbr.services.vectorized_data_processor import VectorizedDataProcessor
+
+
+# Datas de referência: meio do ano, virada de mês, 29/02 (PY cai em 28/02)
+# e 01/03 de ano bissexto
+REFERENCIAS = (
+    date(2025, 10, 15),
+    date(2025, 1, 31),
+    date(2024, 2, 29),
+    date(2024, 3, 1),
+)
+
+# Formatos aceitos por DataProcessor._parse_date
+FORMATOS_STRING = (
+    '%Y-%m-%d',
+    '%Y/%m/%d',
+    '%d/%m/%Y',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S.%f',
+)
+
+
+def serie_diaria(rng, inicio, fim, tipo_data='date', duplicadas=0.0, falhas=0.1):
+    """
+    Linhas {data, valor} de inicio a fim, em ordem aleatória.
+
+    Args:
+        rng: random.Random
+        inicio, fim: Intervalo de datas (inclusive)
+        tipo_data: 'date', 'datetime' ou 'string' (formato sorteado por linha)
+        duplicadas: Proporção de datas repetidas (outra linha, outro valor)
+        falhas: Proporção de dias sem linha
+    """
+    linhas = []
+    dia = inicio
+    while dia <= fim:
+        if rng.random() >= falhas:
+            repeticoes = 2 if rng.random() < duplicadas else 1
+            for _ in range(repeticoes):
+                linhas.append({'data': _data(rng, dia, tipo_data), 'valor': _valor(rng)})
+        dia += timedelta(days=1)
+    rng.shuffle(linhas)
+    return linhas
+
+
+def _data(rng, dia, tipo_data):
+    """Data da linha no tipo pedido"""
+    if tipo_data == 'datetime':
+        return datetime(dia.year, dia.month, dia.day, rng.randrange(24), rng.randrange(60))
+    if tipo_data == 'string':
+        return datetime(dia.year, dia.month, dia.day).strftime(rng.choice(FORMATOS_STRING))
+    return dia
+
+
+def _valor(rng):
+    """Valor como os do banco: Decimal, float ou int"""
+    escolha = rng.random()
+    if escolha < 0.4:
+        return Decimal(f'{rng.uniform(0, 5000):.2f}')
+    if escolha < 0.8:
+        return rng.uniform(-100, 10000)
+    return rng.randrange(0, 500)
+
+
+class VectorizedDataProcessorParityTest(SimpleTestCase):
+    """Saída do VectorizedDataProcessor idêntica à do DataProcessor"""
+
+    def setUp(self):
+        self.python = DataProcessor()
+        self.numpy = VectorizedDataProcessor()
+
+    def assertSameOutput(self, dados_cy, dados_py, data_referencia, usar_semana_movel):
+        """Compara o json.dumps dos dois motores (mesmas entradas)"""
+        kwargs = {
+            'agrupamento': 'semanal',
+            'ano_atual': data_referencia.year,
+            'ano_anterior': data_referencia.year - 1,
+            'data_referencia': data_referencia,
+            'usar_semana_movel': usar_semana_movel,
+        }
+        esperado = self.python.transform_to_wbr(dados_cy=dados_cy, dados_py=dados_py, **kwargs)
+        obtido = self.numpy.transform_to_wbr(dados_cy=dados_cy, dados_py=dados_py, **kwargs)
+        self.assertEqual(json.dumps(obtido), json.dumps(esperado))
+
+    def _periodos(self, data_referencia):
+        """Intervalos CY e PY (do início do ano anterior à referência, como nas queries)"""
+        inicio_cy = date(data_referencia.year, 1, 1)
+        inicio_py = date(data_referencia.year - 1, 1, 1)
+        fim_py = self.python._reference_py(data_referencia)
+        return (inicio_cy, data_referencia), (inicio_py, fim_py)
+
+    def test_random_series(self):
+        rng = random.Random(20251015)
+        for data_referencia in REFERENCIAS:
+            (inicio_cy, fim_cy), (inicio_py, fim_py) = self._periodos(data_referencia)
+            for tipo_data in ('date', 'datetime', 'string'):
+                dados_cy = serie_diaria(rng, inicio_cy, fim_cy, tipo_data)
+                dados_py = serie_diaria(rng, inicio_py, fim_py, tipo_data)
+                for usar_semana_movel in (False, True):
+                    with self.subTest(referencia=data_referencia, tipo=tipo_data, movel=usar_semana_movel):
+                        self.assertSameOutput(dados_cy, dados_py, data_referencia, usar_semana_movel)
+
+    def test_leap_day(self):
+        rng = random.Random(29)
+        dados_cy = serie_diaria(rng, date(2024, 2, 20), date(2024, 3, 5), falhas=0.0)
+        dados_py = serie_diaria(rng, date(2023, 2, 20), date(2023, 3, 5), falhas=0.0)
+        self.assertIn(date(2024, 2, 29), [linha['data'] for linha in dados_cy])
+        for data_referencia in (date(2024, 2, 29), date(2024, 3, 1), date(2024, 3, 5)):
+            for usar_semana_movel in (False, True):
+                with self.subTest(referencia=data_referencia, movel=usar_semana_movel):
+                    self.assertSameOutput(dados_cy, dados_py, data_referencia, usar_semana_movel)
+
+    def test_empty_py(self):
+        rng = random.Random(7)
+        data_referencia = date(2025, 10, 15)
+        (inicio_cy, fim_cy), _ = self._periodos(data_referencia)
+        dados_cy = serie_diaria(rng, inicio_cy, fim_cy)
+        for usar_semana_movel in (False, True):
+            with self.subTest(movel=usar_semana_movel):
+                self.assertSameOutput(dados_cy, [], data_referencia, usar_semana_movel)
+                self.assertSameOutput([], [], data_referencia, usar_semana_movel)
+
+    def test_duplicate_dates(self):
+        rng = random.Random(42)
+        for data_referencia in REFERENCIAS:
+            (inicio_cy, fim_cy), (inicio_py, fim_py) = self._periodos(data_referencia)
+            dados_cy = serie_diaria(rng, inicio_cy, fim_cy, 'datetime', duplicadas=0.5)
+            dados_py = serie_diaria(rng, inicio_py, fim_py, 'string', duplicadas=0.5)
+            for usar_semana_movel in (False, True):
+                with self.subTest(referencia=data_referencia, movel=usar_semana_movel):
+                    self.assertSameOutput(dados_cy, dados_py, data_referencia, usar_semana_movel)
+
+    def test_future_dates_in_rolling_weeks(self):
+        # Linhas depois da referência ficam fora das semanas móveis nos dois motores
+        rng = random.Random(11)
+        data_referencia = date(2025, 6, 10)
+        dados_cy = serie_diaria(rng, date(2025, 5, 1), date(2025, 6, 30))
+        dados_py = serie_diaria(rng, date(2024, 5, 1), date(2024, 6, 30))
+        self.assertSameOutput(dados_cy, dados_py, data_referencia, usar_semana_movel=True)
+
+    def test_tagged_single_scan(self):
+        rng = random.Random(5)
+        data_referencia = date(2024, 2, 29)
+        (inicio_cy, fim_cy), (inicio_py, fim_py) = self._periodos(data_referencia)
+        dados = (
+            [{'periodo': 'cy', **linha} for linha in serie_diaria(rng, inicio_cy, fim_cy, duplicadas=0.2)]
+            + [{'periodo': 'py', **linha} for linha in serie_diaria(rng, inicio_py, fim_py, 'string')]
+        )
+        rng.shuffle(dados)
+        kwargs = {
+            'agrupamento': 'semanal',
+            'ano_atual': 2024,
+            'ano_anterior': 2023,
+            'data_referencia': data_referencia,
+            'usar_semana_movel': True,
+        }
+        self.assertEqual(
+            json.dumps(self.numpy.transform_tagged_to_wbr(dados, **kwargs)),
+            json.dumps(self.python.transform_tagged_to_wbr(dados, **kwargs))
+        )
@@ -9,6 +9,7 @@ from .views import (
     WBRPageConfigView,
     FilterOptionsView,
     FilteredOptionsView,
+    FilterSearchView,
     AvailableDatesView,
     InstagramKPIsView,
     InstagramTopPostsView
@@ -29,6 +30,10 @@ urlpatterns = [
     # GET /api/v1/wbr/filters/filtered-options/?shopping=SIG&ramo=Grupo1
     path('filters/filtered-options/', FilteredOptionsView.as_view(), name='filtered_options'),
 
+    # Endpoint de autocomplete (busca por prefixo, sem acentos)
+    # GET /api/v1/wbr/filters/search/?field=loja&q=caf&shopping=SIG
+    path('filters/search/', FilterSearchView.as_view(), name='filter_search'),
+
     # Endpoint para configuração da página (sem dados)
     # GET /api/v1/wbr/page/{page_id}/config/
     path('page/<str:page_id>/config/', WBRPageConfigView.as_view(), name='page_config'),
@@ -3,13 +3,75 @@ Views Django para API WBR
 Expõe endpoints REST para gráficos individuais e páginas completas
 """
 
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
 from django.views import View
+import time
 import traceback
-from datetime import datetime
 
-from wbr.factories import ComponentFactory
+from wbr.factories import get_container
 from wbr.exceptions import ConfigNotFoundException, WBRException
+from wbr.services import binary_encoders
+from wbr.services.json_fragment import JSONFragment
+
+
+# Formatos dos dados dos gráficos (?format=): padrão ou colunar compacto (ColumnarEncoder)
+RESPONSE_FORMATS = ('json', 'columnar')
+
+
+def negotiate_content_type(request):
+    """
+    Codificação da resposta pelo header Accept (JSON, MessagePack ou Arrow IPC).
+
+    Sem Accept, com */* ou com um tipo que não é de dados (ex: text/html),
+    a resposta é JSON.
+
+    Returns:
+        Content type escolhido, ou None se o cliente aceita apenas formatos
+        binários cuja biblioteca não está instalada (406)
+    """
+    preferred = request.get_preferred_type(binary_encoders.CONTENT_TYPES)
+    if preferred is None or preferred == binary_encoders.JSON_CONTENT_TYPE:
+        return binary_encoders.JSON_CONTENT_TYPE
+
+    available = binary_encoders.available_content_types()
+    if preferred in available:
+        return preferred
+    return request.get_preferred_type(available)
+
+
+def not_acceptable_response():
+    """Resposta 406 com os formatos disponíveis"""
+    available = binary_encoders.available_content_types()
+    return JsonResponse({
+        'error': f"Formato não disponível; aceitos: {', '.join(available)}",
+        'formatos': list(available)
+    }, status=406)
+
+
+def encoded_response(content_type, payload, graficos):
+    """
+    Resposta no content type negociado.
+
+    Em JSON os bytes de payload vão direto no corpo (sem serializar de novo).
+
+    Args:
+        content_type: Resultado de negotiate_content_type
+        payload: JSONFragment com o corpo da resposta JSON/MessagePack
+        graficos: {grafico_id: JSONFragment} para Arrow IPC
+    """
+    if content_type == binary_encoders.MSGPACK_CONTENT_TYPE:
+        response = HttpResponse(binary_encoders.encode_msgpack(payload.value), content_type=content_type)
+    elif content_type == binary_encoders.ARROW_CONTENT_TYPE:
+        response = HttpResponse(
+            binary_encoders.encode_arrow({grafico_id: fragment.value for grafico_id, fragment in graficos.items()}),
+            content_type=content_type
+        )
+    else:
+        response = HttpResponse(payload.data, content_type=binary_encoders.JSON_CONTENT_TYPE)
+
+    patch_vary_headers(response, ('Accept',))
+    return response
 
 
 class WBRSingleView(View):
@@ -17,9 +79,13 @@ class WBRSingleView(View):
     Endpoint para buscar dados de um único gráfico.
 
     GET /api/v1/wbr/{grafico_id}/
+    GET /api/v1/wbr/{grafico_id}/?format=columnar
+
+    Accept: application/msgpack ou application/vnd.apache.arrow.stream
+    seleciona uma codificação binária (ver binary_encoders); JSON é o padrão.
 
     Returns:
-        JSON no formato WBR completo
+        JSON no formato WBR completo (ou colunar, ver ColumnarEncoder)
     """
 
     def get(self, request, grafico_id):
@@ -35,13 +101,23 @@ class WBRSingleView(View):
             - ramo: Grupo/ramo (apenas para gráficos RGM)
             - categoria: Categoria (apenas para gráficos RGM)
             - loja: Nome da loja (apenas para gráficos RGM)
+            - format: 'json' (padrão) ou 'columnar'
 
         Returns:
             JsonResponse com dados WBR ou erro
         """
+        response_format = request.GET.get('format', 'json')
+        if response_format not in RESPONSE_FORMATS:
+            return JsonResponse({
+                'error': f"format deve ser um de: {', '.join(RESPONSE_FORMATS)}"
+            }, status=400)
+
+        content_type = negotiate_content_type(request)
+        if content_type is None:
+            return not_acceptable_response()
 
         try:
-            service = ComponentFactory.create_wbr_service()
+            service = get_container().get_wbr_service()
 
             # Extrai filtros da query string
             user_filters = {}
@@ -51,57 +127,32 @@ class WBRSingleView(View):
                 user_filters['shopping'] = request.GET.get('shopping')
 
             # Filtros de RGM (apenas se for gráfico RGM)
-            # Para RGM, precisamos buscar as CHAVEs correspondentes na tabela Rgm_filtros
+            # Para RGM, as CHAVEs das lojas que atendem a ramo, categoria e
+            # loja (todos) vêm do índice em memória de Rgm_filtros: chave
+            # única, lista (= ANY) ou, se forem muitas, semi-join no banco
             if 'rgm' in grafico_id.lower():
-                ramo = request.GET.get('ramo')
-                categoria = request.GET.get('categoria')
-                loja = request.GET.get('loja')
-
-                whereConditions = []
-
-                if ramo:
-                    whereConditions.append('grupo = :ramo')
-
-                if categoria:
-                    whereConditions.append('categoria = :categoria')
-
-                if loja:
-                    whereConditions.append('name = :loja')
-
-                query = f"""
-                    SELECT DISTINCT chave
-                    FROM "mapa_do_bosque"."Rgm_filtros"
-                """
-
-                if len(whereConditions) > 0:
-                    query += ' WHERE ' + ' AND '.join(whereConditions)
-
-                namedParams = {
-                    "ramo": ramo,
-                    "categoria": categoria,
-                    "loja": loja
-                }
-                db_executor = ComponentFactory.create_database_executor()
-                result = db_executor.execute(query, namedParams)
+                chave_filter = get_container().get_rgm_filtros_index().chave_filter(
+                    'all',
+                    grupo=request.GET.get('ramo'),
+                    categoria=request.GET.get('categoria'),
+                    name=request.GET.get('loja')
+                )
 
-                chaves = [row['chave'] for row in result]
-                
                 # Se encontrou CHAVEs, aplica filtro
-                if chaves:
-                    # Remove duplicatas
-                    chaves = list(set(chaves))
-                    # Se só tem uma CHAVE, usa =, senão usa IN
-                    if len(chaves) == 1:
-                        user_filters['chave'] = chaves[0]
-                    else:
-                        user_filters['chave'] = chaves
+                if chave_filter is not None:
+                    user_filters['chave'] = chave_filter
 
             resultado = service.generate(
                 grafico_id,
                 user_filters=user_filters if user_filters else None,
                 data_referencia=data_referencia
             )
-            return JsonResponse(resultado, safe=False)
+            payload = resultado
+            if response_format == 'columnar':
+                payload = JSONFragment.from_value(
+                    get_container().get_columnar_encoder().encode_chart(grafico_id, resultado.value)
+                )
+            return encoded_response(content_type, payload, {grafico_id: resultado})
 
         except ConfigNotFoundException as e:
             return JsonResponse({
@@ -145,7 +196,7 @@ class WBRPageConfigView(View):
             JsonResponse com configuração da página
         """
         try:
-            service = ComponentFactory.create_wbr_service()
+            service = get_container().get_wbr_service()
             config_loader = service.config_loader
 
             # Carrega configuração da página
@@ -171,25 +222,68 @@ class WBRPageView(View):
     Endpoint para buscar todos os gráficos de uma página.
 
     GET /api/v1/wbr/page/{page_id}/
+    GET /api/v1/wbr/page/{page_id}/?stream=ndjson
+    GET /api/v1/wbr/page/{page_id}/?stream=sse  (ou Accept: text/event-stream)
+    GET /api/v1/wbr/page/{page_id}/?format=columnar  (combinável com stream)
+
+    Gráficos padrão com os mesmos filtros são buscados em uma única query
+    e as queries da página rodam em paralelo (WBRService.iter_many).
+    O tempo de cada gráfico vai no header Server-Timing.
+
+    Com stream, cada gráfico (ou seu erro) é enviado assim que fica pronto,
+    seguido de um evento 'fim':
+        ndjson: {"evento": "grafico", "grafico_id": ..., "dados": ..., "duracao_ms": ...}
+                {"evento": "fim", "total": ..., "duracao_ms": ...}
+        sse:    event: grafico / data: {"grafico_id": ..., "dados": ..., "duracao_ms": ...}
+                event: fim / data: {"total": ..., "duracao_ms": ...}
+
+    Com format=columnar, as datas viram eixos compartilhados por todos os
+    gráficos da resposta (no stream, eixos de cada gráfico).
 
-    Executa queries em paralelo para alta performance.
+    Sem stream, o header Accept pode pedir MessagePack ou Arrow IPC (um
+    record batch por gráfico; format não se aplica), ver binary_encoders.
 
     Returns:
-        JSON com dicionário {grafico_id: dados_wbr, ...}
+        JSON com dicionário {grafico_id: dados_wbr, ...}, formato colunar
+        ({"formato", "eixos", "graficos"}) ou stream de eventos
     """
 
+    STREAM_CONTENT_TYPES = {
+        'ndjson': 'application/x-ndjson',
+        'sse': 'text/event-stream',
+    }
+
     def get(self, request, page_id):
         """
-        Busca todos os gráficos de uma página em paralelo.
+        Busca todos os gráficos de uma página em lote.
 
         Args:
             page_id: Identificador da página/dashboard
 
         Returns:
-            JsonResponse com dicionário de gráficos ou erro
+            JsonResponse com dicionário de gráficos, StreamingHttpResponse
+            (stream) ou erro
         """
+        stream = request.GET.get('stream')
+        if stream is None and 'text/event-stream' in request.headers.get('Accept', ''):
+            stream = 'sse'
+        if stream is not None and stream not in self.STREAM_CONTENT_TYPES:
+            return JsonResponse({
+                'error': f"stream deve ser um de: {', '.join(self.STREAM_CONTENT_TYPES)}"
+            }, status=400)
+
+        response_format = request.GET.get('format', 'json')
+        if response_format not in RESPONSE_FORMATS:
+            return JsonResponse({
+                'error': f"format deve ser um de: {', '.join(RESPONSE_FORMATS)}"
+            }, status=400)
+
+        content_type = negotiate_content_type(request) if stream is None else None
+        if stream is None and content_type is None:
+            return not_acceptable_response()
+
         try:
-            service = ComponentFactory.create_wbr_service()
+            service = get_container().get_wbr_service()
             config_loader = service.config_loader
 
             # Carrega configuração da página
@@ -202,97 +296,55 @@ class WBRPageView(View):
                     'page_config': page_config
                 }, status=400)
 
-            # Extrai filtros da query string
-            user_filters = {}
             data_referencia = request.GET.get('data_referencia')
+            filters = self._filters(request, grafico_ids)
+            encoder = get_container().get_columnar_encoder() if response_format == 'columnar' else None
 
-            if request.GET.get('shopping'):
-                user_filters['shopping'] = request.GET.get('shopping')
+            if stream is not None:
+                response = StreamingHttpResponse(
+                    self._stream(service, page_id, grafico_ids, filters, data_referencia, stream, encoder),
+                    content_type=self.STREAM_CONTENT_TYPES[stream]
+                )
+                response['Cache-Control'] = 'no-cache'
+                # Proxies (nginx) não devem acumular o stream
+                response['X-Accel-Buffering'] = 'no'
+                return response
+
+            # Gera todos os gráficos em lote: gráficos padrão com os mesmos
+            # filtros compartilham uma única query (UNION ALL) e os lotes
+            # rodam em paralelo
+            start = time.perf_counter()
+            timings = {}
+            results = service.generate_many(
+                grafico_ids,
+                filters=filters,
+                data_referencia=data_referencia,
+                timings=timings
+            )
+            total = time.perf_counter() - start
+
+            # JSON de cada gráfico já serializado (cache ou geração): a página
+            # é a junção dos fragmentos
+            graficos = {
+                grafico_id: self._chart_payload(resultado)
+                for grafico_id, resultado in results.items()
+            }
+            if encoder is not None:
+                response = JSONFragment.from_value(
+                    encoder.encode_page({grafico_id: fragment.value for grafico_id, fragment in graficos.items()})
+                )
+            else:
+                response = JSONFragment.join(graficos)
 
-            # Filtros de RGM (serão aplicados apenas em gráficos RGM)
-            # Busca CHAVEs correspondentes na tabela Rgm_filtros
-            rgm_filters = {}
-            if request.GET.get('ramo') or request.GET.get('categoria') or request.GET.get('loja'):
-                db_executor = ComponentFactory.create_database_executor()
-                chaves = []
-
-                # Busca CHAVEs por Ramo (Grupo)
-                if request.GET.get('ramo'):
-                    query = f"""
-                        SELECT DISTINCT chave
-                        FROM "mapa_do_bosque"."Rgm_filtros"
-                        WHERE grupo = '{request.GET.get('ramo')}'
-                    """
-                    result = db_executor.execute(query)
-                    chaves.extend([row['chave'] for row in result])
-
-                # Busca CHAVEs por Categoria
-                if request.GET.get('categoria'):
-                    query = f"""
-                        SELECT DISTINCT chave
-                        FROM "mapa_do_bosque"."Rgm_filtros"
-                        WHERE categoria = '{request.GET.get('categoria')}'
-                    """
-                    result = db_executor.execute(query)
-                    chaves.extend([row['chave'] for row in result])
-
-                # Busca CHAVEs por Loja (name)
-                if request.GET.get('loja'):
-                    query = f"""
-                        SELECT DISTINCT chave
-                        FROM "mapa_do_bosque"."Rgm_filtros"
-                        WHERE name = '{request.GET.get('loja')}'
-                    """
-                    result = db_executor.execute(query)
-                    chaves.extend([row['chave'] for row in result])
+            self._log_page(service, page_id, total, timings)
 
-                # Se encontrou CHAVEs, aplica filtro
-                if chaves:
-                    # Remove duplicatas
-                    chaves = list(set(chaves))
-                    # Se só tem uma CHAVE, usa =, senão usa IN
-                    if len(chaves) == 1:
-                        rgm_filters['chave'] = chaves[0]
-                    else:
-                        rgm_filters['chave'] = chaves
-
-            # Gera todos os gráficos SEQUENCIALMENTE (um por vez)
-            # Evita esgotar o connection pool do Supabase
-            response = {}
-            for grafico_id in grafico_ids:
-                try:
-                    # Combina filtros base + filtros RGM se for gráfico RGM
-                    filters_to_apply = {**user_filters}
-                    if 'rgm' in grafico_id.lower():
-                        filters_to_apply.update(rgm_filters)
-
-                    response[grafico_id] = service.generate(
-                        grafico_id,
-                        user_filters=filters_to_apply if filters_to_apply else None,
-                        data_referencia=data_referencia
-                    )
-                except ConfigNotFoundException as e:
-                    response[grafico_id] = {
-                        'error': e.message,
-                        'details': e.details,
-                        'status': 'failed',
-                        'error_type': 'ConfigNotFoundException'
-                    }
-                except WBRException as e:
-                    response[grafico_id] = {
-                        'error': e.message,
-                        'details': e.details,
-                        'status': 'failed',
-                        'error_type': type(e).__name__
-                    }
-                except Exception as e:
-                    response[grafico_id] = {
-                        'error': str(e),
-                        'status': 'failed',
-                        'error_type': type(e).__name__
-                    }
-
-            return JsonResponse(response, safe=False)
+            # Tempo de cada gráfico (e da página) visível no DevTools do navegador
+            http_response = encoded_response(content_type, response, graficos)
+            http_response['Server-Timing'] = ', '.join(
+                [f'{grafico_id};dur={segundos * 1000:.1f}' for grafico_id, segundos in timings.items()]
+                + [f'total;dur={total * 1000:.1f}']
+            )
+            return http_response
 
         except ConfigNotFoundException as e:
             return JsonResponse({
@@ -306,6 +358,100 @@ class WBRPageView(View):
                 'error_type': type(e).__name__
             }, status=500)
 
+    def _filters(self, request, grafico_ids):
+        """Filtros de cada gráfico a partir da query string"""
+        user_filters = {}
+        if request.GET.get('shopping'):
+            user_filters['shopping'] = request.GET.get('shopping')
+
+        # Filtros de RGM (serão aplicados apenas em gráficos RGM)
+        # CHAVEs de qualquer um dos filtros (ramo, categoria ou loja),
+        # resolvidas no índice em memória de Rgm_filtros (ou semi-join)
+        rgm_filters = {}
+        if request.GET.get('ramo') or request.GET.get('categoria') or request.GET.get('loja'):
+            chave_filter = get_container().get_rgm_filtros_index().chave_filter(
+                'any',
+                grupo=request.GET.get('ramo'),
+                categoria=request.GET.get('categoria'),
+                name=request.GET.get('loja')
+            )
+
+            # Se encontrou CHAVEs, aplica filtro
+            if chave_filter is not None:
+                rgm_filters['chave'] = chave_filter
+
+        # Combina filtros base + filtros RGM se for gráfico RGM
+        filters = {}
+        for grafico_id in grafico_ids:
+            filters_to_apply = {**user_filters}
+            if 'rgm' in grafico_id.lower():
+                filters_to_apply.update(rgm_filters)
+            filters[grafico_id] = filters_to_apply if filters_to_apply else None
+        return filters
+
+    def _chart_payload(self, resultado):
+        """Dados WBR do gráfico ou descrição do erro (JSONFragment)"""
+        if isinstance(resultado, WBRException):
+            return JSONFragment.from_value({
+                'error': resultado.message,
+                'details': resultado.details,
+                'status': 'failed',
+                'error_type': type(resultado).__name__
+            })
+        if isinstance(resultado, Exception):
+            return JSONFragment.from_value({
+                'error': str(resultado),
+                'status': 'failed',
+                'error_type': type(resultado).__name__
+            })
+        return resultado
+
+    def _stream(self, service, page_id, grafico_ids, filters, data_referencia, formato, encoder=None):
+        """
+        Eventos do stream: um por gráfico, na ordem em que ficam prontos, e 'fim'.
+
+        Com encoder (ColumnarEncoder), os dados de cada gráfico vão no formato
+        colunar com os próprios eixos.
+        """
+        start = time.perf_counter()
+        timings = {}
+        try:
+            for grafico_id, resultado, segundos in service.iter_many(grafico_ids, filters, data_referencia):
+                if segundos is not None:
+                    timings[grafico_id] = segundos
+                dados = self._chart_payload(resultado)
+                if encoder is not None:
+                    dados = JSONFragment.from_value(encoder.encode_chart(grafico_id, dados.value))
+                yield self._event(formato, 'grafico', {
+                    'grafico_id': grafico_id,
+                    'dados': dados,
+                    'duracao_ms': round(segundos * 1000, 1) if segundos is not None else None,
+                })
+        except Exception as e:
+            # Cabeçalhos já enviados: o erro vai como evento
+            yield self._event(formato, 'erro', {
+                'error': f'Erro ao carregar página: {str(e)}',
+                'error_type': type(e).__name__
+            })
+
+        total = time.perf_counter() - start
+        self._log_page(service, page_id, total, timings)
+        yield self._event(formato, 'fim', {'total': len(grafico_ids), 'duracao_ms': round(total * 1000, 1)})
+
+    def _event(self, formato, evento, dados):
+        """Evento serializado como linha NDJSON ou mensagem SSE (dados do gráfico sem reserializar)"""
+        if formato == 'sse':
+            return b'event: ' + evento.encode('utf-8') + b'\ndata: ' + JSONFragment.join(dados).data + b'\n\n'
+        return JSONFragment.join({'evento': evento, **dados}).data + b'\n'
+
+    def _log_page(self, service, page_id, total, timings):
+        """Log com o tempo da página e de cada gráfico gerado"""
+        service.logger.info("Página gerada", {
+            'page_id': page_id,
+            'duracao_ms': round(total * 1000, 1),
+            'graficos_ms': {grafico_id: round(segundos * 1000, 1) for grafico_id, segundos in timings.items()},
+        })
+
 
 class FilterOptionsView(View):
     """
@@ -332,69 +478,10 @@ class FilterOptionsView(View):
             JsonResponse com opções de filtros
         """
         try:
-            db_executor = ComponentFactory.create_database_executor()
-
-            # Busca datas disponíveis da tabela dimensão dim_data
-            datas_query = """
-                SELECT DISTINCT "data"
-                FROM "mapa_do_bosque"."dim_data"
-                WHERE "data" IS NOT NULL
-                ORDER BY "data" DESC
-            """
-            datas_result = db_executor.execute(datas_query)
-            datas = [row['data'].isoformat() if isinstance(row['data'], datetime) else str(row['data'])
-                    for row in datas_result]
-
-            # Busca shoppings disponíveis da tabela dimensão dm_shopping
-            shoppings_query = """
-                SELECT DISTINCT "sigla", "nome_shopping"
-                FROM "mapa_do_bosque"."dm_shopping"
-                WHERE "sigla" IS NOT NULL
-                ORDER BY "sigla"
-            """
-            shoppings_result = db_executor.execute(shoppings_query)
-            shoppings = [
-                {"value": row['sigla'], "label": row['nome_shopping']}
-                for row in shoppings_result
-            ]
-
-            # Busca ramos disponíveis (coluna grupo)
-            ramos_query = """
-                SELECT DISTINCT grupo
-                FROM "mapa_do_bosque"."Rgm_filtros"
-                WHERE grupo IS NOT NULL
-                ORDER BY grupo
-            """
-            ramos_result = db_executor.execute(ramos_query)
-            ramos = [row['grupo'] for row in ramos_result]
-
-            # Busca categorias disponíveis (coluna categoria)
-            categorias_query = """
-                SELECT DISTINCT categoria
-                FROM "mapa_do_bosque"."Rgm_filtros"
-                WHERE categoria IS NOT NULL
-                ORDER BY categoria
-            """
-            categorias_result = db_executor.execute(categorias_query)
-            categorias = [row['categoria'] for row in categorias_result]
-
-            # Busca lojas disponíveis (coluna name)
-            lojas_query = """
-                SELECT DISTINCT name
-                FROM "mapa_do_bosque"."Rgm_filtros"
-                WHERE name IS NOT NULL
-                ORDER BY name
-            """
-            lojas_result = db_executor.execute(lojas_query)
-            lojas = [row['name'] for row in lojas_result]
-
-            return JsonResponse({
-                'datas': datas,
-                'shoppings': shoppings,
-                'ramos': ramos,
-                'categorias': categorias,
-                'lojas': lojas
-            }, safe=False)
+            # Datas (dim_data), shoppings (dm_shopping) e ramos, categorias e
+            # lojas (Rgm_filtros) servidos da memória; recarregados apenas
+            # quando os dados das tabelas mudam
+            return JsonResponse(get_container().get_facet_engine().filter_options(), safe=False)
 
         except Exception as e:
             return JsonResponse({
@@ -426,63 +513,76 @@ class FilteredOptionsView(View):
             JsonResponse com opções filtradas
         """
         try:
-            db_executor = ComponentFactory.create_database_executor()
+            # Opções em cascata: AND dos bitsets dos filtros aplicados sobre
+            # as linhas de Rgm_filtros (em memória)
+            opcoes = get_container().get_facet_engine().filtered_options(
+                shopping=request.GET.get('shopping'),
+                ramo=request.GET.get('ramo'),
+                categoria=request.GET.get('categoria')
+            )
 
-            # Pega filtros aplicados
-            shopping = request.GET.get('shopping')
-            ramo = request.GET.get('ramo')
-            categoria = request.GET.get('categoria')
-
-            # Constrói WHERE clause dinamicamente
-            where_clauses = []
-            if shopping:
-                where_clauses.append(f"sigla = '{shopping}'")
-            if ramo:
-                where_clauses.append(f"grupo = '{ramo}'")
-            if categoria:
-                where_clauses.append(f"categoria = '{categoria}'")
-
-            where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
-
-            # Busca ramos filtrados
-            ramos_query = f"""
-                SELECT DISTINCT grupo
-                FROM "mapa_do_bosque"."Rgm_filtros"
-                WHERE {where_sql} AND grupo IS NOT NULL
-                ORDER BY grupo
-            """
-            ramos_result = db_executor.execute(ramos_query)
-            ramos = [row['grupo'] for row in ramos_result]
-
-            # Busca categorias filtradas
-            categorias_query = f"""
-                SELECT DISTINCT categoria
-                FROM "mapa_do_bosque"."Rgm_filtros"
-                WHERE {where_sql} AND categoria IS NOT NULL
-                ORDER BY categoria
-            """
-            categorias_result = db_executor.execute(categorias_query)
-            categorias = [row['categoria'] for row in categorias_result]
-
-            # Busca lojas filtradas
-            lojas_query = f"""
-                SELECT DISTINCT name
-                FROM "mapa_do_bosque"."Rgm_filtros"
-                WHERE {where_sql} AND name IS NOT NULL
-                ORDER BY name
-            """
-            lojas_result = db_executor.execute(lojas_query)
-            lojas = [row['name'] for row in lojas_result]
+            return JsonResponse(opcoes, safe=False)
 
+        except Exception as e:
             return JsonResponse({
-                'ramos': ramos,
-                'categorias': categorias,
-                'lojas': lojas
+                'error': f'Erro ao buscar opções filtradas: {str(e)}',
+                'error_type': type(e).__name__
+            }, status=500)
+
+
+class FilterSearchView(View):
+    """
+    Endpoint de autocomplete para lojas, categorias e ramos.
+
+    GET /api/v1/wbr/filters/search/?field=loja&q=caf&shopping=SCIB
+
+    Returns:
+        JSON com os primeiros valores que têm uma palavra iniciada por q
+        (sem diferenciar acentos e maiúsculas)
+    """
+
+    def get(self, request):
+        """
+        Busca valores de um filtro por prefixo.
+
+        Query params:
+            - field: loja, categoria ou ramo
+            - q: Texto digitado (vazio: primeiros valores)
+            - limit: Número máximo de resultados (padrão: 10, máximo: 50)
+            - shopping: Sigla do shopping (opcional)
+            - ramo: Grupo/ramo (opcional)
+
+        Returns:
+            JsonResponse com {field, q, opcoes}
+        """
+        try:
+            field = request.GET.get('field', '')
+            query = request.GET.get('q', '')
+
+            # Busca binária no índice ordenado de Rgm_filtros (em memória)
+            try:
+                limit = int(request.GET.get('limit', '10'))
+                opcoes = get_container().get_facet_engine().search(
+                    field,
+                    query,
+                    limit=limit,
+                    shopping=request.GET.get('shopping'),
+                    ramo=request.GET.get('ramo')
+                )
+            except ValueError as e:
+                return JsonResponse({
+                    'error': f'Parâmetro inválido: {str(e)}'
+                }, status=400)
+
+            return JsonResponse({
+                'field': field,
+                'q': query,
+                'opcoes': opcoes
             }, safe=False)
 
         except Exception as e:
             return JsonResponse({
-                'error': f'Erro ao buscar opções filtradas: {str(e)}',
+                'error': f'Erro ao buscar opções: {str(e)}',
                 'error_type': type(e).__name__
             }, status=500)
 
@@ -505,27 +605,10 @@ class AvailableDatesView(View):
         Retorna lista de datas únicas disponíveis nos dados.
         """
         try:
-            from wbr.factories import ComponentFactory
-
-            db_executor = ComponentFactory.create_database_executor()
-
-            # Busca datas da tabela dimensão dim_data
-            query = """
-                SELECT DISTINCT "data"
-                FROM "mapa_do_bosque"."dim_data"
-                WHERE "data" IS NOT NULL
-                ORDER BY "data" DESC
-            """
-
-            result = db_executor.execute(query, {})
-
-            # Extrai apenas as datas em formato YYYY-MM-DD
-            dates = [row['data'].strftime('%Y-%m-%d') if hasattr(row['data'], 'strftime') else str(row['data']) for row in result]
-
-            return JsonResponse({
-                'dates': dates,
-                'count': len(dates)
-            })
+            # Datas de dim_data (YYYY-MM-DD, mais recente primeiro) servidas do
+            # DateCalendar: o corpo JSON é montado apenas quando a tabela muda
+            body = get_container().get_date_calendar().dates_json()
+            return HttpResponse(body, content_type='application/json')
 
         except Exception as e:
             return JsonResponse({
@@ -543,16 +626,16 @@ class InstagramKPIsView(View):
     Query params:
         - data_referencia: Data de referência (YYYY-MM-DD)
         - shopping: Sigla do shopping (SCIB, SBI, SBGP)
+        - historico_dias: Inclui série diária de seguidores dos N dias até a
+          data de referência em 'seguidores_historico' (opcional, 1 a 366)
 
     Returns:
-        JSON com KPIs do Instagram
+        JSON com KPIs do Instagram (seguidores com total numérico)
     """
 
     def get(self, request):
         """Busca KPIs do Instagram."""
         try:
-            db_executor = ComponentFactory.create_database_executor()
-
             # Extrai filtros
             data_referencia = request.GET.get('data_referencia')
             shopping = request.GET.get('shopping')
@@ -562,203 +645,22 @@ class InstagramKPIsView(View):
                     'error': 'data_referencia é obrigatório'
                 }, status=400)
 
-            # Query para seguidores (UserInsight)
-            # Busca follower_demographics que contém a quantidade total de seguidores
-            # O campo value contém um objeto JSON com os dados demográficos
-            seguidores_query = f"""
-                WITH all_data AS (
-                  SELECT
-                    'SCIB' as shopping,
-                    "startTime"::date AS DATA,
-                    "metricName"::text AS METRICA,
-                    "value"
-                  FROM "instagram-data-fetch-scib"."UserInsight"
-                  WHERE "metricName"::text = 'follower_demographics'
-                    AND "startTime"::date <= '{data_referencia}'::date
-
-                  UNION ALL
-
-                  SELECT
-                    'SBI' as shopping,
-                    "startTime"::date AS DATA,
-                    "metricName"::text AS METRICA,
-                    "value"
-                  FROM "instagram-data-fetch-sbi"."UserInsight"
-                  WHERE "metricName"::text = 'follower_demographics'
-                    AND "startTime"::date <= '{data_referencia}'::date
-
-                  UNION ALL
-
-                  SELECT
-                    'SBGP' as shopping,
-                    "startTime"::date AS DATA,
-                    "metricName"::text AS METRICA,
-                    "value"
-                  FROM "instagram-data-fetch-sbgp"."UserInsight"
-                  WHERE "metricName"::text = 'follower_demographics'
-                    AND "startTime"::date <= '{data_referencia}'::date
-                ),
-                latest_per_shopping AS (
-                  SELECT
-                    shopping,
-                    DATA,
-                    METRICA,
-                    value,
-                    ROW_NUMBER() OVER (PARTITION BY shopping ORDER BY DATA DESC) as rn
-                  FROM all_data
-                )
-                SELECT shopping, DATA, METRICA, value
-                FROM latest_per_shopping
-                WHERE rn = 1
-                  {f"AND shopping = '{shopping}'" if shopping else ""}
-                ORDER BY DATA DESC
-            """
-
-            # Extrai ano e mês da data de referência para calcular engajamento médio do mês
-            from datetime import datetime
-            import calendar
-
-            data_obj = datetime.strptime(data_referencia, '%Y-%m-%d')
-            ano = data_obj.year
-            mes = data_obj.month
-            dias_no_mes = calendar.monthrange(ano, mes)[1]
-
-            # Query para engajamento e alcance (PostInsight)
-            # Busca dados do dia específico para alcance/impressões
-            # E calcula engajamento total acumulado do início do mês até a data selecionada
-            # IMPORTANTE: Usa ROW_NUMBER() para pegar apenas o último insight de cada post
-            engagement_query = f"""
-                WITH POSTINSIGHT AS (
-                    SELECT I.*
-                    FROM (
-                        SELECT
-                            'SCIB' AS SHOPPING,
-                            *,
-                            ROW_NUMBER() OVER(PARTITION BY "postId" ORDER BY "measuredAt" DESC) AS ORDEM
-                        FROM "instagram-data-fetch-scib"."PostInsight"
-
-                        UNION ALL
-
-                        SELECT
-                            'SBGP' AS SHOPPING,
-                            *,
-                            ROW_NUMBER() OVER(PARTITION BY "postId" ORDER BY "measuredAt" DESC) AS ORDEM
-                        FROM "instagram-data-fetch-sbgp"."PostInsight"
-
-                        UNION ALL
-
-                        SELECT
-                            'SBI' AS SHOPPING,
-                            *,
-                            ROW_NUMBER() OVER(PARTITION BY "postId" ORDER BY "measuredAt" DESC) AS ORDEM
-                        FROM "instagram-data-fetch-sbi"."PostInsight"
-                    ) AS I
-                    WHERE I.ORDEM = 1
-                ),
-                POST AS (
-                    SELECT
-                        'SCIB' AS SHOPPING,
-                        "id" AS ID,
-                        "postedAt" AS DATA_POST
-                    FROM "instagram-data-fetch-scib"."Post"
-
-                    UNION ALL
-
-                    SELECT
-                        'SBGP' AS SHOPPING,
-                        "id" AS ID,
-                        "postedAt" AS DATA_POST
-                    FROM "instagram-data-fetch-sbgp"."Post"
-
-                    UNION ALL
-
-                    SELECT
-                        'SBI' AS SHOPPING,
-                        "id" AS ID,
-                        "postedAt" AS DATA_POST
-                    FROM "instagram-data-fetch-sbi"."Post"
-                ),
-                daily_data AS (
-                      SELECT
-                          P.SHOPPING as shopping,
-                          DATE(P.DATA_POST) as data,
-                          COALESCE(SUM(I.likes), 0) as total_likes,
-                          COALESCE(SUM(I.reach), 0) as total_alcance,
-                          COALESCE(SUM(I.impressions), 0) as total_impressoes,
-                          COALESCE(SUM(I.comments), 0) as total_comentarios,
-                          COALESCE(SUM(I.shares), 0) as total_compartilhamentos,
-                          COALESCE(SUM(I.saved), 0) as total_salvos,
-                          COUNT(DISTINCT P.ID) as total_posts
-                      FROM POST AS P
-                      JOIN POSTINSIGHT AS I ON CONCAT(P.SHOPPING, '-', P.ID) = CONCAT(I.SHOPPING, '-', I."postId")
-                      WHERE DATE(P.DATA_POST) = '{data_referencia}'
-                      GROUP BY P.SHOPPING, DATE(P.DATA_POST)
-                  ),
-                  month_to_date_engagement AS (
-                      -- Engajamento acumulado do dia 1 do mês até a data selecionada
-                      SELECT
-                          P.SHOPPING as shopping,
-                          SUM(COALESCE(I.likes, 0) + COALESCE(I.comments, 0) +
-                              COALESCE(I.shares, 0) + COALESCE(I.saved, 0)) as engajamento_total_acumulado,
-                          COUNT(DISTINCT DATE(P.DATA_POST)) as dias_com_posts
-                      FROM POST AS P
-                      JOIN POSTINSIGHT AS I ON CONCAT(P.SHOPPING, '-', P.ID) = CONCAT(I.SHOPPING, '-', I."postId")
-                      WHERE EXTRACT(YEAR FROM P.DATA_POST) = {ano}
-                        AND EXTRACT(MONTH FROM P.DATA_POST) = {mes}
-                        AND DATE(P.DATA_POST) <= '{data_referencia}'
-                      GROUP BY P.SHOPPING
-                  ),
-                  month_to_date_reach AS (
-                      -- Alcance acumulado do dia 1 do mês até a data selecionada
-                      SELECT
-                          P.SHOPPING as shopping,
-                          SUM(COALESCE(I.reach, 0)) as alcance_total_acumulado,
-                          COUNT(DISTINCT DATE(P.DATA_POST)) as dias_com_posts
-                      FROM POST AS P
-                      JOIN POSTINSIGHT AS I ON CONCAT(P.SHOPPING, '-', P.ID) = CONCAT(I.SHOPPING, '-', I."postId")
-                      WHERE EXTRACT(YEAR FROM P.DATA_POST) = {ano}
-                        AND EXTRACT(MONTH FROM P.DATA_POST) = {mes}
-                        AND DATE(P.DATA_POST) <= '{data_referencia}'
-                      GROUP BY P.SHOPPING
-                  )
-                  SELECT
-                      d.shopping,
-                      d.data,
-                      d.total_likes,
-                      d.total_alcance,
-                      d.total_impressoes,
-                      d.total_comentarios,
-                      d.total_compartilhamentos,
-                      d.total_salvos,
-                      (d.total_likes + d.total_comentarios + d.total_compartilhamentos + d.total_salvos) as engajamento_total,
-                      d.total_posts,
-                      COALESCE(m.engajamento_total_acumulado, 0) as engajamento_total_mes,
-                      COALESCE(m.dias_com_posts, 0) as dias_disponiveis,
-                      CASE
-                        WHEN COALESCE(m.dias_com_posts, 0) > 0
-                        THEN COALESCE(m.engajamento_total_acumulado / m.dias_com_posts, 0)
-                        ELSE 0
-                      END as engajamento_medio_dia,
-                      COALESCE(r.alcance_total_acumulado, 0) as alcance_total_mes,
-                      CASE
-                        WHEN COALESCE(r.dias_com_posts, 0) > 0
-                        THEN COALESCE(r.alcance_total_acumulado / r.dias_com_posts, 0)
-                        ELSE 0
-                      END as alcance_medio_dia
-                  FROM daily_data d
-                  LEFT JOIN month_to_date_engagement m ON d.shopping = m.shopping
-                  LEFT JOIN month_to_date_reach r ON d.shopping = r.shopping
-                  {f"WHERE d.shopping = '{shopping}'" if shopping else ""}
-                  ORDER BY d.data DESC, d.shopping
-            """
-
-            seguidores_result = db_executor.execute(seguidores_query)
-            engagement_result = db_executor.execute(engagement_query)
+            # Métricas do dia, acumulado do mês e médias derivados das linhas
+            # diárias do mês (em cache por shopping + mês)
+            engine = get_container().get_instagram_kpi_engine()
+            kpis = engine.get_kpis(data_referencia, shopping)
 
-            return JsonResponse({
-                'seguidores': seguidores_result,
-                'engagement': engagement_result
-            }, safe=False)
+            historico_dias = request.GET.get('historico_dias')
+            if historico_dias:
+                try:
+                    dias = int(historico_dias)
+                    kpis['seguidores_historico'] = engine.get_follower_history(data_referencia, dias, shopping)
+                except ValueError as e:
+                    return JsonResponse({
+                        'error': f'historico_dias inválido: {str(e)}'
+                    }, status=400)
+
+            return JsonResponse(kpis, safe=False)
 
         except Exception as e:
             return JsonResponse({
@@ -776,132 +678,35 @@ class InstagramTopPostsView(View):
     Query params:
         - data_referencia: Data de referência (YYYY-MM-DD) - opcional
         - shopping: Sigla do shopping (SCIB, SBI, SBGP)
-        - limit: Número de posts a retornar (padrão: 3)
+        - limit: Número de posts a retornar (padrão: 3, máximo: 50)
+        - cursor: proximo_cursor da resposta anterior (próxima página)
 
     Returns:
-        JSON com lista dos top posts
+        JSON com lista dos top posts e cursor da próxima página
+        (null na última página)
     """
 
     def get(self, request):
         """Busca Top Posts do Instagram."""
         try:
-            db_executor = ComponentFactory.create_database_executor()
-
             # Extrai filtros
             data_referencia = request.GET.get('data_referencia')
             shopping = request.GET.get('shopping')
-            limit = request.GET.get('limit', '3')
-
-            # Constrói WHERE clause para data do mês
-            # Se data_referencia for fornecida, busca posts do mês inteiro
-            if data_referencia:
-                from datetime import datetime
-                data_obj = datetime.strptime(data_referencia, '%Y-%m-%d')
-                ano = data_obj.year
-                mes = data_obj.month
-                date_filter = f"AND EXTRACT(YEAR FROM p.\"postedAt\") = {ano} AND EXTRACT(MONTH FROM p.\"postedAt\") = {mes}"
-            else:
-                date_filter = ""
-
-            query = f"""
-                WITH POSTINSIGHT AS (
-                    SELECT I.*
-                    FROM (
-                        SELECT
-                            'SCIB' AS SHOPPING,
-                            *,
-                            ROW_NUMBER() OVER(PARTITION BY "postId" ORDER BY "measuredAt" DESC) AS ORDEM
-                        FROM "instagram-data-fetch-scib"."PostInsight"
-
-                        UNION ALL
-
-                        SELECT
-                            'SBGP' AS SHOPPING,
-                            *,
-                            ROW_NUMBER() OVER(PARTITION BY "postId" ORDER BY "measuredAt" DESC) AS ORDEM
-                        FROM "instagram-data-fetch-sbgp"."PostInsight"
-
-                        UNION ALL
-
-                        SELECT
-                            'SBI' AS SHOPPING,
-                            *,
-                            ROW_NUMBER() OVER(PARTITION BY "postId" ORDER BY "measuredAt" DESC) AS ORDEM
-                        FROM "instagram-data-fetch-sbi"."PostInsight"
-                    ) AS I
-                    WHERE I.ORDEM = 1
-                ),
-                POST AS (
-                    SELECT
-                        'SCIB' AS SHOPPING,
-                        "id" AS ID,
-                        "postedAt" AS DATA_POST,
-                        "mediaUrl" AS MEDIA_URL,
-                        "permalink" AS PERMALINK,
-                        COALESCE("mediaType"::text, 'IMAGE') AS MEDIA_TYPE
-                    FROM "instagram-data-fetch-scib"."Post"
-                    WHERE 1 = 1 {date_filter.replace('p.', '')}
-
-                    UNION ALL
-
-                    SELECT
-                        'SBGP' AS SHOPPING,
-                        "id" AS ID,
-                        "postedAt" AS DATA_POST,
-                        "mediaUrl" AS MEDIA_URL,
-                        "permalink" AS PERMALINK,
-                        COALESCE("mediaType"::text, 'IMAGE') AS MEDIA_TYPE
-                    FROM "instagram-data-fetch-sbgp"."Post"
-                    WHERE 1 = 1 {date_filter.replace('p.', '')}
-
-                    UNION ALL
-
-                    SELECT
-                        'SBI' AS SHOPPING,
-                        "id" AS ID,
-                        "postedAt" AS DATA_POST,
-                        "mediaUrl" AS MEDIA_URL,
-                        "permalink" AS PERMALINK,
-                        COALESCE("mediaType"::text, 'IMAGE') AS MEDIA_TYPE
-                    FROM "instagram-data-fetch-sbi"."Post"
-                    WHERE 1 = 1 {date_filter.replace('p.', '')}
-                ),
-                all_data AS (
-                    SELECT
-                        P.SHOPPING as shopping,
-                        P.MEDIA_URL as link_foto,
-                        P.PERMALINK as link_insta,
-                        P.MEDIA_TYPE as tipo_midia,
-                        DATE(P.DATA_POST) as data,
-                        COALESCE(I.likes, 0) as total_likes,
-                        COALESCE(I.comments, 0) as total_comentarios,
-                        COALESCE(I.shares, 0) as total_compartilhamentos,
-                        COALESCE(I.saved, 0) as total_salvos
-                    FROM POST AS P
-                    JOIN POSTINSIGHT AS I ON CONCAT(P.SHOPPING, '-', P.ID) = CONCAT(I.SHOPPING, '-', I."postId")
+            cursor = request.GET.get('cursor')
+
+            # Ranking mensal mantido pela ingestão (ig_top_post), com
+            # paginação por chave; fallback para as tabelas da ingestão
+            try:
+                limit = int(request.GET.get('limit', '3'))
+                resultado = get_container().get_instagram_top_posts().get_top_posts(
+                    data_referencia, shopping, limit, cursor
                 )
-                SELECT
-                    shopping,
-                    data,
-                    link_foto,
-                    link_insta,
-                    tipo_midia,
-                    total_likes,
-                    total_comentarios,
-                    total_compartilhamentos,
-                    total_salvos,
-                    (total_likes + total_comentarios + total_compartilhamentos + total_salvos) as engajamento_total
-                FROM all_data
-                {f"WHERE shopping = '{shopping}'" if shopping else ""}
-                ORDER BY engajamento_total DESC, data DESC
-                LIMIT {limit}
-            """
-
-            result = db_executor.execute(query)
+            except ValueError as e:
+                return JsonResponse({
+                    'error': f'Parâmetro inválido: {str(e)}'
+                }, status=400)
 
-            return JsonResponse({
-                'posts': result
-            }, safe=False)
+            return JsonResponse(resultado, safe=False)
 
         except Exception as e:
             return JsonResponse({
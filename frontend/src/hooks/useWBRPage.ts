@@ -1,7 +1,7 @@
 /**
  * useWBRPage Hook
  * React hook para carregar dados de uma página WBR (múltiplos gráficos)
- * CARREGAMENTO SEQUENCIAL - Um gráfico por vez
+ * CARREGAMENTO PROGRESSIVO - Uma requisição em stream, cada gráfico renderiza ao chegar
  */
 
 import { useState, useEffect, useCallback, useRef } from 'react';
@@ -42,7 +42,7 @@ interface UseWBRPageResult {
 
 /**
  * Hook para carregar dados WBR de uma página completa
- * CARREGAMENTO SEQUENCIAL - Cada gráfico é carregado um por vez
+ * CARREGAMENTO PROGRESSIVO - O servidor envia cada gráfico assim que fica pronto
  *
  * @param pageId - Identificador da página/dashboard
  * @param filters - Filtros aplicados pelo usuário (opcional)
@@ -78,8 +78,14 @@ export function useWBRPage(pageId: string, filters?: UserFilters): UseWBRPageRes
   const filtersRef = useRef<UserFilters | undefined>(filters);
   filtersRef.current = filters;
 
+  // Stream em andamento (cancelado quando a página ou os filtros mudam)
+  const abortRef = useRef<AbortController | null>(null);
+
   const loadPage = useCallback(async () => {
     const currentFilters = filtersRef.current;
+    abortRef.current?.abort();
+    const controller = new AbortController();
+    abortRef.current = controller;
     try {
       setLoading(true);
       setError(null);
@@ -114,55 +120,31 @@ export function useWBRPage(pageId: string, filters?: UserFilters): UseWBRPageRes
       });
       setData(initialData);
 
-      // 4. Carrega gráficos em LOTES DE 5 (paralelo limitado) para acelerar
-      const BATCH_SIZE = 5;
-
-      for (let i = 0; i < graficoIds.length; i += BATCH_SIZE) {
-        const batch = graficoIds.slice(i, i + BATCH_SIZE);
-
-        // Carrega lote em paralelo
-        const batchPromises = batch.map(async (graficoId) => {
-          try {
-            const graficoData = await wbrApi.getGrafico(graficoId, currentFilters);
-
-            // Atualiza apenas este gráfico específico
-            setData(prev => ({
-              ...prev,
-              [graficoId]: graficoData
-            }));
-            setLoadingGraficos(prev => ({ ...prev, [graficoId]: false }));
-
-            return { graficoId, success: true };
-          } catch (err) {
-            console.error(`[useWBRPage] Erro ao carregar gráfico ${graficoId}:`, err);
-
-            // Em caso de erro, adiciona erro no resultado
-            setData(prev => ({
-              ...prev,
-              [graficoId]: {
-                error: err instanceof Error ? err.message : 'Erro desconhecido',
-                status: 'error',
-              }
-            }));
-            setLoadingGraficos(prev => ({ ...prev, [graficoId]: false }));
-
-            return { graficoId, success: false };
-          }
-        });
-
-        // Aguarda lote completo
-        await Promise.all(batchPromises);
-
-        // Atualiza progresso após cada lote
-        setProgress({ loaded: Math.min(i + BATCH_SIZE, graficoIds.length), total: graficoIds.length });
-      }
+      // 4. Uma única requisição em stream: cada gráfico chega assim que o
+      //    servidor termina de gerá-lo (gráficos com erro chegam com status 'failed')
+      let loaded = 0;
+      await wbrApi.streamPage(pageId, currentFilters, (graficoId, graficoData) => {
+        setData(prev => ({
+          ...prev,
+          [graficoId]: graficoData
+        }));
+        setLoadingGraficos(prev => ({ ...prev, [graficoId]: false }));
+
+        loaded += 1;
+        setProgress({ loaded, total: graficoIds.length });
+      }, controller.signal);
 
     } catch (err) {
+      if (controller.signal.aborted) {
+        return;
+      }
       const errorMessage = err instanceof Error ? err.message : 'Erro desconhecido ao carregar página';
       setError(errorMessage);
       console.error('[useWBRPage] Erro:', err);
     } finally {
-      setLoading(false);
+      if (!controller.signal.aborted) {
+        setLoading(false);
+      }
     }
   }, [pageId]); // Remove filters das dependências para evitar re-criações
 
@@ -182,6 +164,7 @@ export function useWBRPage(pageId: string, filters?: UserFilters): UseWBRPageRes
 
       loadPage();
     }
+    return () => abortRef.current?.abort();
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [pageId, filtersKey]); // REMOVIDO loadPage das dependências
 
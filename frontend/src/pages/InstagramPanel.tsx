@@ -142,21 +142,8 @@ export function InstagramPanel() {
       (s as any).metrica === 'follower_demographics' || s.METRICA === 'follower_demographics'
     );
 
-    // O value já contém o total de seguidores naquele dia
-    let totalSeguidores: number = 0;
-    if (seguidoresData?.value) {
-      if (typeof seguidoresData.value === 'number') {
-        // Valor direto
-        totalSeguidores = seguidoresData.value;
-      } else if (typeof seguidoresData.value === 'object' && seguidoresData.value !== null) {
-        // Se for objeto (dados demográficos), soma os valores para obter o total
-        // Ex: { "18-24": 1000, "25-34": 1500, ... } = 2500 seguidores total
-        totalSeguidores = Object.values(seguidoresData.value).reduce((acc: number, val: any) => {
-          const numVal = typeof val === 'number' ? val : 0;
-          return acc + numVal;
-        }, 0);
-      }
-    }
+    // O backend já extrai o total de seguidores do JSON demográfico
+    const totalSeguidores: number = seguidoresData?.total_seguidores || 0;
 
     return {
       seguidores: totalSeguidores,
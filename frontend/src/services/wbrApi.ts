@@ -161,6 +161,77 @@ export const wbrApi = {
     return response.json();
   },
 
+  /**
+   * Busca todos os gráficos de uma página em uma única requisição (NDJSON),
+   * recebendo cada gráfico assim que fica pronto no servidor
+   *
+   * @param pageId - Identificador da página/dashboard
+   * @param filters - Filtros aplicados pelo usuário (opcional)
+   * @param onGrafico - Chamado para cada gráfico (dados WBR ou erro do gráfico)
+   * @param signal - AbortSignal para cancelar o stream (opcional)
+   * @returns Promise resolvida quando todos os gráficos foram recebidos
+   * @throws Error se requisição falhar ou o stream terminar antes do fim
+   */
+  async streamPage(
+    pageId: string,
+    filters: UserFilters | undefined,
+    onGrafico: (graficoId: string, dados: PageWBRData[string]) => void,
+    signal?: AbortSignal
+  ): Promise<void> {
+    const queryParams = new URLSearchParams({ stream: 'ndjson' });
+
+    if (filters?.data_referencia) {
+      queryParams.append('data_referencia', filters.data_referencia);
+    }
+    if (filters?.shopping) {
+      queryParams.append('shopping', filters.shopping);
+    }
+    if (filters?.ramo) {
+      queryParams.append('ramo', filters.ramo);
+    }
+    if (filters?.categoria) {
+      queryParams.append('categoria', filters.categoria);
+    }
+    if (filters?.loja) {
+      queryParams.append('loja', filters.loja);
+    }
+
+    const url = `${API_BASE_URL}/wbr/page/${pageId}/?${queryParams.toString()}`;
+    const response = await fetch(url, { method: 'GET', signal });
+
+    if (!response.ok || !response.body) {
+      const errorData = await response.json().catch(() => ({}));
+      throw new Error(errorData.error || `Erro ao buscar página: ${response.statusText}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) {
+        throw new Error('Conexão encerrada antes de receber todos os gráficos');
+      }
+
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop() ?? '';
+
+      for (const line of lines) {
+        if (!line) continue;
+        const evento = JSON.parse(line);
+        if (evento.evento === 'grafico') {
+          onGrafico(evento.grafico_id, evento.dados);
+        } else if (evento.evento === 'erro') {
+          throw new Error(evento.error);
+        } else if (evento.evento === 'fim') {
+          return;
+        }
+      }
+    }
+  },
+
   /**
    * Busca opções disponíveis para os filtros
    *
@@ -219,6 +290,49 @@ export const wbrApi = {
     return response.json();
   },
 
+  /**
+   * Autocomplete de lojas, categorias ou ramos (busca por prefixo sem acentos)
+   *
+   * @param field - Campo pesquisado
+   * @param q - Texto digitado
+   * @param options - Limite de resultados (padrão 10, máximo 50) e filtros de shopping/ramo
+   * @returns Promise com os valores encontrados
+   * @throws Error se requisição falhar
+   */
+  async searchFilterOptions(
+    field: 'loja' | 'categoria' | 'ramo',
+    q: string,
+    options?: { limit?: number; shopping?: string; ramo?: string }
+  ): Promise<string[]> {
+    const queryParams = new URLSearchParams({ field, q });
+
+    if (options?.limit) {
+      queryParams.append('limit', options.limit.toString());
+    }
+    if (options?.shopping) {
+      queryParams.append('shopping', options.shopping);
+    }
+    if (options?.ramo) {
+      queryParams.append('ramo', options.ramo);
+    }
+
+    const url = `${API_BASE_URL}/wbr/filters/search/?${queryParams.toString()}`;
+    const response = await fetch(url, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+    });
+
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => ({}));
+      throw new Error(errorData.error || `Erro ao buscar opções: ${response.statusText}`);
+    }
+
+    const data = await response.json();
+    return data.opcoes;
+  },
+
   /**
    * Busca datas disponíveis nos dados
    *
@@ -276,7 +390,7 @@ export interface InstagramKPIs {
     DATA?: string; // maiúsculas (compatibilidade)
     metrica?: string; // minúsculas (formato real do backend)
     METRICA?: string; // maiúsculas (compatibilidade)
-    value: any; // Pode ser número direto ou objeto JSON com dados demográficos
+    total_seguidores: number; // Total extraído no backend do JSON demográfico
   }>;
   engagement: Array<{
     shopping: string;
@@ -295,6 +409,12 @@ export interface InstagramKPIs {
     alcance_total_mes: number;
     alcance_medio_dia: number;
   }>;
+  // Presente apenas com ?historico_dias=N
+  seguidores_historico?: Array<{
+    shopping: string;
+    data: string;
+    total_seguidores: number;
+  }>;
 }
 
 /**
@@ -352,11 +472,12 @@ export const instagramApi = {
   /**
    * Busca Top Posts do Instagram ordenados por engajamento
    *
-   * @param filters - Filtros aplicados (data_referencia e shopping opcionais, limit padrão 3)
-   * @returns Promise com lista de top posts
+   * @param filters - Filtros aplicados (data_referencia e shopping opcionais, limit padrão 3, máximo 50;
+   *                  cursor = proximo_cursor da página anterior)
+   * @returns Promise com lista de top posts e cursor da próxima página (null na última)
    * @throws Error se requisição falhar
    */
-  async getTopPosts(filters?: { data_referencia?: string; shopping?: string; limit?: number }): Promise<{ posts: InstagramTopPost[] }> {
+  async getTopPosts(filters?: { data_referencia?: string; shopping?: string; limit?: number; cursor?: string }): Promise<{ posts: InstagramTopPost[]; proximo_cursor: string | null }> {
     const queryParams = new URLSearchParams();
 
     if (filters?.data_referencia) {
@@ -368,6 +489,9 @@ export const instagramApi = {
     if (filters?.limit) {
       queryParams.append('limit', filters.limit.toString());
     }
+    if (filters?.cursor) {
+      queryParams.append('cursor', filters.cursor);
+    }
 
     const url = `${API_BASE_URL}/wbr/instagram/top-posts/?${queryParams.toString()}`;
     console.log('[instagramApi.getTopPosts] Chamando API de Top Posts:', filters);